@@ -1,18 +1,36 @@
 import asyncio
-import aiohttp
 import base64
 from solana.transaction import Transaction
 from utils.logger import setup_logger
+from utils.http_client import HttpClientPool
+from utils.config import config
+from services.confirmations import ConfirmationService
+from services.tx_sender import RacingSender
 
 class ExitAgent:
-    def __init__(self, wallet_manager):
+    def __init__(self, wallet_manager, http_pool=None, priority_fees=None, confirmations=None,
+                 tx_sender=None):
         self.logger = setup_logger("exit_agent")
         self.wallet_manager = wallet_manager
+        self.http_pool = http_pool or HttpClientPool()
+        self._owns_http_pool = http_pool is None
+        self.priority_fees = priority_fees
+        self.confirmations = confirmations or ConfirmationService(config.RPC_ENDPOINT, session=self.http_pool)
+        self._owns_confirmations = confirmations is None
+        self.tx_sender = tx_sender or RacingSender(
+            config.RPC_ENDPOINTS,
+            session=self.http_pool,
+            confirmations=self.confirmations,
+            rebroadcast_interval=config.REBROADCAST_INTERVAL
+        )
+        self._owns_tx_sender = tx_sender is None
         self.is_initialized = False
 
     async def initialize(self):
         """Initialize exit agent"""
         try:
+            if self._owns_confirmations:
+                await self.confirmations.start()
             self.is_initialized = True
             self.logger.info("Exit agent initialized")
             return True
@@ -22,10 +40,7 @@ class ExitAgent:
 
     async def execute_sell(self, token_address, amount, reason="manual"):
         """Execute sell order using Jupiter Swap API"""
-        session = None
         try:
-            session = aiohttp.ClientSession()
-            
             # 1. Get quote from Jupiter
             quote_url = f"https://quote-api.jup.ag/v6/quote"
             params = {
@@ -35,7 +50,7 @@ class ExitAgent:
                 'slippageBps': 50  # 0.5% slippage
             }
             
-            async with session.get(quote_url, params=params) as response:
+            async with self.http_pool.get(quote_url, params=params) as response:
                 quote_data = await response.json()
 
             # 2. Get swap transaction
@@ -45,8 +60,11 @@ class ExitAgent:
                 'userPublicKey': str(self.wallet_manager.phantom_public_key),
                 'wrapUnwrapSOL': True
             }
+            if self.priority_fees:
+                urgency = 'stop_loss' if 'stop' in reason else 'exit'
+                swap_data['computeUnitPriceMicroLamports'] = self.priority_fees.get_fee(urgency)
             
-            async with session.post(swap_url, json=swap_data) as response:
+            async with self.http_pool.post(swap_url, json=swap_data) as response:
                 transaction_data = await response.json()
                 
             # 3. Deserialize and sign transaction
@@ -55,10 +73,7 @@ class ExitAgent:
             
             # 4. Sign and send
             transaction.sign([self.wallet_manager.keypair])
-            txid = await self.wallet_manager.client.send_transaction(
-                transaction,
-                opts={'skipPreflight': True}
-            )
+            txid = await self.tx_sender.send(transaction)
 
             if not await self._wait_for_confirmation(txid):
                 raise Exception("Transaction failed to confirm")
@@ -69,17 +84,11 @@ class ExitAgent:
         except Exception as e:
             self.logger.error(f"Sell order failed: {str(e)}")
             return False
-        finally:
-            if session:
-                await session.close()
 
     async def _wait_for_confirmation(self, signature):
         """Wait for transaction confirmation"""
         try:
-            await self.wallet_manager.client.confirm_transaction(
-                signature,
-                commitment="confirmed"
-            )
+            await self.tx_sender.confirm(signature)
             return True
         except Exception as e:
             self.logger.error(f"Transaction confirmation failed: {str(e)}")
@@ -88,7 +97,13 @@ class ExitAgent:
     async def cleanup(self):
         """Cleanup resources"""
         try:
-            # Nothing to clean up for now
+            # Stop the sender, confirmation service and HTTP pool unless they were shared with us
+            if self._owns_tx_sender:
+                await self.tx_sender.close()
+            if self._owns_confirmations:
+                await self.confirmations.stop()
+            if self._owns_http_pool:
+                await self.http_pool.close()
             self.logger.info("Exit agent cleanup completed")
         except Exception as e:
             self.logger.error(f"Error during cleanup: {str(e)}")
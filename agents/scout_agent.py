@@ -1,36 +1,136 @@
 import time
+import asyncio
+import json
 from utils.logger import setup_logger
+from utils.token_sync import JupiterTokenSync
+from utils.token_index import KnownTokenIndex, KNOWN_TOKENS_PATH
+from utils.token_cache import TokenInfo, TokenRingBuffer
+from utils.poll_scheduler import PollScheduler
+from utils.candidate_queue import CandidateQueue
+from utils.token_stream import Subscription, TokenFanout
 from datetime import datetime
+import aiohttp
 import requests
 import threading
-from queue import Queue
+from queue import Empty
+from urllib.parse import urlparse
+
+JUPITER_TOKENS_URL = 'https://token.jup.ag/all'
+DEXSCREENER_TOKENS_URL = 'https://api.dexscreener.com/latest/dex/tokens/solana'
+
+# Lines written by _process_new_token for each token, used for seeding stats
+TOKEN_LOG_LINES = 7
+
+SOURCE_JUPITER = '🪐 Jupiter'
+SOURCE_DEXSCREENER = '🔍 DexScreener'
+SOURCE_RAYDIUM = '⚡ Raydium'
+
+# How much each source counts towards a candidate's priority (0..1)
+SOURCE_WEIGHTS = {
+    SOURCE_RAYDIUM: 1.0,
+    SOURCE_DEXSCREENER: 0.6,
+    SOURCE_JUPITER: 0.3
+}
+
+# Requests-per-minute budget per source host
+HOST_BUDGETS = {
+    'token.jup.ag': 30,
+    'api.dexscreener.com': 240
+}
+
+# Most candidates handed to subscribers in one fan-out
+DISPATCH_BATCH = 32
+
+# Known-token snapshot is rewritten after this many additions or seconds, whichever comes first
+SNAPSHOT_EVERY = 200
+SNAPSHOT_INTERVAL = 60
+
+def _pair_to_token(pair):
+    """Normalize a DexScreener pair into a scout token record"""
+    return {
+        'address': pair['baseToken']['address'],
+        'symbol': pair['baseToken']['symbol'],
+        'name': pair['baseToken'].get('name', 'Unknown'),
+        'price': float(pair.get('priceUsd', 0)),
+        'liquidity': float(pair.get('liquidity', {}).get('usd', 0)),
+        'volume': float(pair.get('volume', {}).get('h24', 0))
+    }
 
 class ScoutAgent:
-    def __init__(self):
+    """Threaded scout - polls the token sources from a daemon thread"""
+
+    def __init__(self, seed_on_start=True, index_path=KNOWN_TOKENS_PATH, cache_size=100,
+                 poll_interval=2, host_budgets=None, max_age=60, queue_size=1000):
         self.logger = setup_logger("scout_agent")
         self.is_running = False
         self.is_initialized = False
-        self.known_tokens = set()
-        self.token_cache = []
+        self.seed_on_start = seed_on_start
+        self.seed_stats = None
+        self.known_tokens = KnownTokenIndex(path=index_path)
+        if len(self.known_tokens):
+            self.logger.info(f"📂 Restored {len(self.known_tokens)} known tokens from snapshot")
+        self._snapshot_count = len(self.known_tokens)
+        self._snapshot_at = time.monotonic()
+        self.token_cache = TokenRingBuffer(cache_size)
         self.last_token_count = 0
-        self.token_queue = Queue()
+        self.jupiter_sync = JupiterTokenSync()
+        self.token_queue = CandidateQueue(
+            maxsize=queue_size,
+            max_age=max_age,
+            source_weights=SOURCE_WEIGHTS
+        )
         self.monitor_thread = None
+        self.dispatch_thread = None
+        self.fanout = TokenFanout()
+        self._pump_tasks = set()
+        self.scheduler = self._build_scheduler(
+            poll_interval, HOST_BUDGETS if host_budgets is None else host_budgets
+        )
+
+    def _build_scheduler(self, poll_interval, host_budgets):
+        """Give every source its own adaptive schedule and every host its budget"""
+        scheduler = PollScheduler()
+        scheduler.add_source('jupiter', urlparse(JUPITER_TOKENS_URL).hostname, poll_interval)
+        scheduler.add_source('dexscreener', urlparse(DEXSCREENER_TOKENS_URL).hostname, poll_interval)
+        for host, requests_per_minute in host_budgets.items():
+            scheduler.set_budget(host, requests_per_minute)
+        return scheduler
+
+    def _pollers(self):
+        return {
+            'jupiter': self._poll_jupiter,
+            'dexscreener': self._poll_dexscreener
+        }
 
     def initialize(self):
         """Initialize scout agent"""
         try:
+            started = time.perf_counter()
+
             # Test connections
             self.logger.info("🔌 Testing API connections...")
             
             # Test Jupiter
-            response = requests.get('https://token.jup.ag/all', timeout=10)
-            if response.status_code != 200:
+            jupiter_response = requests.get(
+                JUPITER_TOKENS_URL,
+                headers=self.jupiter_sync.request_headers(),
+                timeout=10
+            )
+            if jupiter_response.status_code != 200:
                 raise Exception("❌ Failed to connect to Jupiter API")
                 
             # Test DexScreener
-            response = requests.get('https://api.dexscreener.com/latest/dex/tokens/solana', timeout=10)
-            if response.status_code != 200:
+            dex_response = requests.get(DEXSCREENER_TOKENS_URL, timeout=10)
+            if dex_response.status_code != 200:
                 raise Exception("❌ Failed to connect to DexScreener API")
+
+            if self.seed_on_start:
+                self.jupiter_sync.apply(
+                    jupiter_response.status_code,
+                    jupiter_response.headers,
+                    jupiter_response.content
+                )
+                self._seed_known_tokens(dex_response.json(), started)
             
             self.is_initialized = True
             self.logger.info("✅ Scout agent initialized successfully")
@@ -40,47 +140,107 @@ class ScoutAgent:
             self.logger.error(f"❌ Scout agent initialization failed: {str(e)}")
             return False
 
+    def _seed_known_tokens(self, dex_data, started):
+        """Bulk-load the current token universe so only later deltas are processed"""
+        before = len(self.known_tokens)
+        self.known_tokens.update(self.jupiter_sync.addresses)
+        for pair in dex_data.get('pairs') or []:
+            self.known_tokens.add(pair['baseToken']['address'])
+
+        seeded = len(self.known_tokens) - before
+        self.last_token_count = self.jupiter_sync.token_count
+        self.seed_stats = {
+            'tokens_seeded': seeded,
+            'cold_start_ms': (time.perf_counter() - started) * 1000,
+            'token_events_skipped': seeded,
+            'log_lines_skipped': seeded * TOKEN_LOG_LINES
+        }
+        self.logger.info(
+            f"🌱 Seeded {seeded} known tokens in {self.seed_stats['cold_start_ms']:.0f}ms "
+            f"(skipped {seeded} token events, ~{self.seed_stats['log_lines_skipped']} log lines)"
+        )
+        self._snapshot_known_tokens(force=True)
+
+    def _snapshot_known_tokens(self, force=False):
+        """Persist the known-token index once enough has been added since the last save"""
+        added = len(self.known_tokens) - self._snapshot_count
+        if added <= 0:
+            return False
+        if not force and added < SNAPSHOT_EVERY and time.monotonic() - self._snapshot_at < SNAPSHOT_INTERVAL:
+            return False
+
+        try:
+            saved = self.known_tokens.save()
+        except OSError as e:
+            self.logger.error(f"⚠️ Known token snapshot failed: {str(e)}")
+            return False
+        if saved:
+            self._snapshot_count = len(self.known_tokens)
+            self._snapshot_at = time.monotonic()
+        return saved
+
     def _monitor_tokens(self):
-        """Monitor for new tokens"""
+        """Monitor for new tokens, polling whichever source is due next"""
+        pollers = self._pollers()
         while self.is_running:
-            try:
-                # Get tokens from Jupiter
-                response = requests.get('https://token.jup.ag/all', timeout=10)
-                if response.status_code == 200:
-                    tokens = response.json()
-                    current_count = len(tokens)
-                    
-                    if current_count != self.last_token_count:
-                        self.logger.info(f"📊 Found {current_count} tokens on Jupiter")
-                        self.last_token_count = current_count
-                    
-                    for token in tokens:
-                        if token['address'] not in self.known_tokens:
-                            self._process_new_token(token, '🪐 Jupiter')
-
-                # Get tokens from DexScreener
-                response = requests.get('https://api.dexscreener.com/latest/dex/tokens/solana', timeout=10)
-                if response.status_code == 200:
-                    dex_data = response.json()
-                    if 'pairs' in dex_data:
-                        for pair in dex_data['pairs']:
-                            token = {
-                                'address': pair['baseToken']['address'],
-                                'symbol': pair['baseToken']['symbol'],
-                                'name': pair['baseToken'].get('name', 'Unknown'),
-                                'price': float(pair.get('priceUsd', 0)),
-                                'liquidity': float(pair.get('liquidity', {}).get('usd', 0)),
-                                'volume': float(pair.get('volume', {}).get('h24', 0))
-                            }
-                            
-                            if token['address'] not in self.known_tokens:
-                                self._process_new_token(token, '🔍 DexScreener')
-
-                time.sleep(2)  # Check every 2 seconds
+            name, wait = self.scheduler.next_due()
+            if wait > 0:
+                time.sleep(min(wait, 0.5))  # Short naps so cleanup() isn't kept waiting
+                continue
 
+            self.scheduler.begin(name)
+            try:
+                status, retry_after, changed = pollers[name]()
+                self.scheduler.record_result(name, status, changed, retry_after)
+                self._snapshot_known_tokens()
             except Exception as e:
-                self.logger.error(f"⚠️ Monitor error: {str(e)}")
-                time.sleep(1)
+                self.logger.error(f"⚠️ Monitor error ({name}): {str(e)}")
+                self.scheduler.record_error(name)
+
+    def _poll_jupiter(self):
+        """Poll Jupiter, returning (status, Retry-After, changed)"""
+        response = requests.get(
+            JUPITER_TOKENS_URL,
+            headers=self.jupiter_sync.request_headers(),
+            timeout=10
+        )
+        new_tokens = self.jupiter_sync.apply(
+            response.status_code, response.headers, response.content
+        )
+        if new_tokens is not None:
+            self._handle_jupiter_tokens(new_tokens)
+        return response.status_code, response.headers.get('Retry-After'), new_tokens is not None
+
+    def _poll_dexscreener(self):
+        """Poll DexScreener, returning (status, Retry-After, changed)"""
+        response = requests.get(DEXSCREENER_TOKENS_URL, timeout=10)
+        found = 0
+        if response.status_code == 200:
+            found = self._handle_dexscreener_pairs(response.json())
+        return response.status_code, response.headers.get('Retry-After'), found > 0
+
+    def _handle_jupiter_tokens(self, tokens):
+        """Process the tokens added to the Jupiter list since the last sync"""
+        current_count = self.jupiter_sync.token_count
+        
+        if current_count != self.last_token_count:
+            self.logger.info(f"📊 Found {current_count} tokens on Jupiter")
+            self.last_token_count = current_count
+        
+        for token in tokens:
+            if token['address'] not in self.known_tokens:
+                self._process_new_token(token, SOURCE_JUPITER)
+
+    def _handle_dexscreener_pairs(self, dex_data):
+        """Process a DexScreener pairs response, returning how many tokens were new"""
+        found = 0
+        if 'pairs' in dex_data:
+            for pair in dex_data['pairs']:
+                token = _pair_to_token(pair)
+                if token['address'] not in self.known_tokens:
+                    self._process_new_token(token, SOURCE_DEXSCREENER)
+                    found += 1
+        return found
 
     def _process_new_token(self, token, source):
         """Process a new token"""
@@ -95,27 +255,31 @@ class ScoutAgent:
                 f"  📈 Volume 24h: ${token.get('volume', 0):,.2f}"
             )
 
-            token_info = {
-                'address': token['address'],
-                'symbol': token.get('symbol', 'Unknown'),
-                'name': token.get('name', 'Unknown'),
-                'price': token.get('price', 0),
-                'liquidity': token.get('liquidity', 0),
-                'volume': token.get('volume', 0),
-                'created_at': int(time.time()),
-                'source': source
-            }
+            token_info = TokenInfo(
+                address=token['address'],
+                symbol=token.get('symbol', 'Unknown'),
+                name=token.get('name', 'Unknown'),
+                price=token.get('price', 0),
+                liquidity=token.get('liquidity', 0),
+                volume=token.get('volume', 0),
+                created_at=token.get('created_at') or int(time.time()),
+                source=source,
+                slot=token.get('slot'),
+                pool_address=token.get('pool_address')
+            )
 
             self.token_cache.append(token_info)
-            if len(self.token_cache) > 100:
-                self.token_cache = self.token_cache[-100:]
 
             self.known_tokens.add(token['address'])
-            self.token_queue.put(token_info)
+            self._publish(token_info)
 
         except Exception as e:
             self.logger.error(f"⚠️ Error processing token: {str(e)}")
 
+    def _publish(self, token_info):
+        """Hand a new token to consumers"""
+        self.token_queue.put(token_info)
+
     def start(self):
         """Start monitoring"""
         if not self.is_initialized:
@@ -129,19 +293,99 @@ class ScoutAgent:
         self.monitor_thread = threading.Thread(target=self._monitor_tokens)
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
+
+        self.dispatch_thread = threading.Thread(target=self._dispatch_tokens)
+        self.dispatch_thread.daemon = True
+        self.dispatch_thread.start()
         return True
 
+    def _drain_candidates(self, limit):
+        """Pop up to `limit` live candidates, best first"""
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.token_queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def _dispatch_tokens(self):
+        """Fan candidates out to stream subscribers in micro-batches"""
+        while self.is_running:
+            # Leave candidates for get_new_tokens() until someone subscribes
+            if not self.fanout.has_subscribers.wait(timeout=0.5):
+                continue
+            try:
+                token_info = self.token_queue.get(timeout=0.5)
+            except Empty:
+                continue
+            self.fanout.publish([token_info] + self._drain_candidates(DISPATCH_BATCH - 1))
+
+    def _open_subscription(self, max_batch, max_wait_ms, max_buffer, policy):
+        subscription = Subscription(
+            asyncio.get_running_loop(),
+            max_batch=max_batch,
+            max_wait_ms=max_wait_ms,
+            max_buffer=max_buffer,
+            policy=policy
+        )
+        self.fanout.add(subscription)
+        return subscription
+
+    async def stream(self, max_batch=32, max_wait_ms=50, max_buffer=256, policy='drop_oldest'):
+        """Yield micro-batches of new tokens: `async for batch in scout.stream()`"""
+        subscription = self._open_subscription(max_batch, max_wait_ms, max_buffer, policy)
+        try:
+            async for batch in subscription:
+                yield batch
+        finally:
+            self.fanout.remove(subscription)
+            subscription.close()
+
+    async def subscribe(self, callback, batch=False, max_batch=32, max_wait_ms=50,
+                        max_buffer=256, policy='drop_oldest'):
+        """Push new tokens to an async callback - whole micro-batches if batch=True"""
+        if not callable(callback):
+            raise ValueError("Callback must be callable")
+        subscription = self._open_subscription(max_batch, max_wait_ms, max_buffer, policy)
+        task = asyncio.create_task(self._pump(subscription, callback, batch))
+        self._pump_tasks.add(task)
+        task.add_done_callback(self._pump_tasks.discard)
+        return subscription
+
+    async def _pump(self, subscription, callback, batch):
+        """Feed one subscriber from its buffer"""
+        try:
+            async for tokens in subscription:
+                for item in ([tokens] if batch else tokens):
+                    try:
+                        await callback(item)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        self.logger.error(f"⚠️ Subscriber error: {str(e)}")
+        finally:
+            self.fanout.remove(subscription)
+
+    def get_subscriber_stats(self):
+        """Delivery, drop and buffer counters per subscriber"""
+        return self.fanout.get_stats()
+
     def get_cached_tokens(self):
-        """Get the cached token list"""
-        return self.token_cache
+        """Get a non-copying view of the cached tokens, oldest first"""
+        return self.token_cache.view()
 
     def get_new_tokens(self, timeout=0):
-        """Get new tokens from the queue"""
+        """Get the best live candidate from the queue"""
         try:
             return self.token_queue.get(timeout=timeout)
-        except:
+        except Empty:
             return None
 
+    def get_queue_stats(self):
+        """Depth and drop counters of the candidate queue"""
+        return self.token_queue.get_stats()
+
     def cleanup(self):
         """Cleanup resources"""
         try:
@@ -150,12 +394,227 @@ class ScoutAgent:
             
             if self.monitor_thread:
                 self.monitor_thread.join(timeout=2)
+            if self.dispatch_thread:
+                self.dispatch_thread.join(timeout=2)
+
+            self.fanout.close_all()
+            for task in list(self._pump_tasks):
+                task.get_loop().call_soon_threadsafe(task.cancel)
             
-            self.known_tokens.clear()
+            if not self.known_tokens.save():
+                self.known_tokens.clear()
             self.token_cache.clear()
+            self.token_queue.clear()
+            self.jupiter_sync = JupiterTokenSync()
             self.is_initialized = False
             
             self.logger.info("✨ Scout agent cleaned up")
             
         except Exception as e:
             self.logger.error(f"⚠️ Cleanup error: {str(e)}")
+
+
+class AsyncScoutAgent(ScoutAgent):
+    """Asyncio scout - polls every source concurrently over one pooled session"""
+
+    def __init__(self, session=None, poll_interval=2, seed_on_start=True,
+                 index_path=KNOWN_TOKENS_PATH, cache_size=100, pool_feed=None, host_budgets=None,
+                 max_age=60, queue_size=1000, decode_executor=None):
+        super().__init__(
+            seed_on_start=seed_on_start,
+            index_path=index_path,
+            cache_size=cache_size,
+            poll_interval=poll_interval,
+            host_budgets=host_budgets,
+            max_age=max_age,
+            queue_size=queue_size
+        )
+        self.session = session
+        # Executor for parsing the Jupiter list; None uses the loop's thread pool
+        self.decode_executor = decode_executor
+        self.pool_feed = pool_feed
+        self._owns_session = session is None
+        self.monitor_task = None
+        self.dispatch_task = None
+        self._candidate_ready = None
+
+    def _create_session(self):
+        """Create a keep-alive session shared by every source"""
+        connector = aiohttp.TCPConnector(
+            limit=20,
+            limit_per_host=4,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+
+    async def initialize(self):
+        """Initialize scout agent"""
+        try:
+            if not self.session:
+                self.session = self._create_session()
+                self._owns_session = True
+
+            started = time.perf_counter()
+            self.logger.info("🔌 Testing API connections...")
+            jupiter, dex = await asyncio.gather(
+                self._get_raw(JUPITER_TOKENS_URL, self.jupiter_sync.request_headers()),
+                self._get_raw(DEXSCREENER_TOKENS_URL)
+            )
+            jupiter_status, jupiter_headers, jupiter_body = jupiter
+            dex_status, _, dex_body = dex
+            if jupiter_status != 200:
+                raise Exception("❌ Failed to connect to Jupiter API")
+            if dex_status != 200:
+                raise Exception("❌ Failed to connect to DexScreener API")
+
+            if self.seed_on_start:
+                await self.jupiter_sync.apply_async(
+                    jupiter_status,
+                    jupiter_headers,
+                    jupiter_body,
+                    self.decode_executor
+                )
+                self._seed_known_tokens(json.loads(dex_body), started)
+
+            self.is_initialized = True
+            self.logger.info("✅ Scout agent initialized successfully")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"❌ Scout agent initialization failed: {str(e)}")
+            return False
+
+    async def _get_raw(self, url, headers=None):
+        """Return the status, headers and undecoded body of a source"""
+        async with self.session.get(url, headers=headers) as response:
+            body = await response.read() if response.status == 200 else b''
+            return response.status, response.headers, body
+
+    async def _poll_jupiter(self):
+        """Conditionally fetch the Jupiter list, returning (status, Retry-After, changed)"""
+        async with self.session.get(
+            JUPITER_TOKENS_URL,
+            headers=self.jupiter_sync.request_headers()
+        ) as response:
+            body = await response.read() if response.status == 200 else b''
+            headers = response.headers
+            retry_after = headers.get('Retry-After')
+
+        new_tokens = await self.jupiter_sync.apply_async(
+            response.status, headers, body, self.decode_executor
+        )
+        if new_tokens is not None:
+            self._handle_jupiter_tokens(new_tokens)
+        return response.status, retry_after, new_tokens is not None
+
+    async def _poll_dexscreener(self):
+        """Poll DexScreener, returning (status, Retry-After, changed)"""
+        async with self.session.get(DEXSCREENER_TOKENS_URL) as response:
+            dex_data = await response.json(content_type=None) if response.status == 200 else None
+            retry_after = response.headers.get('Retry-After')
+
+        found = self._handle_dexscreener_pairs(dex_data) if dex_data else 0
+        return response.status, retry_after, found > 0
+
+    def _publish(self, token_info):
+        """Queue a new token for the dispatcher, best candidates first"""
+        if self.token_queue.put(token_info) and self._candidate_ready:
+            self._candidate_ready.set()
+
+    async def _dispatch_candidates(self):
+        """Fan the best live candidates out to subscribers in micro-batches"""
+        while self.is_running:
+            # Clear before checking so a put() between the two can't be missed
+            self._candidate_ready.clear()
+            batch = []
+            if self.fanout.has_subscribers.is_set():
+                batch = self._drain_candidates(DISPATCH_BATCH)
+            if not batch:
+                await self._candidate_ready.wait()
+                continue
+
+            self.fanout.publish(batch)
+            # Let subscribers drain before taking the next batch
+            await asyncio.sleep(0)
+
+    async def _monitor_tokens(self):
+        """Monitor for new tokens, each source on its own schedule"""
+        await asyncio.gather(*(
+            self._run_source(name, poll) for name, poll in self._pollers().items()
+        ))
+
+    async def _run_source(self, name, poll):
+        """Poll one source whenever the scheduler says it is due"""
+        while self.is_running:
+            wait = self.scheduler.wait_time(name)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            self.scheduler.begin(name)
+            try:
+                status, retry_after, changed = await poll()
+                self.scheduler.record_result(name, status, changed, retry_after)
+                self._snapshot_known_tokens()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"⚠️ {name} fetch error: {str(e)}")
+                self.scheduler.record_error(name)
+
+    async def start(self):
+        """Start monitoring"""
+        if not self.is_initialized:
+            self.logger.error("❌ Cannot start - not initialized")
+            return False
+
+        self.is_running = True
+        self.logger.info("🚀 Started monitoring for new tokens...")
+        self.monitor_task = asyncio.create_task(self._monitor_tokens())
+        self._candidate_ready = asyncio.Event()
+        self.dispatch_task = asyncio.create_task(self._dispatch_candidates())
+
+        if self.pool_feed:
+            if not self.pool_feed.session:
+                self.pool_feed.session = self.session
+            if self._handle_pool_record not in self.pool_feed.subscribers:
+                await self.pool_feed.subscribe(self._handle_pool_record)
+            await self.pool_feed.start()
+        return True
+
+    async def _handle_pool_record(self, record):
+        """Process a pool detected on-chain by the Raydium pool feed"""
+        if record['address'] not in self.known_tokens:
+            self._process_new_token(record, SOURCE_RAYDIUM)
+            self._snapshot_known_tokens()
+
+    async def stop(self):
+        """Stop monitoring"""
+        self.is_running = False
+        if self.pool_feed:
+            await self.pool_feed.stop()
+        self.fanout.close_all()
+        tasks = [task for task in [self.monitor_task, self.dispatch_task, *self._pump_tasks] if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.monitor_task = None
+        self.dispatch_task = None
+
+    async def cleanup(self):
+        """Cleanup resources"""
+        try:
+            await self.stop()
+
+            if self.session and self._owns_session:
+                await self.session.close()
+            self.session = None
+
+            super().cleanup()
+
+        except Exception as e:
+            self.logger.error(f"⚠️ Cleanup error: {str(e)}")
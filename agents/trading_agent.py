@@ -3,42 +3,99 @@ from collections import deque
 import time
 from solana.rpc.async_api import AsyncClient
 from solana.transaction import Transaction
-from solders.keypair import Keypair
-from solders.pubkey import Pubkey
-from spl.token.constants import TOKEN_PROGRAM_ID
-from solana.rpc.commitment import Confirmed
-from raydium.instructions import (
-    create_swap_instruction,
-    get_pool_info,
-    calculate_min_out_amount
-)
+from raydium.instructions import get_pool_info
 from utils.logger import setup_logger
-from utils.config import config
+from utils.config import config, RAYDIUM_API_URL
 from utils.wallet_manager import WalletManager
 from solders.instruction import Instruction
-from solders.system_program import create_account, CreateAccountParams
 from utils.exceptions import (
     InsufficientBalanceError, 
     InvalidTokenError, 
-    TransactionError,
-    TokenAccountError
+    TransactionError
 )
-import aiohttp
 from utils.dexscreener import DexScreener
+from utils.http_client import HttpClientPool
+from utils.task_graph import TaskGraph
+from utils.quote_cache import QuoteCache
+from raydium.quote import LocalQuoter, quote_swap
+from raydium.swap import RaydiumSwapBuilder, DEFAULT_COMPUTE_UNITS
+from utils.token_accounts import TokenAccountCache, TOKEN_ACCOUNT_RENT
+from services.price_oracle import PriceOracle
+from services.priority_fees import PriorityFeeEstimator
+from services.balance_ledger import BalanceLedger
+from services.confirmations import ConfirmationService
+from services.tx_sender import RacingSender
+from services.blockhash_cache import BlockhashCache
 import base64
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
+SOL_MINT = 'So11111111111111111111111111111111111111112'
+JUPITER_QUOTE_URL = 'https://quote-api.jup.ag/v6/quote'
+JUPITER_SWAP_URL = 'https://quote-api.jup.ag/v6/swap'
+
+# Never bid less than this for a buy, whatever the fee model suggests
+MIN_BUY_PRIORITY_FEE = 50000
+
+# Network fee per signature - buys are signed by the wallet alone
+BASE_FEE_LAMPORTS = 5000
+
+BUY_SLIPPAGE_BPS = 1000  # 10% slippage for new tokens
+
+# How long a prefetched quote is good enough to trade on
+QUOTE_TTL = 2.0
+
+# How long a buy waits for pool reserves before going through Jupiter instead
+POOL_STATE_WAIT = 0.25
+
 class TradingAgent:
-    def __init__(self, wallet_manager=None):
+    def __init__(self, wallet_manager=None, http_pool=None, price_oracle=None, priority_fees=None,
+                 balance_ledger=None, confirmations=None, tx_sender=None, pool_index=None,
+                 blockhashes=None):
         self.logger = setup_logger("trading_agent")
         self.wallet_manager = wallet_manager
         self.active_trades = {}
         self.execution_times = deque(maxlen=100)
+        self.buy_timings = deque(maxlen=100)
+        self.quote_cache = QuoteCache(ttl=QUOTE_TTL)
+        self.local_quoter = LocalQuoter(max_age=QUOTE_TTL)
+        self._pool_refreshes = {}
         self.is_initialized = False
-        self.session = None
+        self.http_pool = http_pool or HttpClientPool()
+        self._owns_http_pool = http_pool is None
+        self.dexscreener = DexScreener(http_pool=self.http_pool)
+        self.price_oracle = price_oracle or PriceOracle(session=self.http_pool)
+        self._owns_price_oracle = price_oracle is None
+        self.priority_fees = priority_fees or PriorityFeeEstimator(
+            config.RPC_ENDPOINT,
+            session=self.http_pool,
+            raydium_url=RAYDIUM_API_URL
+        )
+        self._owns_priority_fees = priority_fees is None
+        # Built in initialize() once the wallet is known, unless shared with us
+        self.balance_ledger = balance_ledger
+        self._owns_balance_ledger = balance_ledger is None
+        self.token_accounts = None
+        self.confirmations = confirmations or ConfirmationService(config.RPC_ENDPOINT, session=self.http_pool)
+        self._owns_confirmations = confirmations is None
+        self.blockhashes = blockhashes or BlockhashCache(
+            config.RPC_ENDPOINT,
+            session=self.http_pool,
+            interval=config.BLOCKHASH_REFRESH_INTERVAL
+        )
+        self._owns_blockhashes = blockhashes is None
+        self.tx_sender = tx_sender or RacingSender(
+            config.RPC_ENDPOINTS,
+            session=self.http_pool,
+            confirmations=self.confirmations,
+            rebroadcast_interval=config.REBROADCAST_INTERVAL,
+            blockhashes=self.blockhashes
+        )
+        self._owns_tx_sender = tx_sender is None
+        self.pool_index = pool_index
+        self.swap_builder = None
         
         # Trading parameters
         self.MAX_TOKEN_AGE = 120  # 2 minutes in seconds
@@ -59,11 +116,34 @@ class TradingAgent:
                 self.logger.error("Wallet manager not initialized")
                 return False
             
-            balance = await self.wallet_manager.check_balance()
+            if self._owns_priority_fees:
+                await self.priority_fees.start()
+            if self._owns_confirmations:
+                await self.confirmations.start()
+            if self._owns_blockhashes:
+                await self.blockhashes.start()
+
+            if self._owns_balance_ledger:
+                self.balance_ledger = BalanceLedger(
+                    config.RPC_ENDPOINT,
+                    self.wallet_manager.phantom_public_key,
+                    session=self.http_pool
+                )
+                await self.balance_ledger.start()
+
+            self.token_accounts = TokenAccountCache(self.wallet_manager.phantom_public_key)
+            await self.token_accounts.load(self.http_pool, config.RPC_ENDPOINT)
+            self.swap_builder = RaydiumSwapBuilder(
+                self.wallet_manager.phantom_public_key,
+                token_accounts=self.token_accounts
+            )
+
+            balance = self.balance_ledger.balance
             self.logger.info(
                 f"Trading agent initialized:\n"
                 f"  Wallet connected: {self.wallet_manager.phantom_public_key}\n"
-                f"  Balance: {balance:.4f} SOL"
+                f"  Balance: {balance:.4f} SOL\n"
+                f"  Token accounts: {len(self.token_accounts)}"
             )
             
             self.is_initialized = True
@@ -73,39 +153,42 @@ class TradingAgent:
             self.logger.error(f"Trading agent initialization failed: {str(e)}")
             return False
 
-    async def handle_new_token(self, token_data):
+    async def handle_new_tokens(self, tokens):
+        """Handle a micro-batch of new tokens from scout agent
+
+        Quotes or pool state for every candidate that passes the cheap
+        checks start loading on delivery, so they are ready by the time
+        the candidates ahead of it have been handled.
+        """
+        received_at = time.perf_counter()
+        for token_data in tokens:
+            if self._skip_reason(token_data) is None:
+                self._prefetch_buy_quote(token_data, self.POSITION_SIZE)
+        try:
+            for token_data in tokens:
+                await self.handle_new_token(token_data, received_at)
+        finally:
+            for token_data in tokens:
+                self._cancel_prefetch(token_data.get('address'))
+
+    async def handle_new_token(self, token_data, received_at=None):
         """Handle new token from scout agent"""
+        received_at = received_at or time.perf_counter()
         try:
             self.logger.info(f"\n🔄 Processing token: {token_data['symbol']}")
             
-            # Skip if maximum trades reached
-            if len(self.active_trades) >= self.MAX_TRADES:
-                self.logger.info("Maximum active trades reached, skipping")
-                return
-            
-            # Skip if token already traded
-            if token_data['address'] in self.active_trades:
-                self.logger.info("Token already in active trades, skipping")
-                return
-            
             # Check token age
             token_age = time.time() - token_data.get('created_at', 0)
             self.logger.info(f"Token age: {token_age:.1f} seconds")
-            
-            if token_age > self.MAX_TOKEN_AGE:
-                self.logger.info(f"Token too old (>{self.MAX_TOKEN_AGE}s), skipping")
-                return
-            
-            # Check wallet balance
-            balance = await self.wallet_manager.check_balance()
-            self.logger.info(f"Wallet balance: {balance:.4f} SOL")
-            
-            if balance < self.POSITION_SIZE:
-                self.logger.info(f"Insufficient balance for {self.POSITION_SIZE} SOL trade")
+
+            # Skip if maximum trades reached, token already traded or too old
+            skip_reason = self._skip_reason(token_data)
+            if skip_reason:
+                self.logger.info(skip_reason)
                 return
             
             self.logger.info(f"Attempting to buy {token_data['symbol']}...")
-            success = await self._execute_buy_order(token_data, self.POSITION_SIZE)
+            success = await self._execute_buy_order(token_data, self.POSITION_SIZE, received_at)
             
             if success:
                 self.active_trades[token_data['address']] = {
@@ -114,6 +197,7 @@ class TradingAgent:
                     'position_size': self.POSITION_SIZE,
                     'entry_time': time.time()
                 }
+                self.price_oracle.track(token_data['address'])
                 
                 self.logger.info(
                     f"\n✅ Trade Opened:\n"
@@ -126,34 +210,44 @@ class TradingAgent:
             
         except Exception as e:
             self.logger.error(f"Error handling token {token_data.get('symbol')}: {str(e)}")
+        finally:
+            # Used or rejected, a prefetched quote or pool state is of no further use
+            self._cancel_prefetch(token_data.get('address'))
+
+    def _skip_reason(self, token_data):
+        """Why a token won't be bought, None if it passes the cheap checks"""
+        if len(self.active_trades) >= self.MAX_TRADES:
+            return "Maximum active trades reached, skipping"
+        if token_data['address'] in self.active_trades:
+            return "Token already in active trades, skipping"
+        if time.time() - token_data.get('created_at', 0) > self.MAX_TOKEN_AGE:
+            return f"Token too old (>{self.MAX_TOKEN_AGE}s), skipping"
+        return None
 
     async def monitor_active_trades(self):
         """Monitor active trades for take profit/stop loss"""
         while True:
             try:
+                # One batched lookup for every position, shared with the oracle's own polling
+                prices = await self.price_oracle.get_prices(list(self.active_trades))
                 for address, trade in list(self.active_trades.items()):
-                    # Get current price from Jupiter
-                    price_url = f"https://price.jup.ag/v4/price?ids={address}"
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(price_url) as response:
-                            if response.status == 200:
-                                price_data = await response.json()
-                                if price_data['data'].get(address):
-                                    current_price = float(price_data['data'][address]['price'])
-                                    
-                                    # Calculate profit/loss
-                                    entry_price = trade['entry_price']
-                                    price_change = (current_price - entry_price) / entry_price
-                                    
-                                    # Take profit at 50%
-                                    if price_change >= self.TAKE_PROFIT:
-                                        self.logger.info(f"Take profit triggered for {trade['token_data']['symbol']}")
-                                        await self._execute_sell_order(address, trade, "TAKE_PROFIT")
-                                    
-                                    # Stop loss at -20%
-                                    elif price_change <= self.STOP_LOSS:
-                                        self.logger.info(f"Stop loss triggered for {trade['token_data']['symbol']}")
-                                        await self._execute_sell_order(address, trade, "STOP_LOSS")
+                    current_price = prices.get(address)
+                    if current_price is None:
+                        continue
+                    
+                    # Calculate profit/loss
+                    entry_price = trade['entry_price']
+                    price_change = (current_price - entry_price) / entry_price
+                    
+                    # Take profit at 50%
+                    if price_change >= self.TAKE_PROFIT:
+                        self.logger.info(f"Take profit triggered for {trade['token_data']['symbol']}")
+                        await self._execute_sell_order(address, trade, "TAKE_PROFIT")
+                    
+                    # Stop loss at -20%
+                    elif price_change <= self.STOP_LOSS:
+                        self.logger.info(f"Stop loss triggered for {trade['token_data']['symbol']}")
+                        await self._execute_sell_order(address, trade, "STOP_LOSS")
                 
                 await asyncio.sleep(1)  # Check every second
                 
@@ -162,7 +256,7 @@ class TradingAgent:
                 await asyncio.sleep(1)
 
     async def close_position(self, exit_signal):
-        """Close position using Raydium API"""
+        """Close position with a native Raydium swap, falling back to the Raydium API"""
         try:
             token_address = exit_signal['token_address']
             trade_info = self.active_trades.get(token_address)
@@ -170,75 +264,119 @@ class TradingAgent:
                 self.logger.error(f"No active trade found for token {token_address}")
                 return False
             
-            # Calculate optimal slippage for this sell
-            slippage = await self._calculate_optimal_slippage(
-                trade_info['token_data'],
-                trade_info['position_size'],
-                is_buy=False
-            )
-            
-            async with aiohttp.ClientSession() as session:
-                # Get quote for selling
-                quote_response = await self._execute_with_retry(
-                    session.get,
-                    f"{config.RAYDIUM_API_URL}/compute/swap-base-out",
-                    params={
-                        'inputMint': token_address,
-                        'outputMint': 'So11111111111111111111111111111111111111112',
-                        'amount': str(trade_info['position_size']),
-                        'slippageBps': int(slippage * 100),  # Dynamic slippage
-                        'txVersion': 'V0'
-                    }
-                )
-                quote_data = await quote_response.json()
-
-                # 2. Get transaction from Raydium API
-                priority_fee = await self._get_priority_fee()
-                swap_response = await self._execute_with_retry(
-                    session.post,
-                    f"{config.RAYDIUM_API_URL}/transaction/swap-base-out",
-                    json={
-                        'computeUnitPriceMicroLamports': priority_fee,
-                        'swapResponse': quote_data,
-                        'txVersion': 'V0',
-                        'wallet': str(self.wallet_manager.phantom_public_key),
-                        'wrapSol': True,
-                        'unwrapSol': False
-                    }
-                )
-                swap_data = await swap_response.json()
+            urgency = 'stop_loss' if 'stop' in str(exit_signal.get('reason', '')).lower() else 'exit'
 
-                # 3. Deserialize and execute transaction
-                tx_bytes = base64.b64decode(swap_data['data'][0]['transaction'])
-                transaction = Transaction.deserialize(tx_bytes)
-                
-                # 4. Sign and send
-                transaction.sign([self.wallet_manager.keypair])
-                txid = await self.wallet_manager.client.send_transaction(
-                    transaction,
-                    opts={'skipPreflight': True}
-                )
+            # Sell straight against the pool, falling back to the Raydium API
+            txid = await self._sell_native(token_address, trade_info, urgency)
+            if txid is None:
+                txid = await self._sell_via_api(token_address, trade_info, urgency)
 
-                if not await self._wait_for_confirmation(txid):
-                    raise TransactionError("Transaction failed to confirm")
+            if not await self._wait_for_confirmation(txid):
+                raise TransactionError("Transaction failed to confirm")
 
-                self.logger.info(f"Sell transaction sent: {txid}")
-                if txid:  # If transaction successful
-                    self.logger.info(
-                        f"\n[POSITION CLOSED]"
-                        f"\n  Token: {trade_info['token_data']['symbol']}"
-                        f"\n  Entry: ${trade_info['entry_price']:.8f}"
-                        f"\n  Exit: ${exit_signal['current_price']:.8f}"
-                        f"\n  P/L: {exit_signal['profit_percentage']:.2f}%"
-                        f"\n  Reason: {exit_signal['reason']}"
-                    )
-                    del self.active_trades[token_address]  # Remove the closed position
-                    return True
+            self.logger.info(f"Sell transaction sent: {txid}")
+            if txid:  # If transaction successful
+                self.logger.info(
+                    f"\n[POSITION CLOSED]"
+                    f"\n  Token: {trade_info['token_data']['symbol']}"
+                    f"\n  Entry: ${trade_info['entry_price']:.8f}"
+                    f"\n  Exit: ${exit_signal['current_price']:.8f}"
+                    f"\n  P/L: {exit_signal['profit_percentage']:.2f}%"
+                    f"\n  Reason: {exit_signal['reason']}"
+                )
+                del self.active_trades[token_address]  # Remove the closed position
+                self.price_oracle.untrack(token_address)
+                return True
 
         except Exception as e:
             self.logger.error(f"Sell order failed: {str(e)}")
             return False
 
+    async def _sell_native(self, token_address, trade_info, urgency):
+        """Sell the whole token balance with a locally quoted and built Raydium swap
+
+        Returns None when there is no pool state or balance to sell natively.
+        """
+        if self.swap_builder is None:
+            return None
+        try:
+            pool_info = self.local_quoter.get_pool(token_address)
+            if pool_info is None:
+                await self._refresh_pool_state(token_address)
+                pool_info = self.local_quoter.get_pool(token_address)
+            if pool_info is None:
+                return None
+
+            balance = await self.wallet_manager.client.get_token_account_balance(
+                self._get_token_account(token_address)
+            )
+            amount = int(balance.value.amount)
+            if not amount:
+                return None
+
+            slippage = await self._calculate_optimal_slippage(trade_info['token_data'], amount, is_buy=False)
+            quote = quote_swap(pool_info, token_address, amount, slippage / 100)
+            priority_fee, blockhash = await asyncio.gather(
+                self._get_priority_fee(urgency),
+                self._get_recent_blockhash()
+            )
+            transaction = await self._sign_swap(
+                self.swap_builder.build_from_quote(pool_info, quote, priority_fee),
+                blockhash
+            )
+            return await self.tx_sender.send(transaction)
+
+        except Exception as e:
+            self.logger.warning(f"Native sell unavailable, using Raydium API: {str(e)}")
+            return None
+
+    async def _sell_via_api(self, token_address, trade_info, urgency):
+        """Sell through the Raydium quote and transaction API"""
+        # Calculate optimal slippage for this sell
+        slippage = await self._calculate_optimal_slippage(
+            trade_info['token_data'],
+            trade_info['position_size'],
+            is_buy=False
+        )
+        
+        # Get quote for selling
+        quote_response = await self._execute_with_retry(
+            self.http_pool.get,
+            f"{config.RAYDIUM_API_URL}/compute/swap-base-out",
+            params={
+                'inputMint': token_address,
+                'outputMint': 'So11111111111111111111111111111111111111112',
+                'amount': str(trade_info['position_size']),
+                'slippageBps': int(slippage * 100),  # Dynamic slippage
+                'txVersion': 'V0'
+            }
+        )
+        quote_data = await quote_response.json()
+
+        # 2. Get transaction from Raydium API
+        priority_fee = await self._get_priority_fee(urgency)
+        swap_response = await self._execute_with_retry(
+            self.http_pool.post,
+            f"{config.RAYDIUM_API_URL}/transaction/swap-base-out",
+            json={
+                'computeUnitPriceMicroLamports': priority_fee,
+                'swapResponse': quote_data,
+                'txVersion': 'V0',
+                'wallet': str(self.wallet_manager.phantom_public_key),
+                'wrapSol': True,
+                'unwrapSol': False
+            }
+        )
+        swap_data = await swap_response.json()
+
+        # 3. Deserialize and execute transaction
+        tx_bytes = base64.b64decode(swap_data['data'][0]['transaction'])
+        transaction = Transaction.deserialize(tx_bytes)
+        
+        # 4. Sign and send
+        transaction.sign([self.wallet_manager.keypair])
+        return await self.tx_sender.send(transaction)
+
     async def set_analysis_callback(self, price_callback, trade_callback):
         """Set analysis callbacks with validation"""
         if not callable(price_callback) or not callable(trade_callback):
@@ -308,77 +446,94 @@ class TradingAgent:
         for callback in self.analysis_callbacks:
             asyncio.create_task(callback['func'](trade_info))
 
-    async def _get_token_account(self, token_address):
-        """Get token account for a specific token"""
+    def _get_token_account(self, token_address):
+        """Token account for a specific token, from the local cache"""
+        return self.token_accounts.get(token_address)
+
+    def _token_account_instructions(self, token_address):
+        """Instructions creating our token account, empty once it is known to exist"""
+        return self.token_accounts.create_instructions(
+            token_address,
+            self.wallet_manager.phantom_public_key
+        )
+
+    async def _get_or_create_token_account(self, token_address):
+        """Get the token account address; creation rides along in the swap transaction"""
+        return self._get_token_account(token_address)
+
+    async def _get_pool_info(self, token_address):
+        """Raydium pool state for a token, resolved through the local pool index"""
+        return await get_pool_info(self.wallet_manager.client, token_address, pool_index=self.pool_index)
+
+    async def _refresh_pool_state(self, token_address):
         try:
-            # Get token accounts owned by wallet using Pubkey
-            response = await self.wallet_manager.client.get_token_accounts_by_owner(
-                self.wallet_manager.keypair.public_key(),
-                {'mint': Pubkey.from_string(token_address)},
-                commitment=Confirmed
-            )
-            
-            accounts = response['result']['value']
-            if accounts:
-                return accounts[0]['pubkey']
-                
-            return None
-            
+            self.local_quoter.update(token_address, await self._get_pool_info(token_address))
         except Exception as e:
-            self.logger.error(f"Error getting token account: {str(e)}")
-            return None
-            
-    async def _create_token_account(self, token_address):
-        """Create a new token account"""
-        try:
-            # Create minimum rent exempt balance instruction
-            rent = await self.wallet_manager.client.get_minimum_balance_for_rent_exemption(
-                165  # Token account size
-            )
-            
-            # Create new account
-            new_account = Keypair()
-            
-            # Create token account instruction
-            create_account_ix = create_account(
-                CreateAccountParams(
-                    from_pubkey=self.wallet_manager.phantom_public_key,
-                    new_account_pubkey=new_account.public_key(),
-                    lamports=rent['result'],
-                    space=165,
-                    program_id=TOKEN_PROGRAM_ID
-                )
-            )
-            
-            # Create and send transaction
-            transaction = Transaction()
-            transaction.add(create_account_ix)
-            
-            result = await self.wallet_manager.sign_and_send_transaction(
-                transaction,
-                {"skipPreflight": True}
+            self.logger.debug(f"No local pool state for {token_address}: {str(e)}")
+        finally:
+            self._pool_refreshes.pop(token_address, None)
+
+    def _prefetch_pool_state(self, token_address):
+        """Load pool reserves in the background so quotes can be computed locally
+
+        Only for mints the pool index knows - anything else has no AMM v4
+        pool to read.
+        """
+        if self.pool_index is None or token_address not in self.pool_index:
+            return
+        if token_address not in self._pool_refreshes:
+            self._pool_refreshes[token_address] = asyncio.create_task(
+                self._refresh_pool_state(token_address)
             )
-            
-            if not result:
-                raise TokenAccountError("Failed to create token account")
-                
-            return new_account.public_key()
-            
-        except Exception as e:
-            self.logger.error(f"Error creating token account: {str(e)}")
-            raise TokenAccountError(f"Token account creation failed: {str(e)}")
 
-    async def _get_or_create_token_account(self, token_address):
-        """Get existing token account or create new one"""
-        account = await self._get_token_account(token_address)
-        if account:
-            return account
-            
-        return await self._create_token_account(token_address)
+    def _has_native_pool(self, token_address):
+        """Whether a buy can be built locally: fresh pool state or an indexed pool to load it from"""
+        if self.swap_builder is None:
+            return False
+        if self.local_quoter.get_pool(token_address) is not None:
+            return True
+        return self.pool_index is not None and token_address in self.pool_index
+
+    async def _wait_for_pool_state(self, token_address):
+        """Fresh pool state for a buy, or None if it doesn't arrive within POOL_STATE_WAIT"""
+        pool_info = self.local_quoter.get_pool(token_address)
+        if pool_info is not None:
+            return pool_info
+        self._prefetch_pool_state(token_address)
+        refresh = self._pool_refreshes.get(token_address)
+        if refresh is not None:
+            # A slow refresh keeps running; the buy just stops waiting for it
+            await asyncio.wait({refresh}, timeout=POOL_STATE_WAIT)
+        return self.local_quoter.get_pool(token_address)
+
+    def _cancel_pool_refresh(self, token_address):
+        task = self._pool_refreshes.pop(token_address, None)
+        if task:
+            task.cancel()
+
+    def _cancel_prefetch(self, token_address):
+        self.quote_cache.cancel(token_address)
+        self._cancel_pool_refresh(token_address)
 
     async def _calculate_optimal_slippage(self, token_data, trade_amount, is_buy=True):
         """Calculate optimal slippage based on market conditions"""
         try:
+            # Exact price impact from fresh pool reserves when we have them
+            input_mint = SOL_MINT if is_buy else token_data['address']
+            # Sells are sized in raw token units; a SOL position size (e.g. 0.1) rounds to 0
+            # and is left to the liquidity estimate below
+            amount_in = int(trade_amount * 1e9) if is_buy else int(trade_amount)
+            quote = self.local_quoter.quote(token_data['address'], input_mint, amount_in) if amount_in > 0 else None
+            if quote is not None:
+                buffer = 1.0 if is_buy else 0.5
+                max_slippage = 5.0 if is_buy else 3.0
+                final_slippage = min(quote['price_impact'] * 100 + buffer, max_slippage)
+                self.logger.info(
+                    f"Calculated slippage: {final_slippage:.2f}%\n"
+                    f"  Price impact: {quote['price_impact'] * 100:.2f}% (local quote)"
+                )
+                return final_slippage
+
             # Get pool liquidity
             liquidity = float(token_data.get('liquidity', 0))
             
@@ -417,93 +572,198 @@ class TradingAgent:
             self.logger.error(f"Error calculating slippage: {str(e)}")
             return 1.0  # Default to 1% if calculation fails
 
-    async def _execute_buy_order(self, token_data, amount_sol):
-        """Execute buy order using Jupiter Swap API"""
+    async def _execute_buy_order(self, token_data, amount_sol, received_at=None):
+        """Execute buy order, natively against Raydium or through Jupiter Swap API
+
+        Independent network steps run concurrently, so the time to send is
+        the longest dependency chain instead of the sum of every call:
+
+            quote ───────┬─ swap ─┬─ sign ─ send ─ confirm
+            priority_fee ┘        │
+            blockhash ────────────┘
+
+        Mints with an indexed AMM v4 pool get a pool step first, waiting
+        briefly for fresh reserves. With them, quote and swap are computed
+        in-process and no quote/swap API call is made at all.
+
+        Funds are reserved in the local balance ledger first, so an
+        unaffordable trade is rejected without any network call.
+        """
         try:
-            # Create session for Jupiter API
-            async with aiohttp.ClientSession() as session:
-                # 1. Get quote from Jupiter
-                quote_url = "https://quote-api.jup.ag/v6/quote"
-                params = {
-                    'inputMint': 'So11111111111111111111111111111111111111112',  # SOL
-                    'outputMint': token_data['address'],
-                    'amount': str(int(amount_sol * 1e9)),  # Convert SOL to lamports
-                    'slippageBps': '1000',  # 10% slippage for new tokens
-                    'onlyDirectRoutes': 'true',
-                    'asLegacyTransaction': 'true'
-                }
-                
-                self.logger.info(f"Getting Jupiter quote for {token_data['symbol']}...")
-                async with session.get(quote_url, params=params) as response:
-                    if response.status != 200:
-                        raise Exception(f"Jupiter quote error: {await response.text()}")
-                    quote_data = await response.json()
-
-                # 2. Get swap transaction
-                swap_url = "https://quote-api.jup.ag/v6/swap"
-                swap_data = {
-                    'quoteResponse': quote_data,
-                    'userPublicKey': str(self.wallet_manager.phantom_public_key),
-                    'wrapUnwrapSOL': True,
-                    'computeUnitPriceMicroLamports': 50000,  # Higher priority
-                    'asLegacyTransaction': True
-                }
-                
-                self.logger.info("Getting swap transaction...")
-                async with session.post(swap_url, json=swap_data) as response:
-                    if response.status != 200:
-                        raise Exception(f"Jupiter swap error: {await response.text()}")
-                    transaction_data = await response.json()
-
-                # 3. Sign and send transaction
-                tx_bytes = base64.b64decode(transaction_data['swapTransaction'])
-                transaction = Transaction.deserialize(tx_bytes)
-                transaction.sign(self.wallet_manager.keypair)
-                
-                # 4. Send with retries
-                for attempt in range(3):
-                    try:
-                        txid = await self.wallet_manager.client.send_transaction(
-                            transaction,
-                            opts={'skipPreflight': True}
-                        )
-                        
-                        self.logger.info(f"Transaction sent: {txid}")
-                        
-                        # Wait for confirmation
-                        await self.wallet_manager.client.confirm_transaction(
-                            txid,
-                            commitment="confirmed"
-                        )
-                        
-                        self.logger.info("Transaction confirmed!")
-                        return True
-                        
-                    except Exception as e:
-                        if attempt == 2:  # Last attempt
-                            raise
-                        self.logger.warning(f"Retry {attempt + 1}/3: {str(e)}")
-                        await asyncio.sleep(1)
-                
-                return False
+            priority_fee = await self._get_priority_fee()
+            reservation = self.balance_ledger.reserve(
+                self._buy_cost_sol(token_data['address'], amount_sol, priority_fee)
+            )
+        except InsufficientBalanceError as e:
+            self.logger.info(str(e))
+            return False
+
+        graph = TaskGraph()
+        graph.add('priority_fee', self._get_priority_fee)
+        graph.add('blockhash', self._get_recent_blockhash)
+        if self._has_native_pool(token_data['address']):
+            graph.add('pool', lambda: self._wait_for_pool_state(token_data['address']))
+            graph.add('quote', lambda pool: self._get_local_buy_quote(pool, amount_sol), 'pool')
+            graph.add('swap', lambda pool, quote, priority_fee: self._build_native_buy(
+                token_data, amount_sol, pool, quote, priority_fee
+            ), 'pool', 'quote', 'priority_fee')
+        else:
+            graph.add('quote', lambda: self._get_buy_quote(token_data, amount_sol))
+            graph.add('swap', self._build_swap, 'quote', 'priority_fee')
+        graph.add('sign', self._sign_swap, 'swap', 'blockhash')
+        graph.add('send', lambda sign: self._send_swap(sign), 'sign')
+        graph.add('confirm', self._confirm_swap, 'send')
+
+        try:
+            results = await graph.run()
+            self.balance_ledger.settle(reservation, results['confirm']['slot'])
+            self.token_accounts.mark_created(token_data['address'])
+            return True
 
         except Exception as e:
+            self.balance_ledger.release(reservation)
             self.logger.error(f"Buy order failed: {str(e)}")
             return False
+        finally:
+            self._record_buy_timing(token_data, graph, received_at)
+
+    def _buy_cost_sol(self, token_address, amount_sol, priority_fee):
+        """Everything a buy spends: the position, the transaction fee and any new token account's rent"""
+        lamports = int(amount_sol * 1e9) + BASE_FEE_LAMPORTS
+        lamports += int(priority_fee) * DEFAULT_COMPUTE_UNITS // 1_000_000
+        if self.token_accounts is None or not self.token_accounts.exists(token_address):
+            lamports += TOKEN_ACCOUNT_RENT
+        return lamports / 1e9
+
+    async def _get_recent_blockhash(self):
+        """Blockhash served from the background cache"""
+        return await self.blockhashes.get_blockhash()
+
+    def _prefetch_buy_quote(self, token_data, amount_sol):
+        """Start loading whatever the buy will be quoted from
+
+        Pool state for a native buy; a Jupiter quote only when there is no
+        pool to buy from natively. If the pool state then doesn't arrive in
+        time, the buy asks Jupiter itself.
+        """
+        if self._has_native_pool(token_data['address']):
+            self._prefetch_pool_state(token_data['address'])
+            return
+        lamports = int(amount_sol * 1e9)
+        self.quote_cache.prefetch(
+            token_data['address'],
+            lamports,
+            BUY_SLIPPAGE_BPS,
+            lambda: self._fetch_buy_quote(token_data['address'], lamports)
+        )
+
+    async def _get_buy_quote(self, token_data, amount_sol):
+        """Get a Jupiter quote for buying the token with SOL, prefetched if still fresh"""
+        lamports = int(amount_sol * 1e9)  # Convert SOL to lamports
+        quote = await self.quote_cache.get(token_data['address'], lamports, BUY_SLIPPAGE_BPS)
+        if quote is not None:
+            return quote
+
+        self.logger.info(f"Getting Jupiter quote for {token_data['symbol']}...")
+        return await self._fetch_buy_quote(token_data['address'], lamports)
+
+    async def _fetch_buy_quote(self, mint, lamports):
+        params = {
+            'inputMint': SOL_MINT,
+            'outputMint': mint,
+            'amount': str(lamports),
+            'slippageBps': str(BUY_SLIPPAGE_BPS),
+            'onlyDirectRoutes': 'true',
+            'asLegacyTransaction': 'true'
+        }
+        async with self.http_pool.get(JUPITER_QUOTE_URL, params=params) as response:
+            if response.status != 200:
+                raise Exception(f"Jupiter quote error: {await response.text()}")
+            return await response.json()
+
+    async def _build_swap(self, quote, priority_fee):
+        """Get the swap transaction for a quote"""
+        swap_data = {
+            'quoteResponse': quote,
+            'userPublicKey': str(self.wallet_manager.phantom_public_key),
+            'wrapUnwrapSOL': True,
+            'computeUnitPriceMicroLamports': priority_fee,
+            'asLegacyTransaction': True
+        }
+        
+        self.logger.info("Getting swap transaction...")
+        async with self.http_pool.post(JUPITER_SWAP_URL, json=swap_data) as response:
+            if response.status != 200:
+                raise Exception(f"Jupiter swap error: {await response.text()}")
+            swap = await response.json()
+        return Transaction.deserialize(base64.b64decode(swap['swapTransaction']))
 
-    async def _get_priority_fee(self):
-        """Get recommended priority fee from Raydium"""
+    async def _get_local_buy_quote(self, pool_info, amount_sol):
+        """Quote a SOL → token buy from cached pool reserves, None if there are none or they can't quote it"""
+        if pool_info is None:
+            return None
         try:
-            async with aiohttp.ClientSession() as session:
-                response = await self._execute_with_retry(
-                    session.get,
-                    f"{config.RAYDIUM_API_URL}/priority-fee"
-                )
-                data = await response.json()
-                return str(data['data']['default']['high'])
+            return quote_swap(pool_info, SOL_MINT, int(amount_sol * 1e9), BUY_SLIPPAGE_BPS / 10_000)
         except Exception as e:
-            self.logger.error(f"Error getting priority fee: {str(e)}")
-            return "1000"  # Default fallback fee
+            self.logger.warning(f"Local quote failed: {str(e)}")
+            return None
+
+    async def _build_native_swap(self, pool_info, quote, priority_fee):
+        """Raydium swap transaction built locally from a cached instruction template"""
+        return self.swap_builder.build_from_quote(pool_info, quote, priority_fee)
+
+    async def _build_native_buy(self, token_data, amount_sol, pool_info, quote, priority_fee):
+        """Native buy transaction, or the Jupiter one if the pool can't be loaded, quoted or built locally"""
+        if quote is not None:
+            try:
+                return await self._build_native_swap(pool_info, quote, priority_fee)
+            except Exception as e:
+                self.logger.warning(f"Native swap build failed, using Jupiter: {str(e)}")
+        return await self._build_swap(await self._get_buy_quote(token_data, amount_sol), priority_fee)
+
+    async def _sign_swap(self, swap, blockhash):
+        # Our own blockhash is at least as fresh as the one the API built with
+        swap.recent_blockhash = blockhash
+        swap.sign(self.wallet_manager.keypair)
+        return swap
+
+    async def _send_swap(self, transaction):
+        """Race the transaction to every RPC endpoint"""
+        return await self.tx_sender.send(transaction)
+
+    async def _confirm_swap(self, send):
+        status = await self.tx_sender.confirm(send)
+        self.logger.info(f"Transaction confirmed in {status['confirm_ms']:.0f}ms")
+        return status
+
+    def _record_buy_timing(self, token_data, graph, received_at):
+        """Keep the per-step and critical-path breakdown of one buy"""
+        if 'send' not in graph.timings:
+            return
+        queued_ms = (graph.started - received_at) * 1000 if received_at else 0.0
+        path = graph.critical_path('send')
+        timing = {
+            'token': token_data['address'],
+            'steps': graph.durations(),
+            'critical_path': path,
+            'detection_to_send_ms': queued_ms + graph.finished_at('send')
+        }
+        self.buy_timings.append(timing)
+        self.logger.info(
+            f"⏱️ Sent in {timing['detection_to_send_ms']:.0f}ms - critical path: "
+            + " → ".join(f"{name} {ms:.0f}ms" for name, ms in path)
+        )
+
+    async def _get_priority_fee(self, urgency='entry'):
+        """Priority fee for an urgency tier, served from the background estimator"""
+        fee = self.priority_fees.get_fee(urgency)
+        if urgency == 'entry':
+            return max(fee, MIN_BUY_PRIORITY_FEE)
+        return fee
+
+    def get_quote_cache_stats(self):
+        """Prefetch hit rate and latency saved"""
+        return self.quote_cache.get_stats()
 
     def get_execution_time(self):
         return sum(self.execution_times) / len(self.execution_times) if self.execution_times else 0
@@ -511,11 +771,25 @@ class TradingAgent:
     async def cleanup(self):
         """Cleanup resources"""
         try:
-            # Close session if exists
-            if self.session:
-                await self.session.close()
-                self.session = None
+            # Stop the oracle and fee estimator and close the HTTP pool unless they were shared with us
+            if self._owns_price_oracle:
+                await self.price_oracle.stop()
+            if self._owns_priority_fees:
+                await self.priority_fees.stop()
+            if self._owns_balance_ledger and self.balance_ledger:
+                await self.balance_ledger.stop()
+            if self._owns_tx_sender:
+                await self.tx_sender.close()
+            if self._owns_confirmations:
+                await self.confirmations.stop()
+            if self._owns_blockhashes:
+                await self.blockhashes.stop()
+            if self._owns_http_pool:
+                await self.http_pool.close()
                 
+            for task in list(self._pool_refreshes.values()):
+                task.cancel()
+
             # Clear trades and state
             self.active_trades.clear()
             self.execution_times.clear()
@@ -612,10 +886,7 @@ class TradingAgent:
     async def _wait_for_confirmation(self, signature):
         """Wait for transaction confirmation"""
         try:
-            await self.wallet_manager.client.confirm_transaction(
-                signature,
-                commitment="confirmed"
-            )
+            await self.tx_sender.confirm(signature)
             return True
         except Exception as e:
             self.logger.error(f"Transaction confirmation failed: {str(e)}")
@@ -625,10 +896,7 @@ class TradingAgent:
         """Submit transaction with retries"""
         for attempt in range(retries):
             try:
-                txid = await self.wallet_manager.client.send_transaction(
-                    transaction,
-                    opts={'skipPreflight': True}
-                )
+                txid = await self.tx_sender.send(transaction)
                 if await self._wait_for_confirmation(txid):
                     return txid
             except Exception as e:
@@ -654,9 +922,8 @@ class TradingAgent:
                         continue
                     
                     # Check wallet balance
-                    balance = await self.wallet_manager.check_balance()
-                    if balance < config.POSITION_SIZE_SOL:
-                        self.logger.info(f"Insufficient balance: {balance:.4f} SOL")
+                    if not self.balance_ledger.can_afford(config.POSITION_SIZE_SOL):
+                        self.logger.info(f"Insufficient balance: {self.balance_ledger.balance:.4f} SOL")
                         continue
                     
                     # Execute buy
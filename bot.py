@@ -1,9 +1,19 @@
 import asyncio
-from agents.scout_agent import ScoutAgent
+from agents.scout_agent import AsyncScoutAgent
 from agents.trading_agent import TradingAgent
-from agents.analysis_agent import AnalysisAgent
+from services.raydium_pools import RaydiumPoolFeed
 from utils.wallet_manager import WalletManager
 from utils.logger import setup_logger
+from utils.config import config, RAYDIUM_API_URL
+from utils.performance_monitor import PerformanceMonitor
+from utils.http_client import HttpClientPool
+from services.price_oracle import PriceOracle
+from services.priority_fees import PriorityFeeEstimator
+from services.balance_ledger import BalanceLedger
+from services.confirmations import ConfirmationService
+from services.tx_sender import RacingSender
+from services.blockhash_cache import BlockhashCache
+from utils.pool_index import PoolIndex
 from datetime import datetime
 
 def setup_bot_logger():
@@ -18,6 +28,15 @@ class TradingBot:
         self.scout_agent = None
         self.trading_agent = None
         self.wallet_manager = None
+        self.http_pool = None
+        self.price_oracle = None
+        self.priority_fees = None
+        self.balance_ledger = None
+        self.confirmations = None
+        self.tx_sender = None
+        self.blockhashes = None
+        self.pool_index = None
+        self.performance_monitor = PerformanceMonitor()
         self._tasks = []
         self.logger.info("TradingBot initialized")
 
@@ -26,26 +45,119 @@ class TradingBot:
         try:
             self.logger.info("Initializing components...")
 
+            # One HTTP pool shared by every agent
+            self.http_pool = HttpClientPool(
+                limit_per_host=config.HTTP_LIMIT_PER_HOST,
+                keepalive_timeout=config.HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=config.HTTP_DNS_CACHE_TTL
+            )
+            await self.http_pool.prewarm(config.HTTP_PREWARM_URLS)
+            self.performance_monitor.register_stats_source('http', self.http_pool.get_stats)
+
+            # Live prices for every open position
+            self.price_oracle = PriceOracle(
+                session=self.http_pool,
+                interval=config.CHECK_INTERVAL,
+                ttl=config.CHECK_INTERVAL
+            )
+
+            # Fee model sampled in the background, read from memory when trading
+            self.priority_fees = PriorityFeeEstimator(
+                config.RPC_ENDPOINT,
+                session=self.http_pool,
+                raydium_url=RAYDIUM_API_URL
+            )
+            await self.priority_fees.start()
+            self.performance_monitor.register_stats_source('priority_fees', self.priority_fees.get_stats)
+
+            # One websocket confirms every transaction in flight
+            self.confirmations = ConfirmationService(config.RPC_ENDPOINT, session=self.http_pool)
+            await self.confirmations.start()
+            self.performance_monitor.register_stats_source('confirmations', self.confirmations.get_stats)
+
+            # Blockhash and block height refreshed in the background, read from memory when signing
+            self.blockhashes = BlockhashCache(
+                config.RPC_ENDPOINT,
+                session=self.http_pool,
+                interval=config.BLOCKHASH_REFRESH_INTERVAL
+            )
+            await self.blockhashes.start()
+            self.performance_monitor.register_stats_source('blockhash', self.blockhashes.get_stats)
+
+            # Every signed transaction goes to all configured RPC endpoints at once
+            self.tx_sender = RacingSender(
+                config.RPC_ENDPOINTS,
+                session=self.http_pool,
+                confirmations=self.confirmations,
+                rebroadcast_interval=config.REBROADCAST_INTERVAL,
+                blockhashes=self.blockhashes
+            )
+            self.performance_monitor.register_stats_source('rpc_endpoints', self.tx_sender.get_stats)
+
             # Initialize wallet manager
             self.wallet_manager = WalletManager()
             if not await self.wallet_manager.initialize():
                 raise Exception("Failed to initialize wallet manager")
             self.logger.info("Wallet manager initialized")
+            self.performance_monitor.register_stats_source('rpc_pool', self.wallet_manager.get_rpc_stats)
+
+            # Mint -> pool lookups stay local; new pools arrive from the pool feed
+            self.pool_index = PoolIndex()
+            self.performance_monitor.register_stats_source('pool_index', self.pool_index.memory_stats)
+
+            # Balance tracked locally so buys never wait on getBalance
+            self.balance_ledger = BalanceLedger(
+                config.RPC_ENDPOINT,
+                self.wallet_manager.phantom_public_key,
+                session=self.http_pool
+            )
+            await self.balance_ledger.start()
+            self.performance_monitor.register_stats_source('balance', self.balance_ledger.get_stats)
 
             # Initialize trading agent
-            self.trading_agent = TradingAgent(self.wallet_manager)
+            self.trading_agent = TradingAgent(
+                self.wallet_manager,
+                http_pool=self.http_pool,
+                price_oracle=self.price_oracle,
+                priority_fees=self.priority_fees,
+                balance_ledger=self.balance_ledger,
+                confirmations=self.confirmations,
+                tx_sender=self.tx_sender,
+                pool_index=self.pool_index,
+                blockhashes=self.blockhashes
+            )
             if not await self.trading_agent.initialize():
                 raise Exception("Failed to initialize trading agent")
+            self.performance_monitor.register_stats_source(
+                'quote_cache', self.trading_agent.get_quote_cache_stats
+            )
             self.logger.info("Trading agent initialized")
 
             # Initialize scout agent
-            self.scout_agent = ScoutAgent()
+            pool_feed = None
+            if config.POOL_FEED_ENABLED:
+                pool_feed = RaydiumPoolFeed(
+                    config.RPC_ENDPOINT,
+                    session=self.http_pool,
+                    transport=config.POOL_FEED_TRANSPORT,
+                    poll_interval=config.POOL_FEED_POLL_INTERVAL
+                )
+                await pool_feed.subscribe(self.pool_index.on_pool_created)
+            self.scout_agent = AsyncScoutAgent(
+                session=self.http_pool,
+                cache_size=config.TOKEN_CACHE_SIZE,
+                pool_feed=pool_feed,
+                max_age=config.MAX_AGE
+            )
             if not await self.scout_agent.initialize():
                 raise Exception("Failed to initialize scout agent")
             self.logger.info("Scout agent initialized")
+            self.performance_monitor.register_stats_source(
+                'known_tokens', self.scout_agent.known_tokens.memory_stats
+            )
 
-            # Subscribe trading agent to scout agent
-            await self.scout_agent.subscribe(self.trading_agent.handle_new_token)
+            # Subscribe trading agent to scout agent - whole micro-batches, so quotes load on delivery
+            await self.scout_agent.subscribe(self.trading_agent.handle_new_tokens, batch=True)
             self.logger.info("Trading agent subscribed to scout agent")
 
             self.logger.info("All components initialized successfully")
@@ -64,8 +176,24 @@ class TradingBot:
                 await self.scout_agent.cleanup()
             if self.trading_agent:
                 await self.trading_agent.cleanup()
+            if self.balance_ledger:
+                await self.balance_ledger.stop()
+            if self.tx_sender:
+                await self.tx_sender.close()
+            if self.confirmations:
+                await self.confirmations.stop()
+            if self.blockhashes:
+                await self.blockhashes.stop()
             if self.wallet_manager:
                 await self.wallet_manager.cleanup()
+            if self.price_oracle:
+                await self.price_oracle.stop()
+            if self.priority_fees:
+                await self.priority_fees.stop()
+            if self.pool_index:
+                self.pool_index.close()
+            if self.http_pool:
+                await self.http_pool.close()
         except Exception as e:
             self.logger.error(f"Cleanup error: {str(e)}")
 
@@ -85,7 +213,13 @@ class TradingBot:
                     await self.scout_agent.start()
                     self.logger.info("Scout agent started")
                 
-                # Start trade monitoring
+                # Start price polling and trade monitoring
+                if self.price_oracle:
+                    await self.price_oracle.start()
+
+                if self.pool_index is not None and not self.pool_index.complete:
+                    self._tasks.append(asyncio.create_task(self._build_pool_index()))
+
                 if self.trading_agent:
                     monitor_task = asyncio.create_task(
                         self.trading_agent.monitor_active_trades()
@@ -102,6 +236,13 @@ class TradingBot:
             await self.cleanup_components()
             raise
 
+    async def _build_pool_index(self):
+        """One-off full scan when there is no complete pool index on disk yet"""
+        try:
+            await self.pool_index.build(self.wallet_manager.client)
+        except Exception as e:
+            self.logger.error(f"Pool index build failed: {str(e)}")
+
     async def _stop(self):
         """Stop the bot"""
         if not self.is_running:
@@ -139,6 +280,12 @@ class TradingBot:
             self.logger.error(f"Error getting monitored tokens: {str(e)}")
             return []
 
+    def get_live_prices(self):
+        """Latest price tick per tracked mint"""
+        if self.price_oracle and self.is_running:
+            return self.price_oracle.get_latest()
+        return {}
+
     def get_active_trades(self):
         """Get active trades from trading agent"""
         try:
@@ -1,8 +1,14 @@
 from agents.scout_agent import ScoutAgent
-import time
+import asyncio
 import signal
 import sys
 
+async def watch_tokens(scout):
+    """Print new tokens as the scout pushes them"""
+    async for batch in scout.stream(max_batch=20, max_wait_ms=250):
+        for token in batch:
+            print(f"\n💎 New token found: {token['symbol']}")
+
 def main():
     # Create scout agent
     scout = ScoutAgent()
@@ -21,11 +27,7 @@ def main():
             scout.start()
             
             # Keep running and display new tokens
-            while True:
-                token = scout.get_new_tokens(timeout=1)
-                if token:
-                    print(f"\n💎 New token found: {token['symbol']}")
-                time.sleep(0.1)
+            asyncio.run(watch_tokens(scout))
                 
     except KeyboardInterrupt:
         print("\n⚠️ Bot interrupted by user. Cleaning up...")
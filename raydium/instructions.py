@@ -1,33 +1,159 @@
-from solders.instruction import Instruction
+import asyncio
+import struct
+from solana.rpc.types import MemcmpOpts
+from solders.instruction import AccountMeta, Instruction
 from solders.pubkey import Pubkey
-from solders.system_program import create_account
-from spl.token.constants import TOKEN_PROGRAM_ID
+from spl.token.constants import TOKEN_PROGRAM_ID, WRAPPED_SOL_MINT
+from utils.exceptions import PoolError
+from utils.token_accounts import derive_ata
+from raydium.layouts import (
+    AMM_V4_SIZE,
+    AMM_V4_BASE_MINT_OFFSET,
+    AMM_V4_QUOTE_MINT_OFFSET,
+    AmmV4State,
+    MarketV3State,
+    pool_reserves
+)
 
 RAYDIUM_PROGRAM_ID = Pubkey.from_string("675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8")
+WSOL_MINT = WRAPPED_SOL_MINT
 
-async def get_pool_info(client, token_address):
-    """Get Raydium pool information"""
+AMM_AUTHORITY = Pubkey.find_program_address([b'amm authority'], RAYDIUM_PROGRAM_ID)[0]
+
+SWAP_BASE_IN = 9
+SWAP_BASE_OUT = 11
+# instruction tag, then (amount_in, min_amount_out) or (max_amount_in, amount_out)
+_SWAP_DATA = struct.Struct('<BQQ')
+
+async def _find_pools(client, base_mint, quote_mint):
+    response = await client.get_program_accounts(
+        RAYDIUM_PROGRAM_ID,
+        encoding="base64",
+        filters=[
+            AMM_V4_SIZE,
+            MemcmpOpts(offset=AMM_V4_BASE_MINT_OFFSET, bytes=str(base_mint)),
+            MemcmpOpts(offset=AMM_V4_QUOTE_MINT_OFFSET, bytes=str(quote_mint))
+        ]
+    )
+    return [(keyed.pubkey, keyed.account.data) for keyed in response.value]
+
+async def _load_pools(client, addresses):
+    """Pool accounts for addresses already known from the pool index"""
+    pubkeys = [Pubkey.from_string(address) for address in addresses]
+    response = await client.get_multiple_accounts(pubkeys)
+    return [
+        (pubkey, account.data)
+        for pubkey, account in zip(pubkeys, response.value)
+        if account is not None and len(account.data) == AMM_V4_SIZE
+    ]
+
+def decode_pool_info(pool_address, pool_data, base_vault_data, quote_vault_data, market_data=None):
+    """Pool dict from raw AMM v4, vault and (optionally) market account data"""
+    pool = AmmV4State(pool_data)
+    base_reserve, quote_reserve = pool_reserves(pool, base_vault_data, quote_vault_data)
+    base_decimals = pool.base_decimals
+    quote_decimals = pool.quote_decimals
+    price = 0.0
+    if base_reserve:
+        price = (quote_reserve / 10 ** quote_decimals) / (base_reserve / 10 ** base_decimals)
+
+    info = {
+        'pool_address': str(pool_address),
+        'status': pool.status,
+        'base_mint': str(pool.base_mint),
+        'quote_mint': str(pool.quote_mint),
+        'lp_mint': str(pool.lp_mint),
+        'base_vault': str(pool.base_vault),
+        'quote_vault': str(pool.quote_vault),
+        'base_decimals': base_decimals,
+        'quote_decimals': quote_decimals,
+        'base_reserve': base_reserve,
+        'quote_reserve': quote_reserve,
+        'trade_fee_numerator': pool.trade_fee_numerator,
+        'trade_fee_denominator': pool.trade_fee_denominator,
+        'swap_fee_numerator': pool.swap_fee_numerator,
+        'swap_fee_denominator': pool.swap_fee_denominator,
+        'open_time': pool.pool_open_time,
+        'open_orders': str(pool.open_orders),
+        'target_orders': str(pool.target_orders),
+        'market_id': str(pool.market_id),
+        'market_program_id': str(pool.market_program_id),
+        'price': price
+    }
+    if market_data is not None:
+        market = MarketV3State(market_data)
+        info['market'] = {
+            'bids': str(market.bids),
+            'asks': str(market.asks),
+            'event_queue': str(market.event_queue),
+            'base_vault': str(market.base_vault),
+            'quote_vault': str(market.quote_vault),
+            'vault_signer': str(market.vault_signer(pool.market_program_id))
+        }
+    return info
+
+async def get_pool_info(client, token_address, quote_mint=WSOL_MINT, pool_index=None):
+    """Get Raydium AMM v4 pool information for a token
+
+    Pools come from the pool index. Once the index is complete a miss is
+    final - new pools reach it through the pool feed - so the expensive
+    getProgramAccounts scan only runs without an index or before its first
+    build: dataSize + memcmp filters on the mint fields (the token may sit
+    on either side), with the results added to the index. The vaults and
+    markets of every candidate are then read in one getMultipleAccounts
+    call and the deepest pool is returned.
+    """
     try:
-        # Get pool accounts
-        response = await client.get_program_accounts(
-            RAYDIUM_PROGRAM_ID,
-            encoding="base64",
-            filters=[
-                {"memcmp": {"offset": 0, "bytes": token_address}}
+        pair = {str(token_address), str(quote_mint)}
+        candidates = []
+        known = pool_index.get(token_address) if pool_index is not None else []
+        if known:
+            candidates = [
+                (pubkey, data) for pubkey, data in await _load_pools(client, known)
+                if {str(AmmV4State(data).base_mint), str(AmmV4State(data).quote_mint)} == pair
             ]
-        )
-        
-        if not response.value:
-            raise Exception("Pool not found")
-            
-        return {
-            'pool_address': response.value[0].pubkey,
-            'price': 1.0,  # This should be calculated from pool data
-            'token_account': response.value[0].account.data
-        }
-        
+        if not candidates and (pool_index is None or not pool_index.complete):
+            found = await asyncio.gather(
+                _find_pools(client, token_address, quote_mint),
+                _find_pools(client, quote_mint, token_address)
+            )
+            candidates = [candidate for pools in found for candidate in pools]
+            if pool_index is not None:
+                for pubkey, data in candidates:
+                    pool = AmmV4State(data)
+                    pool_index.add(pubkey, pool.base_mint, pool.quote_mint)
+        if not candidates:
+            raise PoolError("Pool not found")
+
+        pools = [AmmV4State(data) for _, data in candidates]
+        accounts = await client.get_multiple_accounts([
+            address
+            for pool in pools
+            for address in (pool.base_vault, pool.quote_vault, pool.market_id)
+        ])
+
+        best = None
+        for index, (pubkey, data) in enumerate(candidates):
+            base_vault, quote_vault, market = accounts.value[index * 3:index * 3 + 3]
+            if base_vault is None or quote_vault is None:
+                continue
+            info = decode_pool_info(
+                pubkey,
+                data,
+                base_vault.data,
+                quote_vault.data,
+                market.data if market is not None else None
+            )
+            depth = info['quote_reserve'] if info['quote_mint'] == str(quote_mint) else info['base_reserve']
+            if best is None or depth > best[0]:
+                best = (depth, info)
+
+        if best is None:
+            raise PoolError("Pool vaults not found")
+        return best[1]
+
     except Exception as e:
-        raise Exception(f"Failed to get pool info: {str(e)}")
+        raise PoolError(f"Failed to get pool info: {str(e)}")
 
 def calculate_min_out_amount(input_amount, price, slippage):
     """Calculate minimum output amount with slippage protection"""
@@ -35,18 +161,78 @@ def calculate_min_out_amount(input_amount, price, slippage):
     min_amount = expected_amount * (1 - slippage)
     return min_amount
 
+def _meta(address, writable):
+    return AccountMeta(Pubkey.from_string(str(address)), is_signer=False, is_writable=writable)
+
+class SwapTemplate:
+    """Cached pool and market accounts of one AMM v4 pool, in swap order"""
+
+    def __init__(self, pool_info):
+        market = pool_info.get('market')
+        if not market:
+            raise PoolError(f"Pool {pool_info['pool_address']} has no decoded market")
+        self.pool_address = pool_info['pool_address']
+        self.base_mint = pool_info['base_mint']
+        self.quote_mint = pool_info['quote_mint']
+        self.metas = [
+            AccountMeta(TOKEN_PROGRAM_ID, is_signer=False, is_writable=False),
+            _meta(pool_info['pool_address'], True),
+            AccountMeta(AMM_AUTHORITY, is_signer=False, is_writable=False),
+            _meta(pool_info['open_orders'], True),
+            _meta(pool_info['target_orders'], True),
+            _meta(pool_info['base_vault'], True),
+            _meta(pool_info['quote_vault'], True),
+            _meta(pool_info['market_program_id'], False),
+            _meta(pool_info['market_id'], True),
+            _meta(market['bids'], True),
+            _meta(market['asks'], True),
+            _meta(market['event_queue'], True),
+            _meta(market['base_vault'], True),
+            _meta(market['quote_vault'], True),
+            _meta(market['vault_signer'], False)
+        ]
+
+    def output_mint(self, input_mint):
+        if str(input_mint) == self.base_mint:
+            return self.quote_mint
+        if str(input_mint) == self.quote_mint:
+            return self.base_mint
+        raise PoolError(f"{input_mint} is not traded by pool {self.pool_address}")
+
+    def instruction(self, source, destination, owner, tag, amount, other_amount):
+        return Instruction(
+            RAYDIUM_PROGRAM_ID,
+            _SWAP_DATA.pack(tag, amount, other_amount),
+            self.metas + [
+                AccountMeta(source, is_signer=False, is_writable=True),
+                AccountMeta(destination, is_signer=False, is_writable=True),
+                AccountMeta(owner, is_signer=True, is_writable=False)
+            ]
+        )
+
 def create_swap_instruction(
     pool_info,
     user_wallet,
     input_token,
     input_amount,
     min_output_amount,
-    token_account
+    token_account,
+    destination_account=None
 ):
-    """Create Raydium swap instruction"""
-    # For testing, return a dummy instruction
-    return Instruction(
-        program_id=RAYDIUM_PROGRAM_ID,
-        accounts=[],
-        data=bytes([])
-    )
\ No newline at end of file
+    """Create Raydium swapBaseIn instruction
+
+    ``token_account`` is the user's account for the input token; the
+    destination defaults to the user's ATA for the other mint.
+    """
+    template = SwapTemplate(pool_info)
+    owner = Pubkey.from_string(str(user_wallet))
+    if destination_account is None:
+        destination_account = derive_ata(owner, template.output_mint(input_token))
+    return template.instruction(
+        Pubkey.from_string(str(token_account)),
+        Pubkey.from_string(str(destination_account)),
+        owner,
+        SWAP_BASE_IN,
+        int(input_amount),
+        int(min_output_amount)
+    )
@@ -0,0 +1,105 @@
+"""Zero-copy views over Raydium AMM v4 and OpenBook market accounts
+
+Each view wraps a memoryview of the raw account data and unpacks a field
+only when it is read. The account bytes are never copied; only the 32
+bytes of a pubkey field that is actually read go into its Pubkey.
+"""
+import struct
+from solders.pubkey import Pubkey
+from utils.exceptions import PoolError
+
+AMM_V4_SIZE = 752
+MARKET_V3_SIZE = 388
+TOKEN_ACCOUNT_SIZE = 165
+
+# memcmp offsets used to find pools by mint
+AMM_V4_BASE_MINT_OFFSET = 400
+AMM_V4_QUOTE_MINT_OFFSET = 432
+
+_U64 = struct.Struct('<Q')
+
+# SPL token account: mint(32) owner(32) amount(u64)
+TOKEN_ACCOUNT_AMOUNT_OFFSET = 64
+
+def _u64(offset):
+    unpack = _U64.unpack_from
+    return property(lambda self: unpack(self._view, offset)[0])
+
+def _pubkey(offset):
+    from_bytes = Pubkey.from_bytes
+    return property(lambda self: from_bytes(self._view[offset:offset + 32].tobytes()))
+
+class AccountView:
+    SIZE = None
+    __slots__ = ('_view',)
+
+    def __init__(self, data):
+        view = data if isinstance(data, memoryview) else memoryview(data)
+        if len(view) < self.SIZE:
+            raise PoolError(f"{type(self).__name__} needs {self.SIZE} bytes, got {len(view)}")
+        self._view = view
+
+class AmmV4State(AccountView):
+    """Raydium liquidity pool v4 (LIQUIDITY_STATE_LAYOUT_V4)"""
+    SIZE = AMM_V4_SIZE
+    __slots__ = ()
+
+    status = _u64(0)
+    nonce = _u64(8)
+    base_decimals = _u64(32)
+    quote_decimals = _u64(40)
+    base_lot_size = _u64(88)
+    quote_lot_size = _u64(96)
+    trade_fee_numerator = _u64(144)
+    trade_fee_denominator = _u64(152)
+    swap_fee_numerator = _u64(176)
+    swap_fee_denominator = _u64(184)
+    base_need_take_pnl = _u64(192)
+    quote_need_take_pnl = _u64(200)
+    pool_open_time = _u64(224)
+    base_vault = _pubkey(336)
+    quote_vault = _pubkey(368)
+    base_mint = _pubkey(AMM_V4_BASE_MINT_OFFSET)
+    quote_mint = _pubkey(AMM_V4_QUOTE_MINT_OFFSET)
+    lp_mint = _pubkey(464)
+    open_orders = _pubkey(496)
+    market_id = _pubkey(528)
+    market_program_id = _pubkey(560)
+    target_orders = _pubkey(592)
+    lp_reserve = _u64(720)
+
+class MarketV3State(AccountView):
+    """OpenBook / Serum market (MARKET_STATE_LAYOUT_V3), after the 5-byte 'serum' head"""
+    SIZE = MARKET_V3_SIZE
+    __slots__ = ()
+
+    own_address = _pubkey(13)
+    vault_signer_nonce = _u64(45)
+    base_mint = _pubkey(53)
+    quote_mint = _pubkey(85)
+    base_vault = _pubkey(117)
+    quote_vault = _pubkey(165)
+    request_queue = _pubkey(221)
+    event_queue = _pubkey(253)
+    bids = _pubkey(285)
+    asks = _pubkey(317)
+    base_lot_size = _u64(349)
+    quote_lot_size = _u64(357)
+    fee_rate_bps = _u64(365)
+
+    def vault_signer(self, market_program_id):
+        return Pubkey.create_program_address(
+            [bytes(self.own_address), _U64.pack(self.vault_signer_nonce)],
+            market_program_id
+        )
+
+def token_account_amount(data):
+    """Balance of an SPL token account, read in place"""
+    return _U64.unpack_from(data, TOKEN_ACCOUNT_AMOUNT_OFFSET)[0]
+
+def pool_reserves(pool, base_vault_data, quote_vault_data):
+    """Tradable reserves: vault balances less the PnL the pool still owes its owner"""
+    return (
+        token_account_amount(base_vault_data) - pool.base_need_take_pnl,
+        token_account_amount(quote_vault_data) - pool.quote_need_take_pnl
+    )
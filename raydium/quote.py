@@ -0,0 +1,140 @@
+"""Constant-product quoting for Raydium AMM v4 pools, computed locally
+
+Integer maths follows the on-chain program: the swap fee is taken from
+the input (rounded up) and the output is rounded down. The batch mode uses
+NumPy floats, which are exact to about 15 significant digits - close
+enough to rank pools and sizes, use ``quote_swap`` for the traded amount.
+"""
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from raydium.instructions import calculate_min_out_amount
+from utils.exceptions import PoolError
+
+def _ceil_div(numerator, denominator):
+    return -(-numerator // denominator)
+
+def get_amount_out(amount_in, reserve_in, reserve_out, fee_numerator, fee_denominator):
+    """Exact output of a swapBaseIn, returning (amount_out, fee)"""
+    fee = _ceil_div(amount_in * fee_numerator, fee_denominator)
+    amount_in_less_fee = amount_in - fee
+    return reserve_out * amount_in_less_fee // (reserve_in + amount_in_less_fee), fee
+
+def get_amount_in(amount_out, reserve_in, reserve_out, fee_numerator, fee_denominator):
+    """Input a swapBaseOut needs for an exact output, returning (amount_in, fee)"""
+    if amount_out >= reserve_out:
+        raise PoolError("Requested output exceeds pool reserves")
+    amount_in_less_fee = _ceil_div(reserve_in * amount_out, reserve_out - amount_out)
+    amount_in = _ceil_div(amount_in_less_fee * fee_denominator, fee_denominator - fee_numerator)
+    return amount_in, amount_in - amount_in_less_fee
+
+def _sides(pool_info, input_mint):
+    """(reserve_in, reserve_out, decimals_in, decimals_out) for a swap direction"""
+    base = (pool_info['base_reserve'], pool_info['base_decimals'])
+    quote = (pool_info['quote_reserve'], pool_info['quote_decimals'])
+    if str(input_mint) == pool_info['base_mint']:
+        return base[0], quote[0], base[1], quote[1]
+    if str(input_mint) == pool_info['quote_mint']:
+        return quote[0], base[0], quote[1], base[1]
+    raise PoolError(f"{input_mint} is not traded by pool {pool_info['pool_address']}")
+
+def _quote(pool_info, input_mint, amount_in, amount_out, fee, slippage):
+    reserve_in, reserve_out, decimals_in, decimals_out = _sides(pool_info, input_mint)
+    scale = 10 ** decimals_in / 10 ** decimals_out
+    amount_in_less_fee = amount_in - fee
+    return {
+        'pool_address': pool_info['pool_address'],
+        'input_mint': str(input_mint),
+        'amount_in': amount_in,
+        'amount_out': amount_out,
+        'fee': fee,
+        'min_amount_out': int(calculate_min_out_amount(amount_out, 1, slippage)),
+        # Price move caused by the trade itself, fee excluded
+        'price_impact': amount_in_less_fee / (reserve_in + amount_in_less_fee),
+        'spot_price': reserve_out / reserve_in * scale,
+        'execution_price': amount_out / amount_in * scale if amount_in else 0.0
+    }
+
+def quote_swap(pool_info, input_mint, amount_in, slippage=0.01):
+    """Quote an exact-input swap (swapBaseIn) against decoded pool state"""
+    reserve_in, reserve_out, _, _ = _sides(pool_info, input_mint)
+    amount_out, fee = get_amount_out(
+        amount_in, reserve_in, reserve_out,
+        pool_info['swap_fee_numerator'], pool_info['swap_fee_denominator']
+    )
+    return _quote(pool_info, input_mint, amount_in, amount_out, fee, slippage)
+
+def quote_swap_base_out(pool_info, input_mint, amount_out, slippage=0.01):
+    """Quote an exact-output swap (swapBaseOut), with the most it may cost after slippage"""
+    reserve_in, reserve_out, _, _ = _sides(pool_info, input_mint)
+    amount_in, fee = get_amount_in(
+        amount_out, reserve_in, reserve_out,
+        pool_info['swap_fee_numerator'], pool_info['swap_fee_denominator']
+    )
+    quote = _quote(pool_info, input_mint, amount_in, amount_out, fee, slippage)
+    quote['max_amount_in'] = _ceil_div(amount_in * int(10_000 * (1 + slippage)), 10_000)
+    return quote
+
+def quote_batch(amounts_in, reserves_in, reserves_out, fee_numerators, fee_denominators):
+    """Vectorised swapBaseIn over arrays of pools and/or sizes (broadcasting)
+
+    Returns (amounts_out, price_impacts) as float arrays.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for batch quoting")
+    amounts_in = np.asarray(amounts_in, dtype=np.float64)
+    reserves_in = np.asarray(reserves_in, dtype=np.float64)
+    reserves_out = np.asarray(reserves_out, dtype=np.float64)
+    fees = np.ceil(amounts_in * np.asarray(fee_numerators, dtype=np.float64)
+                   / np.asarray(fee_denominators, dtype=np.float64))
+    amount_in_less_fee = amounts_in - fees
+    amounts_out = np.floor(reserves_out * amount_in_less_fee / (reserves_in + amount_in_less_fee))
+    return amounts_out, amount_in_less_fee / (reserves_in + amount_in_less_fee)
+
+def quote_pools(pool_infos, input_mint, amounts_in):
+    """Quote every size against every pool at once - arrays shaped (pools, sizes)"""
+    if np is None:
+        raise ImportError("NumPy is required for batch quoting")
+    sides = [_sides(pool_info, input_mint) for pool_info in pool_infos]
+    return quote_batch(
+        np.asarray(amounts_in, dtype=np.float64)[None, :],
+        np.array([[side[0]] for side in sides], dtype=np.float64),
+        np.array([[side[1]] for side in sides], dtype=np.float64),
+        np.array([[pool_info['swap_fee_numerator']] for pool_info in pool_infos], dtype=np.float64),
+        np.array([[pool_info['swap_fee_denominator']] for pool_info in pool_infos], dtype=np.float64)
+    )
+
+class LocalQuoter:
+    """Decoded pool state per mint, quoted in-process while it is fresh"""
+
+    def __init__(self, max_age=2.0, clock=time.monotonic):
+        self.max_age = max_age
+        self.clock = clock
+        self.pools = {}
+        self.stats = {'local': 0, 'stale': 0}
+
+    def update(self, mint, pool_info):
+        self.pools[str(mint)] = (pool_info, self.clock())
+
+    def get_pool(self, mint):
+        """Pool state for a mint, or None if it is missing or older than max_age"""
+        entry = self.pools.get(str(mint))
+        if entry is None or self.clock() - entry[1] > self.max_age:
+            return None
+        return entry[0]
+
+    def quote(self, mint, input_mint, amount_in, slippage=0.01):
+        """Local quote, or None when the pool state isn't fresh enough to trade on"""
+        pool_info = self.get_pool(mint)
+        if pool_info is None:
+            self.stats['stale'] += 1
+            return None
+        self.stats['local'] += 1
+        return quote_swap(pool_info, input_mint, amount_in, slippage)
+
+    def discard(self, mint):
+        self.pools.pop(str(mint), None)
@@ -0,0 +1,84 @@
+"""Raydium AMM v4 swap transactions built locally
+
+The 15 pool/market accounts of a swap never change, so each pool's
+SwapTemplate is built once and cached. Building a transaction then only
+fills in the user's accounts, the amounts, the compute budget and (when
+signing) the blockhash.
+"""
+from solana.transaction import Transaction
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.pubkey import Pubkey
+from spl.token.constants import TOKEN_PROGRAM_ID
+from spl.token.instructions import close_account, CloseAccountParams
+from raydium.instructions import SwapTemplate, SWAP_BASE_IN, SWAP_BASE_OUT, WSOL_MINT
+from utils.token_accounts import TokenAccountCache, create_ata_idempotent_instruction
+
+# A swap plus ATA creation and SOL wrapping stays well under this
+DEFAULT_COMPUTE_UNITS = 150_000
+
+class RaydiumSwapBuilder:
+    """Builds complete swap transactions for one wallet"""
+
+    def __init__(self, owner, token_accounts=None, compute_units=DEFAULT_COMPUTE_UNITS):
+        self.owner = Pubkey.from_string(str(owner))
+        self.token_accounts = token_accounts if token_accounts is not None else TokenAccountCache(self.owner)
+        self.compute_units = compute_units
+        self.templates = {}
+
+    def template(self, pool_info):
+        template = self.templates.get(pool_info['pool_address'])
+        if template is None:
+            template = self.templates[pool_info['pool_address']] = SwapTemplate(pool_info)
+        return template
+
+    def build(self, pool_info, input_mint, amount, other_amount, priority_fee,
+              exact_out=False, blockhash=None):
+        """Unsigned swap transaction
+
+        ``amount``/``other_amount`` are amount_in/min_amount_out, or with
+        ``exact_out`` max_amount_in/amount_out. SOL is wrapped into the
+        wrapped SOL ATA before the swap and unwrapped after it.
+        """
+        template = self.template(pool_info)
+        input_mint = str(input_mint)
+        output_mint = template.output_mint(input_mint)
+        wsol = str(WSOL_MINT)
+        # The SOL leg always goes through the wrapped SOL ATA that is created and closed here
+        wsol_account = self.token_accounts.wrapped_sol_account()
+        source = wsol_account if input_mint == wsol else self.token_accounts.get(input_mint)
+        destination = wsol_account if output_mint == wsol else self.token_accounts.get(output_mint)
+
+        instructions = [
+            set_compute_unit_limit(self.compute_units),
+            set_compute_unit_price(int(priority_fee))
+        ]
+        if input_mint == wsol:
+            instructions += self.token_accounts.wrap_sol_instructions(amount, self.owner)
+        if output_mint == wsol:
+            instructions.append(create_ata_idempotent_instruction(self.owner, self.owner, output_mint))
+        else:
+            instructions += self.token_accounts.create_instructions(output_mint, self.owner)
+
+        instructions.append(template.instruction(
+            source, destination, self.owner,
+            SWAP_BASE_OUT if exact_out else SWAP_BASE_IN,
+            amount, other_amount
+        ))
+        if wsol in (input_mint, output_mint):
+            # Unwrap whatever is left (or received) back to SOL
+            instructions.append(close_account(CloseAccountParams(
+                program_id=TOKEN_PROGRAM_ID,
+                account=wsol_account,
+                dest=self.owner,
+                owner=self.owner
+            )))
+
+        return Transaction(recent_blockhash=blockhash, fee_payer=self.owner, instructions=instructions)
+
+    def build_from_quote(self, pool_info, quote, priority_fee, blockhash=None):
+        """Swap transaction for a local quote from raydium.quote"""
+        if 'max_amount_in' in quote:
+            return self.build(pool_info, quote['input_mint'], quote['max_amount_in'], quote['amount_out'],
+                              priority_fee, exact_out=True, blockhash=blockhash)
+        return self.build(pool_info, quote['input_mint'], quote['amount_in'], quote['min_amount_out'],
+                          priority_fee, blockhash=blockhash)
@@ -0,0 +1,69 @@
+import os
+import struct
+import sys
+import time
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solders.pubkey import Pubkey
+from raydium.instructions import decode_pool_info
+from raydium.layouts import AMM_V4_SIZE, AmmV4State, pool_reserves
+
+ITERATIONS = 100_000
+
+U64_FIELDS = {
+    'status': 0, 'base_decimals': 32, 'quote_decimals': 40,
+    'trade_fee_numerator': 144, 'trade_fee_denominator': 152,
+    'swap_fee_numerator': 176, 'swap_fee_denominator': 184,
+    'base_need_take_pnl': 192, 'quote_need_take_pnl': 200, 'pool_open_time': 224
+}
+PUBKEY_FIELDS = {
+    'base_vault': 336, 'quote_vault': 368, 'base_mint': 400, 'quote_mint': 432,
+    'lp_mint': 464, 'open_orders': 496, 'market_id': 528, 'market_program_id': 560,
+    'target_orders': 592
+}
+
+def make_accounts():
+    pool = bytearray(os.urandom(AMM_V4_SIZE))
+    for name, offset in U64_FIELDS.items():
+        struct.pack_into('<Q', pool, offset, 10_000 if 'denominator' in name else 9)
+    vault = bytearray(165)
+    struct.pack_into('<Q', vault, 64, 5_000_000_000)
+    return bytes(pool), bytes(vault), bytes(vault)
+
+def decode_copying(pool, base_vault, quote_vault):
+    """Slice-per-field decode - every field read copies bytes out of the account"""
+    fields = {name: int.from_bytes(pool[offset:offset + 8], 'little') for name, offset in U64_FIELDS.items()}
+    fields.update({name: Pubkey.from_bytes(pool[offset:offset + 32]) for name, offset in PUBKEY_FIELDS.items()})
+    fields['base_reserve'] = int.from_bytes(base_vault[64:72], 'little') - fields['base_need_take_pnl']
+    fields['quote_reserve'] = int.from_bytes(quote_vault[64:72], 'little') - fields['quote_need_take_pnl']
+    return fields
+
+def decode_quote_fields(pool, base_vault, quote_vault):
+    """What quoting needs - reserves and fees, read in place"""
+    state = AmmV4State(pool)
+    base_reserve, quote_reserve = pool_reserves(state, base_vault, quote_vault)
+    return base_reserve, quote_reserve, state.trade_fee_numerator, state.trade_fee_denominator
+
+def decode_full(pool, base_vault, quote_vault):
+    return decode_pool_info('Pool', pool, base_vault, quote_vault)
+
+METHODS = {
+    'slice copy': decode_copying,
+    'view (quote)': decode_quote_fields,
+    'view (full)': decode_full
+}
+
+def main():
+    accounts = make_accounts()
+    print(f"🧮 AMM v4 decode benchmark - {ITERATIONS} decodes")
+    for name, decode in METHODS.items():
+        started = time.perf_counter()
+        for _ in range(ITERATIONS):
+            decode(*accounts)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>14}: {ITERATIONS / elapsed:10.0f} decodes/s  {elapsed / ITERATIONS * 1e6:6.2f}µs each")
+
+if __name__ == "__main__":
+    main()
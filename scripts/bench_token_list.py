@@ -0,0 +1,79 @@
+import json
+import multiprocessing
+import resource
+import sys
+import os
+import time
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.token_sync import JupiterTokenSync
+
+TOKEN_COUNT = 200_000
+
+def make_body(count):
+    """Build a body shaped like the Jupiter /all list, one entry at a time"""
+    return ('[' + ','.join(
+        json.dumps({
+            'address': f'{i:0>44}',
+            'chainId': 101,
+            'decimals': 9,
+            'name': f'Token {i}',
+            'symbol': f'TK{i}',
+            'logoURI': f'https://arweave.net/{i:0>43}',
+            'tags': ['community', 'strict'],
+            'extensions': {'coingeckoId': f'token-{i}'}
+        })
+        for i in range(count)
+    ) + ']').encode()
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def decode_full(body):
+    """The previous approach - decode everything, then pick out addresses"""
+    tokens = json.loads(body)
+    return len({token['address'] for token in tokens})
+
+def decode_streaming(body):
+    sync = JupiterTokenSync()
+    sync.apply(200, {}, body)
+    return sync.token_count
+
+def run(name, results):
+    body = make_body(TOKEN_COUNT)
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    count = METHODS[name](body)
+    results[name] = {
+        'tokens': count,
+        'wall_ms': (time.perf_counter() - started) * 1000,
+        'peak_rss_mb': peak_rss_mb() - baseline
+    }
+
+METHODS = {
+    'json.loads': decode_full,
+    'streaming': decode_streaming
+}
+
+def main():
+    print(f"📦 Jupiter list benchmark - {TOKEN_COUNT} tokens")
+    with multiprocessing.Manager() as manager:
+        results = manager.dict()
+        for name in METHODS:
+            # Fresh process per method so peak RSS isn't shared
+            process = multiprocessing.Process(target=run, args=(name, results))
+            process.start()
+            process.join()
+
+        for name in METHODS:
+            result = results[name]
+            print(
+                f"{name:>12}: {result['wall_ms']:8.0f}ms  "
+                f"peak RSS +{result['peak_rss_mb']:.0f}MB  ({result['tokens']} tokens)"
+            )
+
+if __name__ == "__main__":
+    main()
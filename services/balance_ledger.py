@@ -0,0 +1,208 @@
+import asyncio
+import itertools
+import json
+import aiohttp
+from utils.logger import setup_logger
+from utils.exceptions import InsufficientBalanceError
+from utils.solana_rpc import rpc_call, websocket_url
+
+LAMPORTS_PER_SOL = 1_000_000_000
+
+class BalanceLedger:
+    """Locally tracked SOL balance with reservations for in-flight orders
+
+    Seeded with one ``getBalance``, then kept in sync either by an
+    ``accountSubscribe`` stream or by a periodic reconcile. Our own orders
+    reserve funds up front and are deducted as soon as they confirm, so
+    "can I afford this trade" never needs a network call.
+
+    Transports:
+      - ``websocket``: ``accountSubscribe`` on the wallet, plus a slow reconcile
+      - ``poll``: ``getBalance`` every ``reconcile_interval`` seconds
+    """
+
+    TRANSPORTS = ('websocket', 'poll')
+
+    def __init__(self, rpc_url, owner, session=None, ws_url=None, transport='websocket',
+                 reconcile_interval=30, commitment='confirmed'):
+        if transport not in self.TRANSPORTS:
+            raise ValueError(f"Unknown balance ledger transport: {transport}")
+
+        self.logger = setup_logger("balance_ledger")
+        self.rpc_url = rpc_url
+        self.ws_url = ws_url or websocket_url(rpc_url)
+        self.owner = str(owner)
+        self.session = session
+        self._owns_session = False
+        self.transport = transport
+        self.reconcile_interval = reconcile_interval
+        self.commitment = commitment
+        self.lamports = None
+        self.slot = 0
+        self.reservations = {}
+        self.unsettled = {}
+        self._ids = itertools.count(1)
+        self.is_running = False
+        self.tasks = []
+        self.stats = {
+            'reserved': 0,
+            'rejected': 0,
+            'chain_updates': 0,
+            'reconciles': 0,
+            'drift_lamports': 0
+        }
+
+    @property
+    def available_lamports(self):
+        """Confirmed balance minus everything reserved or spent but not yet seen on-chain"""
+        if self.lamports is None:
+            return 0
+        return self.lamports - sum(self.reservations.values()) - sum(
+            lamports for lamports, _ in self.unsettled.values()
+        )
+
+    @property
+    def balance(self):
+        """Available balance in SOL"""
+        return self.available_lamports / LAMPORTS_PER_SOL
+
+    def can_afford(self, amount_sol):
+        return self.available_lamports >= int(amount_sol * LAMPORTS_PER_SOL)
+
+    def reserve(self, amount_sol):
+        """Set funds aside for an order, returning a reservation id"""
+        lamports = int(amount_sol * LAMPORTS_PER_SOL)
+        if self.available_lamports < lamports:
+            self.stats['rejected'] += 1
+            raise InsufficientBalanceError(
+                f"Insufficient balance for {amount_sol} SOL trade ({self.balance:.4f} SOL available)"
+            )
+        reservation = next(self._ids)
+        self.reservations[reservation] = lamports
+        self.stats['reserved'] += 1
+        return reservation
+
+    def release(self, reservation):
+        """Give back the funds of an order that did not go through"""
+        self.reservations.pop(reservation, None)
+
+    def settle(self, reservation, slot=None):
+        """Mark an order confirmed - its funds stay deducted until the chain reflects it"""
+        lamports = self.reservations.pop(reservation, None)
+        if lamports is not None:
+            self.unsettled[reservation] = (lamports, slot)
+
+    def apply_chain_balance(self, lamports, slot=None):
+        """Take an on-chain balance as the truth, as of `slot`"""
+        if slot is not None and slot < self.slot:
+            return
+        if self.lamports is not None:
+            expected = self.lamports - sum(amount for amount, _ in self.unsettled.values())
+            self.stats['drift_lamports'] = lamports - expected
+        self.lamports = lamports
+        if slot is not None:
+            self.slot = slot
+        # Spends confirmed at or before this slot are now part of the balance
+        self.unsettled = {
+            reservation: (amount, spent_slot)
+            for reservation, (amount, spent_slot) in self.unsettled.items()
+            if slot is not None and spent_slot is not None and spent_slot > slot
+        }
+        self.stats['chain_updates'] += 1
+
+    async def seed(self):
+        """Load the balance with a single getBalance"""
+        self._ensure_session()
+        await self.reconcile()
+        self.logger.info(f"💰 Balance ledger seeded: {self.balance:.4f} SOL")
+        return self.balance
+
+    async def reconcile(self):
+        result = await rpc_call(
+            self.session, self.rpc_url, 'getBalance', [self.owner, {'commitment': self.commitment}]
+        )
+        self.apply_chain_balance(result['value'], result['context']['slot'])
+        self.stats['reconciles'] += 1
+
+    def _ensure_session(self):
+        if not self.session:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            self._owns_session = True
+
+    async def start(self):
+        """Keep the balance in sync in the background"""
+        if self.is_running:
+            return
+        self._ensure_session()
+        if self.lamports is None:
+            await self.seed()
+
+        self.is_running = True
+        self.tasks = [asyncio.create_task(self._run_reconcile())]
+        if self.transport == 'websocket':
+            self.tasks.append(asyncio.create_task(self._run_websocket_forever()))
+
+    async def stop(self):
+        self.is_running = False
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+        if self.session and self._owns_session:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
+
+    async def _run_reconcile(self):
+        while self.is_running:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Balance reconcile error: {str(e)}")
+
+    async def _run_websocket_forever(self):
+        """Run the account subscription, reconnecting with backoff on failure"""
+        backoff = 1
+        while self.is_running:
+            try:
+                await self._run_websocket()
+                backoff = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Balance stream error: {str(e)}")
+
+            if self.is_running:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    async def _run_websocket(self):
+        async with self.session.ws_connect(self.ws_url, heartbeat=30) as ws:
+            await ws.send_json({
+                'jsonrpc': '2.0',
+                'id': 1,
+                'method': 'accountSubscribe',
+                'params': [self.owner, {'encoding': 'base64', 'commitment': self.commitment}]
+            })
+
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    break
+                data = json.loads(msg.data)
+                if data.get('method') != 'accountNotification':
+                    continue
+
+                result = data['params']['result']
+                self.apply_chain_balance(result['value']['lamports'], result['context']['slot'])
+
+    def get_stats(self):
+        return {
+            **self.stats,
+            'balance_sol': self.balance,
+            'reservations': len(self.reservations),
+            'unsettled': len(self.unsettled)
+        }
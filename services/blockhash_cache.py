@@ -0,0 +1,179 @@
+import asyncio
+import time
+from collections import OrderedDict
+import aiohttp
+from solders.hash import Hash
+from utils.logger import setup_logger
+from utils.solana_rpc import rpc_call
+
+# Slots are ~400ms; a new blockhash every second stays far inside its 150-block window
+REFRESH_INTERVAL = 1.0
+
+# Past this the cached blockhash is fetched inline instead of served from memory
+MAX_AGE = 5.0
+
+# Recently served blockhashes, so a sender can look up when one expires
+HISTORY = 64
+
+class BlockhashCache:
+    """Recent blockhash, slot and block height kept fresh in the background
+
+    ``getLatestBlockhash`` and ``getBlockHeight`` are refreshed together
+    every ``interval``, so signing a transaction reads its blockhash from
+    memory. The last valid block height of each blockhash is remembered,
+    which lets senders stop rebroadcasting once the chain has passed it
+    without asking an RPC node for the height themselves.
+    """
+
+    def __init__(self, rpc_url, session=None, interval=REFRESH_INTERVAL, max_age=MAX_AGE,
+                 commitment='confirmed', clock=time.monotonic):
+        self.logger = setup_logger("blockhash_cache")
+        self.rpc_url = rpc_url
+        self.session = session
+        self._owns_session = False
+        self.interval = interval
+        self.max_age = max_age
+        self.commitment = commitment
+        self.clock = clock
+        self.blockhash = None
+        self.last_valid_block_height = None
+        self.slot = None
+        self.block_height = None
+        self.updated_at = None
+        self.valid_heights = OrderedDict()
+        self._refreshing = None
+        self.is_running = False
+        self.task = None
+        self.stats = {
+            'refreshes': 0,
+            'changes': 0,
+            'served': 0,
+            'inline_fetches': 0,
+            'errors': 0,
+            'last_refresh': None
+        }
+
+    def _ensure_session(self):
+        if not self.session:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            self._owns_session = True
+
+    def age(self):
+        """Seconds since the last successful refresh, or None before the first"""
+        if self.updated_at is None:
+            return None
+        return self.clock() - self.updated_at
+
+    def is_fresh(self):
+        age = self.age()
+        return age is not None and age <= self.max_age
+
+    async def _fetch(self):
+        self._ensure_session()
+        params = [{'commitment': self.commitment}]
+        latest, height = await asyncio.gather(
+            rpc_call(self.session, self.rpc_url, 'getLatestBlockhash', params),
+            rpc_call(self.session, self.rpc_url, 'getBlockHeight', params)
+        )
+        blockhash = Hash.from_string(latest['value']['blockhash'])
+        if blockhash != self.blockhash:
+            self.stats['changes'] += 1
+        self.blockhash = blockhash
+        self.last_valid_block_height = latest['value']['lastValidBlockHeight']
+        self.slot = latest['context']['slot']
+        self.block_height = height
+        self.updated_at = self.clock()
+
+        key = str(blockhash)
+        self.valid_heights[key] = self.last_valid_block_height
+        self.valid_heights.move_to_end(key)
+        while len(self.valid_heights) > HISTORY:
+            self.valid_heights.popitem(last=False)
+
+        self.stats['refreshes'] += 1
+        self.stats['last_refresh'] = time.time()
+        return self.blockhash, self.last_valid_block_height
+
+    def _refresh_done(self, task):
+        self._refreshing = None
+        if not task.cancelled():
+            task.exception()
+
+    async def refresh(self):
+        """Fetch the latest blockhash and block height; concurrent callers share one fetch"""
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._fetch())
+            self._refreshing.add_done_callback(self._refresh_done)
+        return await asyncio.shield(self._refreshing)
+
+    async def get(self):
+        """(blockhash, last_valid_block_height) from memory, fetched inline only when stale"""
+        if not self.is_fresh():
+            self.stats['inline_fetches'] += 1
+            await self.refresh()
+        self.stats['served'] += 1
+        return self.blockhash, self.last_valid_block_height
+
+    async def get_blockhash(self):
+        blockhash, _ = await self.get()
+        return blockhash
+
+    def valid_until(self, blockhash):
+        """Last valid block height of a recently cached blockhash, or None if unknown"""
+        if blockhash is None:
+            return None
+        return self.valid_heights.get(str(blockhash))
+
+    def is_expired(self, last_valid_block_height):
+        """Whether the chain has passed a block height - None when our height is stale"""
+        if not self.is_fresh():
+            return None
+        return self.block_height > last_valid_block_height
+
+    async def start(self):
+        """Start refreshing in the background"""
+        if self.is_running:
+            return
+        self._ensure_session()
+        self.is_running = True
+        self.task = asyncio.create_task(self._run())
+        self.logger.info(f"🔗 Blockhash cache refreshing every {self.interval}s")
+
+    async def _run(self):
+        while self.is_running:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                self.logger.error(f"Blockhash refresh error: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        """Stop refreshing and release the session if we created it"""
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+        if self.session and self._owns_session:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
+
+    def get_stats(self):
+        age = self.age()
+        remaining = None
+        if self.block_height is not None:
+            remaining = self.last_valid_block_height - self.block_height
+        return {
+            **self.stats,
+            'slot': self.slot,
+            'block_height': self.block_height,
+            'last_valid_block_height': self.last_valid_block_height,
+            'blocks_remaining': remaining,
+            'age_ms': None if age is None else age * 1000,
+            'fresh': self.is_fresh()
+        }
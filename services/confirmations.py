@@ -0,0 +1,318 @@
+import asyncio
+import bisect
+import itertools
+import json
+import time
+from collections import deque
+import aiohttp
+from utils.logger import setup_logger
+from utils.exceptions import TransactionError
+from utils.solana_rpc import rpc_call, websocket_url
+
+COMMITMENT_LEVELS = ('processed', 'confirmed', 'finalized')
+
+# Upper bounds of the time-to-confirm histogram buckets
+HISTOGRAM_BUCKETS_MS = (250, 500, 1000, 2000, 5000, 10000, 30000)
+
+# getSignatureStatuses accepts at most this many signatures per call
+MAX_STATUS_BATCH = 256
+
+def signature_str(signature):
+    """Base58 signature from a str, a Signature or a send_transaction response"""
+    return str(getattr(signature, 'value', signature))
+
+class ConfirmationService:
+    """Confirms every in-flight transaction over one shared connection
+
+    Each pending signature gets a ``signatureSubscribe`` on a single
+    websocket. Once per tick, signatures the websocket hasn't answered
+    for ``sweep_after`` seconds (or all of them while it is down) are
+    checked with one batched ``getSignatureStatuses`` call, so the number
+    of RPC requests no longer grows with the number of trades in flight.
+
+    Transports:
+      - ``websocket``: ``signatureSubscribe`` plus the batched sweep
+      - ``poll``: the batched ``getSignatureStatuses`` call only
+    """
+
+    TRANSPORTS = ('websocket', 'poll')
+
+    def __init__(self, rpc_url, session=None, ws_url=None, transport='websocket',
+                 commitment='confirmed', poll_interval=0.5, sweep_after=2.0, timeout=60,
+                 clock=time.monotonic):
+        if transport not in self.TRANSPORTS:
+            raise ValueError(f"Unknown confirmation transport: {transport}")
+
+        self.logger = setup_logger("confirmations")
+        self.rpc_url = rpc_url
+        self.ws_url = ws_url or websocket_url(rpc_url)
+        self.session = session
+        self._owns_session = False
+        self.transport = transport
+        self.commitment = commitment
+        self.poll_interval = poll_interval
+        self.sweep_after = sweep_after
+        self.timeout = timeout
+        self.clock = clock
+        self.pending = {}
+        self.ws = None
+        self._requests = {}
+        self._subscriptions = {}
+        self._ids = itertools.count(1)
+        self.is_running = False
+        self.tasks = []
+        self.samples = deque(maxlen=1000)
+        self.histogram = {'websocket': [0] * (len(HISTOGRAM_BUCKETS_MS) + 1),
+                          'poll': [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)}
+        self.stats = {
+            'confirmed': 0,
+            'failed': 0,
+            'timeouts': 0,
+            'status_calls': 0,
+            'subscriptions': 0,
+            'unsubscriptions': 0
+        }
+
+    async def confirm(self, signature, timeout=None, sent_at=None):
+        """Wait until a signature reaches the service commitment
+
+        Returns the status ({'slot', 'source', 'confirm_ms'}) and raises
+        TransactionError if the transaction failed or timed out.
+        """
+        signature = signature_str(signature)
+        entry = self.pending.get(signature)
+        if entry is None:
+            future = asyncio.get_running_loop().create_future()
+            entry = self.pending[signature] = {
+                'future': future,
+                'submitted_at': sent_at if sent_at is not None else self.clock(),
+                'waiters': 0
+            }
+            await self._subscribe(signature)
+
+        # Each caller waits on its own shield, so one caller's timeout never cancels the others
+        entry['waiters'] += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(entry['future']), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            raise TransactionError(f"Transaction {signature} not confirmed after {timeout or self.timeout}s")
+        finally:
+            entry['waiters'] -= 1
+            # Stop watching the signature once nobody is waiting for it
+            if not entry['waiters'] and not entry['future'].done() and self.pending.get(signature) is entry:
+                del self.pending[signature]
+                entry['future'].cancel()
+                await self._unsubscribe(signature)
+
+    def _resolve(self, signature, slot, err, source):
+        entry = self.pending.pop(signature, None)
+        if entry is None or entry['future'].done():
+            return
+
+        if err:
+            self.stats['failed'] += 1
+            entry['future'].set_exception(TransactionError(f"Transaction {signature} failed: {err}"))
+            return
+
+        confirm_ms = (self.clock() - entry['submitted_at']) * 1000
+        self.stats['confirmed'] += 1
+        self.samples.append(confirm_ms)
+        self.histogram[source][bisect.bisect_left(HISTOGRAM_BUCKETS_MS, confirm_ms)] += 1
+        entry['future'].set_result({'slot': slot, 'source': source, 'confirm_ms': confirm_ms})
+
+    def _reached(self, status):
+        level = status.get('confirmationStatus') or 'processed'
+        return COMMITMENT_LEVELS.index(level) >= COMMITMENT_LEVELS.index(self.commitment)
+
+    async def poll_once(self, signatures=None):
+        """Check pending signatures with batched getSignatureStatuses calls"""
+        if signatures is None:
+            signatures = list(self.pending)
+        for start in range(0, len(signatures), MAX_STATUS_BATCH):
+            batch = signatures[start:start + MAX_STATUS_BATCH]
+            result = await rpc_call(self.session, self.rpc_url, 'getSignatureStatuses', [
+                batch,
+                {'searchTransactionHistory': False}
+            ])
+            self.stats['status_calls'] += 1
+            for signature, status in zip(batch, result['value']):
+                if status is None:
+                    continue
+                if status.get('err'):
+                    self._resolve(signature, status.get('slot'), status['err'], 'poll')
+                elif self._reached(status):
+                    self._resolve(signature, status.get('slot'), None, 'poll')
+                else:
+                    continue
+                # Answered here, so its websocket notification is no longer needed
+                await self._unsubscribe(signature)
+
+    def _due_for_poll(self):
+        """Signatures the websocket isn't covering, or hasn't answered for in a while"""
+        if self.ws is None:
+            return list(self.pending)
+        cutoff = self.clock() - self.sweep_after
+        return [
+            signature for signature, entry in self.pending.items()
+            if entry['submitted_at'] <= cutoff
+        ]
+
+    def _ensure_session(self):
+        if not self.session:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            self._owns_session = True
+
+    async def start(self):
+        """Start the shared subscription and the status sweep"""
+        if self.is_running:
+            return
+        self._ensure_session()
+        self.is_running = True
+        self.tasks = [asyncio.create_task(self._run_poll())]
+        if self.transport == 'websocket':
+            self.tasks.append(asyncio.create_task(self._run_websocket_forever()))
+        self.logger.info(f"✅ Confirmation service started ({self.transport})")
+
+    async def stop(self):
+        self.is_running = False
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+        for entry in self.pending.values():
+            entry['future'].cancel()
+        self.pending.clear()
+
+        if self.session and self._owns_session:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
+
+    async def _run_poll(self):
+        while self.is_running:
+            await asyncio.sleep(self.poll_interval)
+            due = self._due_for_poll()
+            if not due:
+                continue
+            try:
+                await self.poll_once(due)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Signature status error: {str(e)}")
+
+    async def _subscribe(self, signature):
+        if self.ws is None or self.ws.closed:
+            return
+        request_id = next(self._ids)
+        self._requests[request_id] = signature
+        try:
+            await self.ws.send_json({
+                'jsonrpc': '2.0',
+                'id': request_id,
+                'method': 'signatureSubscribe',
+                'params': [signature, {'commitment': self.commitment}]
+            })
+            self.stats['subscriptions'] += 1
+        except Exception as e:
+            # The status sweep still covers this signature
+            self._requests.pop(request_id, None)
+            self.logger.warning(f"signatureSubscribe failed: {str(e)}")
+
+    async def _unsubscribe(self, signature):
+        """Drop the subscriptions of a signature nobody is waiting on any more"""
+        for subscription, watched in list(self._subscriptions.items()):
+            if watched == signature:
+                del self._subscriptions[subscription]
+                await self._send_unsubscribe(subscription)
+
+    async def _send_unsubscribe(self, subscription):
+        if self.ws is None or self.ws.closed:
+            return
+        try:
+            await self.ws.send_json({
+                'jsonrpc': '2.0',
+                'id': next(self._ids),
+                'method': 'signatureUnsubscribe',
+                'params': [subscription]
+            })
+            self.stats['unsubscriptions'] += 1
+        except Exception as e:
+            # The node drops it with the connection
+            self.logger.warning(f"signatureUnsubscribe failed: {str(e)}")
+
+    async def _run_websocket_forever(self):
+        """Run the shared subscription, reconnecting with backoff on failure"""
+        backoff = 1
+        while self.is_running:
+            try:
+                await self._run_websocket()
+                backoff = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Confirmation stream error: {str(e)}")
+
+            if self.is_running:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    async def _run_websocket(self):
+        async with self.session.ws_connect(self.ws_url, heartbeat=30) as ws:
+            self.ws = ws
+            try:
+                # Anything submitted while we were disconnected
+                for signature in list(self.pending):
+                    await self._subscribe(signature)
+
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        break
+                    await self._handle_message(json.loads(msg.data))
+            finally:
+                self.ws = None
+                self._requests.clear()
+                self._subscriptions.clear()
+
+    async def _handle_message(self, data):
+        if 'id' in data:
+            signature = self._requests.pop(data['id'], None)
+            if signature is None or 'result' not in data:
+                return
+            if signature in self.pending:
+                self._subscriptions[data['result']] = signature
+            else:
+                # Abandoned or answered before the node acknowledged the subscription
+                await self._send_unsubscribe(data['result'])
+            return
+
+        if data.get('method') != 'signatureNotification':
+            return
+        params = data['params']
+        # Signature subscriptions end after their one notification
+        signature = self._subscriptions.pop(params['subscription'], None)
+        if signature is None:
+            return
+        result = params['result']
+        self._resolve(signature, result['context']['slot'], result['value'].get('err'), 'websocket')
+
+    def _percentile(self, ordered, fraction):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def get_stats(self):
+        ordered = sorted(self.samples)
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+        return {
+            **self.stats,
+            'pending': len(self.pending),
+            'websocket_connected': self.ws is not None,
+            'p50_ms': self._percentile(ordered, 0.5) if ordered else 0.0,
+            'p90_ms': self._percentile(ordered, 0.9) if ordered else 0.0,
+            'p99_ms': self._percentile(ordered, 0.99) if ordered else 0.0,
+            'histogram': {
+                source: dict(zip(labels, counts))
+                for source, counts in self.histogram.items()
+            }
+        }
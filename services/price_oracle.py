@@ -0,0 +1,242 @@
+import asyncio
+import time
+import aiohttp
+from utils.logger import setup_logger
+
+JUPITER_PRICE_URL = 'https://price.jup.ag/v4/price'
+DEXSCREENER_TOKENS_URL = 'https://api.dexscreener.com/latest/dex/tokens'
+
+# Most mints per request each API accepts
+JUPITER_MAX_IDS = 100
+DEXSCREENER_MAX_IDS = 30
+
+SOURCE_JUPITER = 'jupiter'
+SOURCE_DEXSCREENER = 'dexscreener'
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+class PriceOracle:
+    """One price feed for every tracked mint
+
+    Prices are fetched in batched multi-id calls and cached for ``ttl``
+    seconds; concurrent lookups of the same mint share one in-flight fetch.
+    Mints Jupiter has no price for fall back to DexScreener pairs. Every
+    fresh price is pushed to subscribers as a tick:
+    ``{'address', 'price', 'source', 'timestamp'}``.
+    """
+
+    def __init__(self, session=None, interval=1.0, ttl=1.0, clock=time.time):
+        self.logger = setup_logger("price_oracle")
+        self.session = session
+        self._owns_session = False
+        self.interval = interval
+        self.ttl = ttl
+        self.clock = clock
+        self.tracked = set()
+        self.cache = {}
+        self.subscribers = []
+        self.is_running = False
+        self.task = None
+        self._inflight = {}
+        self._pending = set()
+        self.stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'coalesced': 0,
+            'fallback_hits': 0,
+            'misses': 0,
+            'errors': 0
+        }
+
+    def track(self, address):
+        """Include a mint in every poll"""
+        self.tracked.add(address)
+
+    def untrack(self, address):
+        self.tracked.discard(address)
+        self.cache.pop(address, None)
+
+    async def subscribe(self, callback):
+        """Register an async callback for price ticks"""
+        if not callable(callback):
+            raise ValueError("Callback must be callable")
+        self.subscribers.append(callback)
+
+    def get_latest(self):
+        """Last tick seen for every mint, fresh or not"""
+        return dict(self.cache)
+
+    async def get_price(self, address):
+        """Price of one mint, or None if no source has it"""
+        return (await self.get_prices([address])).get(address)
+
+    async def get_prices(self, addresses):
+        """Prices for many mints, served from cache or one batched fetch"""
+        self._ensure_session()
+        now = self.clock()
+        prices = {}
+        waiting = {}
+        missing = []
+
+        for address in set(addresses):
+            tick = self.cache.get(address)
+            if tick and now - tick['timestamp'] < self.ttl:
+                self.stats['cache_hits'] += 1
+                prices[address] = tick['price']
+            elif address in self._inflight:
+                self.stats['coalesced'] += 1
+                waiting[address] = self._inflight[address]
+            else:
+                missing.append(address)
+
+        if missing:
+            fetch = asyncio.ensure_future(self._fetch(missing))
+            for address in missing:
+                self._inflight[address] = fetch
+                waiting[address] = fetch
+
+        for address, fetch in waiting.items():
+            try:
+                # Shielded so one cancelled caller can't cancel a shared fetch
+                ticks = await asyncio.shield(fetch)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                continue
+            if address in ticks:
+                prices[address] = ticks[address]['price']
+        return prices
+
+    async def _fetch(self, addresses):
+        try:
+            prices = await self._fetch_source(self._fetch_jupiter, addresses)
+            ticks = self._make_ticks(prices, SOURCE_JUPITER)
+
+            misses = [address for address in addresses if address not in ticks]
+            if misses:
+                prices = await self._fetch_source(self._fetch_dexscreener, misses)
+                self.stats['fallback_hits'] += len(prices)
+                ticks.update(self._make_ticks(prices, SOURCE_DEXSCREENER))
+            self.stats['misses'] += len(addresses) - len(ticks)
+
+            self.cache.update(ticks)
+            if ticks and self.subscribers:
+                task = asyncio.create_task(self._notify(list(ticks.values())))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+            return ticks
+        finally:
+            for address in addresses:
+                self._inflight.pop(address, None)
+
+    def _make_ticks(self, prices, source):
+        now = self.clock()
+        return {
+            address: {'address': address, 'price': price, 'source': source, 'timestamp': now}
+            for address, price in prices.items()
+        }
+
+    async def _fetch_source(self, fetch, addresses):
+        """Run a source fetch, treating failure as 'no prices'"""
+        try:
+            return await fetch(addresses)
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.logger.warning(f"⚠️ Price fetch failed: {str(e)}")
+            return {}
+
+    async def _fetch_jupiter(self, addresses):
+        async def batch(ids):
+            self.stats['requests'] += 1
+            async with self.session.get(JUPITER_PRICE_URL, params={'ids': ','.join(ids)}) as response:
+                if response.status != 200:
+                    raise Exception(f"Jupiter price API returned {response.status}")
+                data = await response.json(content_type=None)
+            return {
+                address: float(entry['price'])
+                for address, entry in (data.get('data') or {}).items()
+                if entry and entry.get('price') is not None
+            }
+
+        prices = {}
+        for result in await asyncio.gather(*(batch(ids) for ids in _chunks(addresses, JUPITER_MAX_IDS))):
+            prices.update(result)
+        return prices
+
+    async def _fetch_dexscreener(self, addresses):
+        wanted = set(addresses)
+
+        async def batch(ids):
+            self.stats['requests'] += 1
+            async with self.session.get(f"{DEXSCREENER_TOKENS_URL}/{','.join(ids)}") as response:
+                if response.status != 200:
+                    raise Exception(f"DexScreener returned {response.status}")
+                data = await response.json(content_type=None)
+            return data.get('pairs') or []
+
+        # Price each mint from its most liquid pair
+        best = {}
+        for pairs in await asyncio.gather(*(batch(ids) for ids in _chunks(addresses, DEXSCREENER_MAX_IDS))):
+            for pair in pairs:
+                address = pair.get('baseToken', {}).get('address')
+                if address not in wanted or not pair.get('priceUsd'):
+                    continue
+                liquidity = float((pair.get('liquidity') or {}).get('usd', 0))
+                if address not in best or liquidity > best[address][0]:
+                    best[address] = (liquidity, float(pair['priceUsd']))
+        return {address: price for address, (_, price) in best.items()}
+
+    async def _notify(self, ticks):
+        for tick in ticks:
+            for callback in self.subscribers:
+                try:
+                    await callback(tick)
+                except Exception as e:
+                    self.logger.error(f"Price subscriber error: {str(e)}")
+
+    def _ensure_session(self):
+        if not self.session:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            self._owns_session = True
+
+    async def poll_once(self):
+        """Refresh every tracked mint"""
+        if self.tracked:
+            return await self.get_prices(list(self.tracked))
+        return {}
+
+    async def start(self):
+        """Start polling the tracked mints"""
+        if self.is_running:
+            return
+        self._ensure_session()
+        self.is_running = True
+        self.task = asyncio.create_task(self._run())
+        self.logger.info(f"💲 Price oracle polling every {self.interval}s")
+
+    async def _run(self):
+        while self.is_running:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                self.logger.error(f"Price poll error: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        """Stop polling and release the session if we created it"""
+        self.is_running = False
+        tasks = [task for task in [self.task, *self._pending] if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.task = None
+        self._pending.clear()
+
+        if self.session and self._owns_session:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
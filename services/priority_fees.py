@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import deque
+import aiohttp
+from utils.logger import setup_logger
+from utils.solana_rpc import rpc_call
+
+# Percentile of recent fees bid at each urgency
+URGENCY_PERCENTILES = {
+    'exit': 60,
+    'entry': 75,
+    'stop_loss': 95
+}
+
+# Sample sources, each kept in its own window
+SOURCES = ('rpc', 'raydium')
+
+# Served until the first sample arrives (micro-lamports per compute unit)
+DEFAULT_FEES = {
+    'exit': 10000,
+    'entry': 50000,
+    'stop_loss': 100000
+}
+
+class PriorityFeeEstimator:
+    """Background model of recent priority fees
+
+    Periodically samples ``getRecentPrioritizationFees`` (optionally scoped
+    to the accounts a swap will write-lock) and the Raydium ``/priority-fee``
+    endpoint, each into its own rolling window. Unscoped RPC samples are
+    mostly zero-fee slots, so a tier bids the higher of the two sources'
+    percentiles rather than letting the zeros drown out Raydium's estimate.
+    Tiers are recomputed once per refresh, so get_fee() is a dictionary
+    lookup on the hot path.
+    """
+
+    def __init__(self, rpc_url, session=None, raydium_url=None, accounts=None,
+                 interval=5.0, window=600, min_fee=1000, max_fee=2_000_000):
+        self.logger = setup_logger("priority_fees")
+        self.rpc_url = rpc_url
+        self.session = session
+        self._owns_session = False
+        self.raydium_url = raydium_url
+        self.accounts = list(accounts or [])
+        self.interval = interval
+        self.min_fee = min_fee
+        self.max_fee = max_fee
+        self.samples = {source: deque(maxlen=window) for source in SOURCES}
+        self._last_slot = 0
+        self.fees = dict(DEFAULT_FEES)
+        self.is_running = False
+        self.task = None
+        self.stats = {
+            'refreshes': 0,
+            'samples': 0,
+            'errors': 0,
+            'last_refresh': None
+        }
+
+    def get_fee(self, urgency='entry'):
+        """Current fee for an urgency tier, in micro-lamports per compute unit"""
+        return self.fees[urgency]
+
+    def add_samples(self, fees, source='rpc'):
+        """Add fee observations from one source and recompute the tiers"""
+        self.samples[source].extend(fees)
+        self.stats['samples'] += len(fees)
+        self._recompute()
+
+    def _recompute(self):
+        windows = [sorted(samples) for samples in self.samples.values() if samples]
+        if not windows:
+            return
+        for urgency, percentile in URGENCY_PERCENTILES.items():
+            fee = max(ordered[round((len(ordered) - 1) * percentile / 100)] for ordered in windows)
+            self.fees[urgency] = int(min(max(fee, self.min_fee), self.max_fee))
+
+    async def _sample_rpc(self):
+        params = [self.accounts] if self.accounts else []
+        result = await rpc_call(self.session, self.rpc_url, 'getRecentPrioritizationFees', params)
+        # Each call returns the last ~150 slots - only keep slots not seen yet
+        fresh = [entry for entry in result or [] if entry['slot'] > self._last_slot]
+        if fresh:
+            self._last_slot = max(entry['slot'] for entry in fresh)
+        return [entry['prioritizationFee'] for entry in fresh]
+
+    async def _sample_raydium(self):
+        async with self.session.get(f"{self.raydium_url}/priority-fee") as response:
+            if response.status != 200:
+                raise Exception(f"Raydium priority-fee returned {response.status}")
+            data = await response.json(content_type=None)
+        return [int(fee) for fee in data['data']['default'].values()]
+
+    async def refresh(self):
+        """Take one round of samples from every source"""
+        sources = {'rpc': self._sample_rpc()}
+        if self.raydium_url:
+            sources['raydium'] = self._sample_raydium()
+
+        results = await asyncio.gather(*sources.values(), return_exceptions=True)
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                self.stats['errors'] += 1
+                self.logger.warning(f"⚠️ Priority fee sample failed ({source}): {str(result)}")
+            elif result:
+                self.add_samples(result, source)
+        self.stats['refreshes'] += 1
+        self.stats['last_refresh'] = time.time()
+        return self.fees
+
+    async def start(self):
+        """Start sampling in the background"""
+        if self.is_running:
+            return
+        if not self.session:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            self._owns_session = True
+
+        self.is_running = True
+        self.task = asyncio.create_task(self._run())
+        self.logger.info(f"⛽ Priority fee estimator sampling every {self.interval}s")
+
+    async def _run(self):
+        while self.is_running:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                self.logger.error(f"Priority fee refresh error: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        """Stop sampling and release the session if we created it"""
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+        if self.session and self._owns_session:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
+
+    def get_stats(self):
+        return {
+            **self.stats,
+            'fees': dict(self.fees),
+            'window': {source: len(samples) for source, samples in self.samples.items()}
+        }
@@ -0,0 +1,376 @@
+import asyncio
+import json
+import re
+import time
+from collections import deque
+import aiohttp
+import base58
+from raydium.instructions import RAYDIUM_PROGRAM_ID
+from utils.logger import setup_logger
+from utils.solana_rpc import rpc_call, websocket_url
+
+# Receives the creation fee of every initialize2, so its signature history is
+# almost exclusively new pools - far cheaper to page than the AMM program itself
+RAYDIUM_POOL_FEE_ACCOUNT = '7YttLkHDoNj9wyDur5pM1ejNaAvT9X4eqaYcHQqtj2G5'
+
+WSOL_MINT = 'So11111111111111111111111111111111111111112'
+QUOTE_MINTS = {
+    WSOL_MINT,
+    'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v',  # USDC
+    'Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB'   # USDT
+}
+
+INITIALIZE2_TAG = 1
+
+# Account positions in the initialize2 instruction
+_AMM_INDEX = 4
+_LP_MINT_INDEX = 7
+_COIN_MINT_INDEX = 8
+_PC_MINT_INDEX = 9
+_MARKET_INDEX = 16
+
+# Largest page getSignaturesForAddress returns
+SIGNATURE_PAGE_SIZE = 1000
+
+# Polls a signature whose transaction couldn't be fetched is retried in
+SIGNATURE_RETRIES = 5
+
+_INIT_LOG = re.compile(r'initialize2: InitializeInstruction2 \{(.*)\}')
+_INIT_FIELD = re.compile(r'(\w+): (\d+)')
+
+def _has_initialize2(logs):
+    return any('initialize2' in line for line in logs or [])
+
+def _parse_init_log(logs):
+    """Pull open_time and the initial amounts out of the initialize2 log line"""
+    for line in logs or []:
+        match = _INIT_LOG.search(line)
+        if match:
+            return {key: int(value) for key, value in _INIT_FIELD.findall(match.group(1))}
+    return {}
+
+def _raydium_instructions(message, meta):
+    """Yield every top-level and inner (CPI) instruction of a transaction"""
+    for instruction in message.get('instructions', []):
+        yield instruction
+    for inner in (meta or {}).get('innerInstructions') or []:
+        for instruction in inner.get('instructions', []):
+            yield instruction
+
+def parse_pool_creation(tx, signature=None):
+    """Build a token record from a transaction containing a Raydium initialize2
+
+    Returns None if the transaction did not create a pool.
+    """
+    if not tx:
+        return None
+    meta = tx.get('meta') or {}
+    if meta.get('err') is not None:
+        return None
+
+    message = tx['transaction']['message']
+    loaded = meta.get('loadedAddresses') or {}
+    account_keys = (
+        list(message['accountKeys'])
+        + list(loaded.get('writable', []))
+        + list(loaded.get('readonly', []))
+    )
+    program_id = str(RAYDIUM_PROGRAM_ID)
+
+    for instruction in _raydium_instructions(message, meta):
+        if account_keys[instruction['programIdIndex']] != program_id:
+            continue
+        data = base58.b58decode(instruction.get('data', ''))
+        if not data or data[0] != INITIALIZE2_TAG:
+            continue
+
+        accounts = [account_keys[i] for i in instruction['accounts']]
+        if len(accounts) <= _MARKET_INDEX:
+            continue
+
+        coin_mint = accounts[_COIN_MINT_INDEX]
+        pc_mint = accounts[_PC_MINT_INDEX]
+        if coin_mint in QUOTE_MINTS and pc_mint not in QUOTE_MINTS:
+            base_mint, quote_mint = pc_mint, coin_mint
+        else:
+            base_mint, quote_mint = coin_mint, pc_mint
+
+        init = _parse_init_log(meta.get('logMessages'))
+        block_time = tx.get('blockTime')
+        return {
+            'address': base_mint,
+            'symbol': 'Unknown',
+            'name': 'Unknown',
+            'price': 0,
+            'liquidity': 0,
+            'volume': 0,
+            'created_at': block_time or int(time.time()),
+            'slot': tx.get('slot'),
+            'pool_address': accounts[_AMM_INDEX],
+            'quote_mint': quote_mint,
+            'lp_mint': accounts[_LP_MINT_INDEX],
+            'market': accounts[_MARKET_INDEX],
+            'signature': signature or tx['transaction']['signatures'][0],
+            'open_time': init.get('open_time'),
+            'init_coin_amount': init.get('init_coin_amount'),
+            'init_pc_amount': init.get('init_pc_amount')
+        }
+    return None
+
+class RaydiumPoolFeed:
+    """New-pool feed for the Raydium AMM v4 program
+
+    Two transports are supported:
+      - ``websocket``: ``logsSubscribe`` mentioning the AMM program, pushing
+        each initialize2 signature as soon as it is confirmed
+      - ``signatures``: polling ``getSignaturesForAddress`` with an ``until``
+        cursor so each page only holds signatures since the previous one
+    """
+
+    TRANSPORTS = ('websocket', 'signatures')
+
+    def __init__(self, rpc_url, transport='websocket', ws_url=None, session=None,
+                 poll_interval=1.0, commitment='confirmed', cursor_address=RAYDIUM_POOL_FEE_ACCOUNT):
+        if transport not in self.TRANSPORTS:
+            raise ValueError(f"Unknown pool feed transport: {transport}")
+
+        self.logger = setup_logger("raydium_pool_feed")
+        self.rpc_url = rpc_url
+        self.ws_url = ws_url or websocket_url(rpc_url)
+        self.transport = transport
+        self.session = session
+        self._owns_session = False
+        self.poll_interval = poll_interval
+        self.commitment = commitment
+        self.cursor_address = cursor_address
+        self.until = None
+        self.subscribers = []
+        self.is_running = False
+        self.task = None
+        self._pending = set()
+        self._seen = deque(maxlen=2048)
+        self._seen_set = set()
+        self._fetching = set()
+        # signature -> (slot, failed attempts), polled again ahead of new signatures
+        self._retries = {}
+        self.stats = {
+            'pools_detected': 0,
+            'transactions_fetched': 0,
+            'reconnects': 0,
+            'errors': 0,
+            'dropped_signatures': 0,
+            'last_detection_lag': None
+        }
+
+    async def subscribe(self, callback):
+        """Register an async callback for new pool records"""
+        if not callable(callback):
+            raise ValueError("Callback must be callable")
+        self.subscribers.append(callback)
+
+    async def start(self):
+        """Start watching for new pools"""
+        if self.is_running:
+            return
+        if not self.session:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            self._owns_session = True
+
+        self.is_running = True
+        self.task = asyncio.create_task(self._run())
+        self.logger.info(f"Watching Raydium pool creations over {self.transport}")
+
+    async def stop(self):
+        """Stop watching and release the session if we created it"""
+        self.is_running = False
+        tasks = [task for task in [self.task, *self._pending] if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.task = None
+        self._pending.clear()
+        self._fetching.clear()
+
+        if self.session and self._owns_session:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
+
+    async def _run(self):
+        """Run the transport, reconnecting with backoff on failure"""
+        backoff = 1
+        while self.is_running:
+            try:
+                if self.transport == 'websocket':
+                    await self._run_websocket()
+                else:
+                    await self._run_signatures()
+                backoff = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                self.logger.error(f"Pool feed error: {str(e)}")
+
+            if self.is_running:
+                self.stats['reconnects'] += 1
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    async def _run_websocket(self):
+        async with self.session.ws_connect(self.ws_url, heartbeat=30) as ws:
+            await ws.send_json({
+                'jsonrpc': '2.0',
+                'id': 1,
+                'method': 'logsSubscribe',
+                'params': [
+                    {'mentions': [str(RAYDIUM_PROGRAM_ID)]},
+                    {'commitment': self.commitment}
+                ]
+            })
+
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    break
+                data = json.loads(msg.data)
+                if data.get('method') != 'logsNotification':
+                    continue
+
+                result = data['params']['result']
+                value = result['value']
+                if value.get('err') is None and _has_initialize2(value.get('logs')):
+                    # Fetch the transaction off the read loop so notifications keep flowing
+                    task = asyncio.create_task(
+                        self._handle_signature(value['signature'], result['context']['slot'])
+                    )
+                    self._pending.add(task)
+                    task.add_done_callback(self._pending.discard)
+
+    async def _run_signatures(self):
+        while self.is_running:
+            await self.poll_once()
+            await asyncio.sleep(self.poll_interval)
+
+    async def _signatures_since_cursor(self):
+        """Every signature newer than the cursor, newest first, paging back with ``before``"""
+        entries = []
+        options = {'limit': SIGNATURE_PAGE_SIZE, 'commitment': self.commitment, 'until': self.until}
+        while True:
+            page = await rpc_call(
+                self.session, self.rpc_url, 'getSignaturesForAddress', [self.cursor_address, options]
+            )
+            entries.extend(page or [])
+            if not page or len(page) < SIGNATURE_PAGE_SIZE:
+                return entries
+            # A full page may not reach the cursor yet (e.g. after a stall)
+            options = {**options, 'before': page[-1]['signature']}
+
+    async def poll_once(self):
+        """Fetch signatures newer than the cursor and process them oldest first
+
+        Signatures whose transaction couldn't be fetched last time go first.
+        """
+        if self.until is None:
+            # Start from "now" rather than replaying the account's history
+            entries = await rpc_call(
+                self.session, self.rpc_url, 'getSignaturesForAddress',
+                [self.cursor_address, {'limit': 1, 'commitment': self.commitment}]
+            )
+            if entries:
+                self.until = entries[0]['signature']
+            return []
+
+        entries = await self._signatures_since_cursor()
+        if entries:
+            self.until = entries[0]['signature']
+
+        pending = [(signature, slot) for signature, (slot, _) in self._retries.items()]
+        pending += [(entry['signature'], entry.get('slot')) for entry in reversed(entries) if entry.get('err') is None]
+        records = []
+        for signature, slot in pending:
+            record = await self._handle_signature(signature, slot)
+            if record:
+                records.append(record)
+            self._track_retry(signature, slot)
+        return records
+
+    def _track_retry(self, signature, slot):
+        """Queue a signature the cursor has passed for another try unless it was handled"""
+        if signature in self._seen_set:
+            self._retries.pop(signature, None)
+            return
+        attempts = self._retries.get(signature, (slot, 0))[1] + 1
+        if attempts < SIGNATURE_RETRIES:
+            self._retries[signature] = (slot, attempts)
+            return
+        del self._retries[signature]
+        self.stats['dropped_signatures'] += 1
+        self.logger.warning(f"Giving up on signature {signature} after {attempts} attempts")
+
+    async def _fetch_transaction(self, signature, attempts=3):
+        for attempt in range(attempts):
+            tx = await rpc_call(
+                self.session, self.rpc_url, 'getTransaction',
+                [signature, {
+                    'encoding': 'json',
+                    'commitment': self.commitment,
+                    'maxSupportedTransactionVersion': 0
+                }]
+            )
+            self.stats['transactions_fetched'] += 1
+            if tx:
+                return tx
+            # The node that pushed the notification may be ahead of the one serving reads
+            await asyncio.sleep(0.2 * (attempt + 1))
+        return None
+
+    def _mark_seen(self, signature):
+        if len(self._seen) == self._seen.maxlen:
+            self._seen_set.discard(self._seen[0])
+        self._seen.append(signature)
+        self._seen_set.add(signature)
+
+    async def _handle_signature(self, signature, slot=None):
+        """Fetch, parse and publish one signature
+
+        It only counts as seen once its transaction has been fetched and
+        parsed, so a failed read can be tried again.
+        """
+        if signature in self._seen_set or signature in self._fetching:
+            return None
+        self._fetching.add(signature)
+
+        try:
+            tx = await self._fetch_transaction(signature)
+            if tx is None:
+                self.stats['errors'] += 1
+                self.logger.warning(f"Transaction {signature} not available")
+                return None
+            record = parse_pool_creation(tx, signature)
+            self._mark_seen(signature)
+            if not record:
+                return None
+            if record['slot'] is None:
+                record['slot'] = slot
+
+            lag = time.time() - record['created_at']
+            self.stats['pools_detected'] += 1
+            self.stats['last_detection_lag'] = lag
+            self.logger.info(
+                f"New Raydium pool {record['pool_address']} for {record['address']} "
+                f"(slot {record['slot']}, {lag:.1f}s after creation)"
+            )
+
+            for callback in self.subscribers:
+                try:
+                    await callback(record)
+                except Exception as e:
+                    self.logger.error(f"Pool subscriber error: {str(e)}")
+            return record
+
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.logger.error(f"Error processing signature {signature}: {str(e)}")
+            return None
+        finally:
+            self._fetching.discard(signature)
@@ -0,0 +1,210 @@
+import asyncio
+import base64
+import time
+from collections import deque
+import aiohttp
+from utils.logger import setup_logger
+from utils.exceptions import TransactionError
+from utils.solana_rpc import rpc_call
+
+# A blockhash is valid for 150 blocks, roughly a minute of slots
+BLOCKHASH_TTL = 60
+
+def encode_transaction(transaction):
+    """Base64 wire form of a signed transaction (or of its raw bytes)"""
+    raw = transaction if isinstance(transaction, (bytes, bytearray)) else bytes(transaction.serialize())
+    return base64.b64encode(raw).decode()
+
+class RacingSender:
+    """Sends each signed transaction to every RPC endpoint at once
+
+    The first endpoint to accept the transaction supplies the signature; the
+    others keep going in the background so their latency is still measured.
+    Until the signature is confirmed (or its blockhash expires) the same
+    bytes are rebroadcast to all endpoints every ``rebroadcast_interval``.
+    With a BlockhashCache the expiry check reads the cached block height
+    instead of asking an endpoint on every rebroadcast.
+    """
+
+    def __init__(self, endpoints, session=None, confirmations=None, rebroadcast_interval=2.0,
+                 blockhash_ttl=BLOCKHASH_TTL, blockhashes=None, clock=time.monotonic):
+        if not endpoints:
+            raise ValueError("RacingSender needs at least one RPC endpoint")
+
+        self.logger = setup_logger("tx_sender")
+        self.endpoints = list(endpoints)
+        self.session = session
+        self._owns_session = False
+        self.confirmations = confirmations
+        self.rebroadcast_interval = rebroadcast_interval
+        self.blockhash_ttl = blockhash_ttl
+        self.blockhashes = blockhashes
+        self.clock = clock
+        self.rebroadcasts = {}
+        self.accepted_by = {}
+        self._background = set()
+        self.endpoint_stats = {
+            endpoint: {
+                'transactions': 0,
+                'sent': 0,
+                'accepted': 0,
+                'errors': 0,
+                'first': 0,
+                'landed': 0,
+                'latencies': deque(maxlen=200)
+            }
+            for endpoint in self.endpoints
+        }
+
+    def _ensure_session(self):
+        if not self.session:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            self._owns_session = True
+
+    async def _send_to(self, endpoint, payload):
+        stats = self.endpoint_stats[endpoint]
+        started = self.clock()
+        # Counted once the endpoint answers - a resend cancelled mid-flight has no outcome
+        try:
+            signature = await rpc_call(self.session, endpoint, 'sendTransaction', [
+                payload,
+                {'encoding': 'base64', 'skipPreflight': True, 'maxRetries': 0}
+            ])
+        except Exception:
+            stats['sent'] += 1
+            stats['errors'] += 1
+            raise
+        stats['sent'] += 1
+        stats['accepted'] += 1
+        stats['latencies'].append((self.clock() - started) * 1000)
+        self.accepted_by.setdefault(signature, set()).add(endpoint)
+        return signature
+
+    async def _race(self, payload):
+        """Fan out one send, returning the first accepted signature and its endpoint"""
+        tasks = {
+            asyncio.create_task(self._send_to(endpoint, payload)): endpoint
+            for endpoint in self.endpoints
+        }
+        pending = set(tasks)
+        errors = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), tasks[task]
+                    errors.append(f"{tasks[task]}: {task.exception()}")
+        finally:
+            # Let the slower endpoints finish so their latency is recorded
+            for task in pending:
+                self._background.add(task)
+                task.add_done_callback(self._finish_background)
+
+        raise TransactionError(f"No RPC endpoint accepted the transaction ({'; '.join(errors)})")
+
+    def _finish_background(self, task):
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    async def send(self, transaction, last_valid_block_height=None):
+        """Race the transaction to every endpoint and keep rebroadcasting it until confirmed"""
+        self._ensure_session()
+        payload = encode_transaction(transaction)
+        if last_valid_block_height is None and self.blockhashes is not None:
+            last_valid_block_height = self.blockhashes.valid_until(getattr(transaction, 'recent_blockhash', None))
+        for stats in self.endpoint_stats.values():
+            stats['transactions'] += 1
+        signature, endpoint = await self._race(payload)
+        self.endpoint_stats[endpoint]['first'] += 1
+        self.logger.info(f"📤 Transaction sent: {signature} (first: {endpoint})")
+
+        if signature not in self.rebroadcasts:
+            self.rebroadcasts[signature] = asyncio.create_task(
+                self._rebroadcast(signature, payload, last_valid_block_height)
+            )
+        return signature
+
+    async def _blockhash_expired(self, started, last_valid_block_height):
+        if last_valid_block_height is None:
+            return self.clock() - started >= self.blockhash_ttl
+        if self.blockhashes is not None:
+            expired = self.blockhashes.is_expired(last_valid_block_height)
+            if expired is not None:
+                return expired
+        height = await rpc_call(self.session, self.endpoints[0], 'getBlockHeight', [{'commitment': 'confirmed'}])
+        return height > last_valid_block_height
+
+    async def _rebroadcast(self, signature, payload, last_valid_block_height):
+        started = self.clock()
+        try:
+            while True:
+                await asyncio.sleep(self.rebroadcast_interval)
+                try:
+                    if await self._blockhash_expired(started, last_valid_block_height):
+                        self.logger.warning(f"Blockhash expired, stopped rebroadcasting {signature}")
+                        self.accepted_by.pop(signature, None)
+                        return
+                    await asyncio.gather(
+                        *(self._send_to(endpoint, payload) for endpoint in self.endpoints),
+                        return_exceptions=True
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.logger.warning(f"Rebroadcast error: {str(e)}")
+        finally:
+            self.rebroadcasts.pop(signature, None)
+
+    def stop_rebroadcast(self, signature):
+        task = self.rebroadcasts.pop(signature, None)
+        if task:
+            task.cancel()
+
+    async def confirm(self, signature, timeout=None):
+        """Wait for confirmation through the confirmation service, then stop rebroadcasting"""
+        try:
+            status = await self.confirmations.confirm(signature, timeout=timeout or self.blockhash_ttl)
+        finally:
+            self.stop_rebroadcast(signature)
+
+        for endpoint in self.accepted_by.pop(signature, ()):
+            self.endpoint_stats[endpoint]['landed'] += 1
+        return status
+
+    async def send_and_confirm(self, transaction, last_valid_block_height=None, timeout=None):
+        signature = await self.send(transaction, last_valid_block_height)
+        await self.confirm(signature, timeout)
+        return signature
+
+    async def close(self):
+        for signature in list(self.rebroadcasts):
+            self.stop_rebroadcast(signature)
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+
+        if self.session and self._owns_session:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
+
+    def get_stats(self):
+        """Per-endpoint acceptance, first-response and landing rates with latency"""
+        stats = {}
+        for endpoint, data in self.endpoint_stats.items():
+            latencies = sorted(data['latencies'])
+            stats[endpoint] = {
+                'transactions': data['transactions'],
+                'sent': data['sent'],
+                'accepted': data['accepted'],
+                'errors': data['errors'],
+                'first': data['first'],
+                'landed': data['landed'],
+                'accept_rate': data['accepted'] / data['sent'] if data['sent'] else 0.0,
+                'land_rate': data['landed'] / data['transactions'] if data['transactions'] else 0.0,
+                'avg_latency_ms': sum(latencies) / len(latencies) if latencies else 0.0,
+                'p90_latency_ms': latencies[int(len(latencies) * 0.9)] if latencies else 0.0
+            }
+        return stats
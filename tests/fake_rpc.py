@@ -0,0 +1,86 @@
+"""Local JSON-RPC / PubSub server used to test RPC-facing components"""
+import asyncio
+import json
+from aiohttp import web, WSMsgType
+
+class FakeRpcServer:
+    def __init__(self):
+        self.handlers = {}
+        self.calls = []
+        self.ws_messages = []
+        self.notifications = asyncio.Queue()
+        self.runner = None
+        self.url = None
+        self.ws_url = None
+
+    def on(self, method, handler):
+        """Answer ``method`` with ``handler(params)``, a value or a coroutine"""
+        self.handlers[method] = handler
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/', self._handle_rpc)
+        app.router.add_get('/ws', self._handle_ws)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/"
+        self.ws_url = f"ws://127.0.0.1:{port}/ws"
+        return self
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+    async def _answer(self, request):
+        method = request['method']
+        params = request.get('params', [])
+        self.calls.append((method, params))
+        handler = self.handlers.get(method)
+        if handler is None:
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32601, 'message': f"{method} not found"}}
+        result = handler(params) if callable(handler) else handler
+        if asyncio.iscoroutine(result):
+            result = await result
+        if isinstance(result, Exception):
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32000, 'message': str(result)}}
+        return {'jsonrpc': '2.0', 'id': request['id'], 'result': result}
+
+    async def _handle_rpc(self, request):
+        payload = await request.json()
+        if isinstance(payload, list):
+            return web.json_response([await self._answer(item) for item in payload])
+        return web.json_response(await self._answer(payload))
+
+    async def _handle_ws(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subscriptions = 0
+
+        async def pump():
+            while True:
+                message = await self.notifications.get()
+                await ws.send_str(json.dumps(message))
+
+        pump_task = asyncio.create_task(pump())
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    break
+                data = json.loads(msg.data)
+                self.ws_messages.append(data)
+                subscriptions += 1
+                await ws.send_str(json.dumps({'jsonrpc': '2.0', 'id': data['id'], 'result': subscriptions}))
+        finally:
+            pump_task.cancel()
+        return ws
+
+    def notify(self, method, subscription, result):
+        """Push a PubSub notification to the connected websocket client"""
+        self.notifications.put_nowait({
+            'jsonrpc': '2.0',
+            'method': method,
+            'params': {'result': result, 'subscription': subscription}
+        })
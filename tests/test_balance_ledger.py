@@ -0,0 +1,79 @@
+import asyncio
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.balance_ledger import BalanceLedger, LAMPORTS_PER_SOL
+from utils.exceptions import InsufficientBalanceError
+from fake_rpc import FakeRpcServer
+
+OWNER = 'Wallet1111111111111111111111111111111111111'
+
+def make_ledger(sol=1.0, slot=100):
+    ledger = BalanceLedger('http://unused', OWNER)
+    ledger.apply_chain_balance(int(sol * LAMPORTS_PER_SOL), slot)
+    return ledger
+
+def test_reservations_hold_funds_until_released():
+    ledger = make_ledger(1.0)
+    first = ledger.reserve(0.4)
+    ledger.reserve(0.4)
+
+    assert not ledger.can_afford(0.4)
+    with pytest.raises(InsufficientBalanceError):
+        ledger.reserve(0.4)
+
+    ledger.release(first)
+    assert ledger.can_afford(0.4)
+    assert ledger.balance == pytest.approx(0.6)
+
+def test_settled_spend_stays_deducted_until_the_chain_catches_up():
+    ledger = make_ledger(1.0, slot=100)
+    reservation = ledger.reserve(0.25)
+    ledger.settle(reservation, slot=105)
+    assert ledger.balance == pytest.approx(0.75)
+
+    # An update from before the spend landed doesn't give the funds back
+    ledger.apply_chain_balance(LAMPORTS_PER_SOL, 103)
+    assert ledger.balance == pytest.approx(0.75)
+
+    ledger.apply_chain_balance(int(0.74 * LAMPORTS_PER_SOL), 105)
+    assert ledger.balance == pytest.approx(0.74)
+    assert not ledger.unsettled
+
+    # Stale notifications are ignored outright
+    ledger.apply_chain_balance(LAMPORTS_PER_SOL, 90)
+    assert ledger.balance == pytest.approx(0.74)
+
+def test_seeds_once_then_follows_the_account_stream():
+    async def run():
+        server = await FakeRpcServer().start()
+        server.on('getBalance', {'context': {'slot': 10}, 'value': 2 * LAMPORTS_PER_SOL})
+        ledger = BalanceLedger(server.url, OWNER, ws_url=server.ws_url, reconcile_interval=60)
+        await ledger.start()
+        try:
+            seeded = ledger.balance
+            for _ in range(100):
+                if server.ws_messages:
+                    break
+                await asyncio.sleep(0.02)
+            server.notify('accountNotification', 1, {
+                'context': {'slot': 11},
+                'value': {'lamports': LAMPORTS_PER_SOL // 2, 'data': ['', 'base64']}
+            })
+            for _ in range(100):
+                if ledger.slot == 11:
+                    break
+                await asyncio.sleep(0.02)
+            return seeded, ledger.balance, server
+        finally:
+            await ledger.stop()
+            await server.stop()
+
+    seeded, streamed, server = asyncio.run(run())
+    assert seeded == 2.0 and streamed == 0.5
+    assert [method for method, _ in server.calls] == ['getBalance']
+    assert server.ws_messages[0]['method'] == 'accountSubscribe'
+    assert server.ws_messages[0]['params'][0] == OWNER
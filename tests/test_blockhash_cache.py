@@ -0,0 +1,101 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.append(str(Path(__file__).parent.parent))
+
+import aiohttp
+from solders.hash import Hash
+
+from services.blockhash_cache import BlockhashCache
+from services.tx_sender import RacingSender
+from fake_rpc import FakeRpcServer
+
+HASHES = [str(Hash.new_unique()) for _ in range(3)]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def serve_chain(server, state):
+    def latest(params):
+        return {
+            'context': {'slot': state['slot']},
+            'value': {'blockhash': HASHES[state['hash']], 'lastValidBlockHeight': state['height'] + 150}
+        }
+    server.on('getLatestBlockhash', latest)
+    server.on('getBlockHeight', lambda params: state['height'])
+
+def test_serves_from_memory_and_refetches_inline_when_stale():
+    state = {'slot': 1000, 'height': 900, 'hash': 0}
+    clock = FakeClock()
+
+    async def run():
+        server = await FakeRpcServer().start()
+        serve_chain(server, state)
+        session = aiohttp.ClientSession()
+        cache = BlockhashCache(server.url, session=session, max_age=5, clock=clock)
+        try:
+            # Concurrent callers before the first refresh share one fetch
+            first = await asyncio.gather(*(cache.get() for _ in range(5)))
+            fetches = len([call for call in server.calls if call[0] == 'getLatestBlockhash'])
+
+            clock.now = 2
+            cached = await cache.get()
+
+            state.update(slot=1010, height=908, hash=1)
+            clock.now = 10
+            refreshed = await cache.get()
+            return first, fetches, cached, refreshed, cache
+        finally:
+            await session.close()
+            await server.stop()
+
+    first, fetches, cached, refreshed, cache = asyncio.run(run())
+    assert fetches == 1
+    assert set(first) == {(Hash.from_string(HASHES[0]), 1050)}
+    assert cached == first[0]
+    assert refreshed == (Hash.from_string(HASHES[1]), 1058)
+    assert cache.valid_until(HASHES[0]) == 1050 and cache.valid_until(HASHES[2]) is None
+
+    stats = cache.get_stats()
+    assert stats['refreshes'] == 2 and stats['changes'] == 2 and stats['served'] == 7
+    assert stats['inline_fetches'] == 6
+    assert stats['slot'] == 1010 and stats['blocks_remaining'] == 150
+    assert stats['age_ms'] == 0 and stats['fresh']
+
+def test_sender_stops_rebroadcasting_once_cached_height_passes_blockhash():
+    state = {'slot': 1000, 'height': 900, 'hash': 0}
+
+    async def run():
+        server = await FakeRpcServer().start()
+        serve_chain(server, state)
+        server.on('sendTransaction', 'Sig1')
+        session = aiohttp.ClientSession()
+        cache = BlockhashCache(server.url, session=session, interval=0.02)
+        sender = RacingSender([server.url], session=session, rebroadcast_interval=0.02, blockhashes=cache)
+        await cache.start()
+        try:
+            blockhash = await cache.get_blockhash()
+            transaction = SimpleNamespace(serialize=lambda: b'\x01signed', recent_blockhash=blockhash)
+            await sender.send(transaction)
+            await asyncio.sleep(0.1)
+            rebroadcasting = 'Sig1' in sender.rebroadcasts
+
+            state['height'] = 1051
+            await asyncio.sleep(0.15)
+            return rebroadcasting, 'Sig1' in sender.rebroadcasts, server.calls
+        finally:
+            await sender.close()
+            await cache.stop()
+            await session.close()
+            await server.stop()
+
+    rebroadcasting, still_rebroadcasting, calls = asyncio.run(run())
+    assert rebroadcasting and not still_rebroadcasting
+    # Expiry was read from the cache, the background refresh is the only height poll
+    assert len([call for call in calls if call[0] == 'getBlockHeight']) == \
+        len([call for call in calls if call[0] == 'getLatestBlockhash'])
@@ -0,0 +1,78 @@
+import sys
+import threading
+from pathlib import Path
+from queue import Empty
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from utils.candidate_queue import CandidateQueue
+
+NOW = 10_000.0
+
+def make_token(address, age=0, liquidity=0, volume=0, source='test'):
+    return {
+        'address': address,
+        'created_at': NOW - age,
+        'liquidity': liquidity,
+        'volume': volume,
+        'source': source
+    }
+
+def make_queue(**kwargs):
+    return CandidateQueue(max_age=60, clock=lambda: NOW, **kwargs)
+
+def test_best_candidate_is_delivered_first():
+    queue = make_queue()
+    queue.put(make_token('junk', age=30))
+    queue.put(make_token('fresh-pool', age=1, liquidity=50_000, volume=10_000))
+    queue.put(make_token('middling', age=10, liquidity=1_000))
+
+    assert [queue.get_nowait()['address'] for _ in range(3)] == ['fresh-pool', 'middling', 'junk']
+    with pytest.raises(Empty):
+        queue.get_nowait()
+
+def test_source_weights_and_custom_score():
+    queue = make_queue(source_weights={'chain': 1.0, 'aggregator': 0.0})
+    queue.put(make_token('aggregated', source='aggregator'))
+    queue.put(make_token('on-chain', source='chain'))
+    assert queue.get_nowait()['address'] == 'on-chain'
+
+    queue = make_queue(score_func=lambda token: -token['liquidity'])
+    queue.put(make_token('deep', liquidity=100))
+    queue.put(make_token('shallow', liquidity=1))
+    assert queue.get_nowait()['address'] == 'shallow'
+
+def test_stale_candidates_are_evicted():
+    clock = [NOW]
+    queue = CandidateQueue(max_age=60, clock=lambda: clock[0])
+
+    assert not queue.put(make_token('already-old', age=61))
+    queue.put(make_token('ages-out', age=50))
+    clock[0] += 20
+
+    with pytest.raises(Empty):
+        queue.get_nowait()
+    assert queue.get_stats()['dropped_stale'] == 2
+
+def test_full_queue_drops_lowest_score():
+    queue = make_queue(maxsize=2)
+    queue.put(make_token('low', liquidity=10))
+    queue.put(make_token('mid', liquidity=1_000))
+
+    assert not queue.put(make_token('lower', liquidity=1))
+    assert queue.put(make_token('high', liquidity=100_000))
+
+    stats = queue.get_stats()
+    assert stats['depth'] == 2
+    assert stats['dropped_full'] == 2
+    assert [queue.get_nowait()['address'] for _ in range(2)] == ['high', 'mid']
+
+def test_blocking_get_wakes_up_on_put():
+    queue = make_queue()
+    timer = threading.Timer(0.05, queue.put, args=[make_token('late')])
+    timer.start()
+
+    assert queue.get(timeout=2)['address'] == 'late'
+    with pytest.raises(Empty):
+        queue.get(timeout=0.01)
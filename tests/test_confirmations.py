@@ -0,0 +1,121 @@
+import asyncio
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import aiohttp
+import pytest
+
+from services.confirmations import ConfirmationService
+from utils.exceptions import TransactionError
+from fake_rpc import FakeRpcServer
+
+async def wait_for(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.02)
+
+def test_signatures_share_one_websocket():
+    async def run():
+        server = await FakeRpcServer().start()
+        service = ConfirmationService(server.url, ws_url=server.ws_url, sweep_after=60)
+        await service.start()
+        try:
+            await wait_for(lambda: service.ws is not None)
+            good = asyncio.create_task(service.confirm('SigGood'))
+            bad = asyncio.create_task(service.confirm('SigBad'))
+            await wait_for(lambda: len(service._subscriptions) == 2)
+
+            server.notify('signatureNotification', 1, {'context': {'slot': 7}, 'value': {'err': None}})
+            server.notify('signatureNotification', 2, {'context': {'slot': 7}, 'value': {'err': {'InstructionError': [0, 'Custom']}}})
+            results = await asyncio.gather(good, bad, return_exceptions=True)
+            return results, server, service.get_stats()
+        finally:
+            await service.stop()
+            await server.stop()
+
+    (status, error), server, stats = asyncio.run(run())
+    assert status['slot'] == 7 and status['source'] == 'websocket'
+    assert isinstance(error, TransactionError)
+    assert [message['method'] for message in server.ws_messages] == ['signatureSubscribe'] * 2
+    assert server.calls == []
+    assert stats['confirmed'] == 1 and stats['failed'] == 1
+    assert sum(stats['histogram']['websocket'].values()) == 1
+
+def test_poll_checks_all_pending_in_one_call():
+    statuses = {'SigA': {'slot': 3, 'err': None, 'confirmationStatus': 'confirmed'},
+                'SigB': {'slot': 3, 'err': None, 'confirmationStatus': 'processed'}}
+
+    def get_statuses(params):
+        return {'context': {'slot': 3}, 'value': [statuses.get(sig) for sig in params[0]]}
+
+    async def run():
+        server = await FakeRpcServer().start()
+        server.on('getSignatureStatuses', get_statuses)
+        session = aiohttp.ClientSession()
+        service = ConfirmationService(server.url, session=session, transport='poll', poll_interval=0.02)
+        await service.start()
+        try:
+            first = asyncio.create_task(service.confirm('SigA'))
+            second = asyncio.create_task(service.confirm('SigB'))
+            status = await first
+            statuses['SigB']['confirmationStatus'] = 'finalized'
+            await second
+            return status, server.calls
+        finally:
+            await service.stop()
+            await session.close()
+            await server.stop()
+
+    status, calls = asyncio.run(run())
+    assert status['source'] == 'poll'
+    assert calls[0] == ('getSignatureStatuses', [['SigA', 'SigB'], {'searchTransactionHistory': False}])
+
+def test_unconfirmed_signature_times_out():
+    async def run():
+        service = ConfirmationService('http://unused', transport='poll')
+        with pytest.raises(TransactionError):
+            await service.confirm('SigLost', timeout=0.05)
+        return service
+
+    service = asyncio.run(run())
+    assert service.stats['timeouts'] == 1
+    assert not service.pending
+
+def test_one_waiter_timing_out_does_not_cancel_the_others():
+    async def run():
+        service = ConfirmationService('http://unused', transport='poll')
+        impatient = asyncio.create_task(service.confirm('SigShared', timeout=0.05))
+        patient = asyncio.create_task(service.confirm('SigShared', timeout=5))
+        with pytest.raises(TransactionError):
+            await impatient
+        assert 'SigShared' in service.pending
+
+        service._resolve('SigShared', 42, None, 'poll')
+        return await patient, service
+
+    status, service = asyncio.run(run())
+    assert status['slot'] == 42
+    assert not service.pending
+
+def test_abandoned_signature_is_unsubscribed():
+    async def run():
+        server = await FakeRpcServer().start()
+        service = ConfirmationService(server.url, ws_url=server.ws_url, sweep_after=60)
+        await service.start()
+        try:
+            await wait_for(lambda: service.ws is not None)
+            with pytest.raises(TransactionError):
+                await service.confirm('SigLost', timeout=0.1)
+            await wait_for(lambda: len(server.ws_messages) == 2)
+            return server.ws_messages, service
+        finally:
+            await service.stop()
+            await server.stop()
+
+    messages, service = asyncio.run(run())
+    assert [message['method'] for message in messages] == ['signatureSubscribe', 'signatureUnsubscribe']
+    assert messages[1]['params'] == [1]
+    assert not service._subscriptions and not service.pending
+    assert service.stats['unsubscriptions'] == 1
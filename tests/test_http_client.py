@@ -0,0 +1,72 @@
+import asyncio
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from aiohttp import web
+
+from utils.http_client import HttpClientPool
+
+async def start_server():
+    async def price(request):
+        return web.json_response({'price': 1.5})
+
+    app = web.Application()
+    app.router.add_route('*', '/price', price)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+def test_requests_reuse_prewarmed_connections():
+    async def run():
+        runner, port = await start_server()
+        pool = HttpClientPool()
+        try:
+            url = f"http://127.0.0.1:{port}/price"
+            assert await pool.prewarm([url]) == 1
+            for _ in range(3):
+                async with pool.get(url) as response:
+                    assert (await response.json())['price'] == 1.5
+            return pool.get_stats()
+        finally:
+            await pool.close()
+            await runner.cleanup()
+
+    stats = asyncio.run(run())
+    host_stats = next(iter(stats.values()))
+    assert host_stats['requests'] == 4
+    assert host_stats['connections_opened'] == 1
+    assert host_stats['connections_reused'] == 3
+    assert host_stats['errors'] == 0
+
+def test_each_host_gets_its_own_session():
+    async def run():
+        runner, port = await start_server()
+        pool = HttpClientPool(host_limits={'localhost': 2})
+        try:
+            local = pool.session_for(f"http://127.0.0.1:{port}/price")
+            named = pool.session_for(f"http://localhost:{port}/price")
+            again = pool.session_for(f"http://127.0.0.1:{port}/other")
+            assert named.connector.limit == 2
+            async with pool.post(f"http://localhost:{port}/price") as response:
+                assert response.status == 200
+            return local, named, again, pool
+        finally:
+            await pool.close()
+            await runner.cleanup()
+
+    local, named, again, pool = asyncio.run(run())
+    assert local is again and local is not named
+    assert pool.closed and local.closed and named.closed
+
+def test_prewarm_failure_is_not_fatal():
+    async def run():
+        pool = HttpClientPool(timeout=1)
+        try:
+            return await pool.prewarm(['http://127.0.0.1:1/'])
+        finally:
+            await pool.close()
+
+    assert asyncio.run(run()) == 0
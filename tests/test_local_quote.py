@@ -0,0 +1,82 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from raydium.quote import (
+    LocalQuoter, get_amount_in, get_amount_out, quote_batch, quote_pools, quote_swap, quote_swap_base_out
+)
+from utils.exceptions import PoolError
+
+TOKEN = 'Token1111111111111111111111111111111111111'
+WSOL = 'So11111111111111111111111111111111111111112'
+
+def make_pool(base_reserve=1_000_000 * 10 ** 6, quote_reserve=100 * 10 ** 9, address='Pool1'):
+    return {
+        'pool_address': address,
+        'base_mint': TOKEN,
+        'quote_mint': WSOL,
+        'base_reserve': base_reserve,
+        'quote_reserve': quote_reserve,
+        'base_decimals': 6,
+        'quote_decimals': 9,
+        'swap_fee_numerator': 25,
+        'swap_fee_denominator': 10_000
+    }
+
+def test_amount_out_matches_constant_product_with_fee():
+    amount_out, fee = get_amount_out(10_000, 1_000_000, 2_000_000, 25, 10_000)
+    assert fee == 25
+    assert amount_out == 2_000_000 * 9_975 // (1_000_000 + 9_975)
+
+    # The invariant never decreases
+    assert (1_000_000 + 10_000) * (2_000_000 - amount_out) >= 1_000_000 * 2_000_000
+
+def test_amount_in_round_trips_to_at_least_the_requested_output():
+    for wanted in (1, 1_000, 123_456):
+        amount_in, _ = get_amount_in(wanted, 1_000_000, 2_000_000, 25, 10_000)
+        assert get_amount_out(amount_in, 1_000_000, 2_000_000, 25, 10_000)[0] >= wanted
+    with pytest.raises(PoolError):
+        get_amount_in(2_000_000, 1_000_000, 2_000_000, 25, 10_000)
+
+def test_quotes_both_directions_with_impact_and_min_out():
+    pool = make_pool()
+    buy = quote_swap(pool, WSOL, 10 ** 9, slippage=0.01)
+    assert buy['spot_price'] == pytest.approx(1_000_000 / 100)
+    assert buy['price_impact'] == pytest.approx(0.00997, rel=1e-2)
+    assert buy['min_amount_out'] == int(buy['amount_out'] * 0.99)
+
+    sell = quote_swap(pool, TOKEN, buy['amount_out'])
+    assert sell['amount_out'] < 10 ** 9
+    exact = quote_swap_base_out(pool, WSOL, 5_000 * 10 ** 6, slippage=0.01)
+    assert exact['max_amount_in'] > exact['amount_in']
+
+    with pytest.raises(PoolError):
+        quote_swap(pool, 'Other111111111111111111111111111111111111', 1)
+
+def test_batch_agrees_with_exact_quotes():
+    np = pytest.importorskip('numpy')
+    pools = [make_pool(), make_pool(base_reserve=10 ** 12, quote_reserve=5 * 10 ** 9, address='Pool2')]
+    sizes = [10 ** 8, 10 ** 9, 5 * 10 ** 9]
+    amounts_out, impacts = quote_pools(pools, WSOL, sizes)
+
+    assert amounts_out.shape == (2, 3)
+    for row, pool in enumerate(pools):
+        for column, size in enumerate(sizes):
+            assert amounts_out[row, column] == pytest.approx(quote_swap(pool, WSOL, size)['amount_out'], rel=1e-12)
+    assert np.all(np.diff(impacts, axis=1) > 0)
+
+    single, _ = quote_batch([1_000], 1_000_000, 2_000_000, 25, 10_000)
+    assert single[0] == get_amount_out(1_000, 1_000_000, 2_000_000, 25, 10_000)[0]
+
+def test_local_quoter_only_serves_fresh_state():
+    now = [0.0]
+    quoter = LocalQuoter(max_age=2.0, clock=lambda: now[0])
+    assert quoter.quote(TOKEN, WSOL, 10 ** 9) is None
+
+    quoter.update(TOKEN, make_pool())
+    assert quoter.quote(TOKEN, WSOL, 10 ** 9)['amount_out'] > 0
+    now[0] = 2.5
+    assert quoter.quote(TOKEN, WSOL, 10 ** 9) is None
+    assert quoter.stats == {'local': 1, 'stale': 2}
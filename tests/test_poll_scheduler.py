@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from utils.poll_scheduler import PollScheduler, parse_retry_after
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_scheduler(clock):
+    # rng of 0.5 makes the jitter factor exactly 1
+    scheduler = PollScheduler(jitter=0.1, clock=clock, rng=lambda: 0.5)
+    scheduler.add_source('fast', 'a.example', 2, min_interval=1, max_interval=8)
+    scheduler.add_source('slow', 'b.example', 2, min_interval=1, max_interval=8)
+    return scheduler
+
+def test_interval_adapts_to_change_rate():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+
+    scheduler.record_result('fast', 200, changed=True)
+    assert scheduler.wait_time('fast') == pytest.approx(1)
+
+    for _ in range(5):
+        scheduler.record_result('slow', 200, changed=False)
+    assert scheduler.wait_time('slow') == pytest.approx(8)
+    assert scheduler.next_due()[0] == 'fast'
+
+def test_rate_limit_honours_retry_after_and_backs_off():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+
+    scheduler.record_result('fast', 429, retry_after='30')
+    assert scheduler.wait_time('fast') == pytest.approx(30)
+
+    scheduler.record_error('slow')
+    first = scheduler.wait_time('slow')
+    scheduler.record_error('slow')
+    assert scheduler.wait_time('slow') > first
+
+    scheduler.record_result('slow', 200, changed=False)
+    assert scheduler.sources['slow'].failures == 0
+    assert scheduler.get_stats()['fast']['rate_limited'] == 1
+
+def test_host_budget_limits_requests_per_minute():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    scheduler.set_budget('a.example', 12)  # burst of one, then one request every 5s
+
+    assert scheduler.wait_time('fast') == 0
+    scheduler.begin('fast')
+    assert scheduler.wait_time('fast') == pytest.approx(5)
+
+    clock.now += 5
+    assert scheduler.wait_time('fast') == pytest.approx(0)
+
+def test_parse_retry_after_accepts_seconds_and_dates():
+    assert parse_retry_after('12') == 12
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:10 GMT', now=1445412480) == pytest.approx(10)
+    assert parse_retry_after('soon') is None
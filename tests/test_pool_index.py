@@ -0,0 +1,89 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.append(str(Path(__file__).parent.parent))
+
+from solders.pubkey import Pubkey
+
+from utils.pool_index import PoolIndex
+from raydium.layouts import AMM_V4_SIZE
+
+WSOL = 'So11111111111111111111111111111111111111112'
+
+def new_key():
+    return str(Pubkey.new_unique())
+
+def test_lookup_and_incremental_appends_survive_reload(tmp_path):
+    path = tmp_path / 'pools.idx'
+    index = PoolIndex(path=str(path))
+    mint, pool, other_pool = new_key(), new_key(), new_key()
+
+    assert index.add(pool, mint, WSOL, slot=10)
+    assert not index.add(pool, mint, WSOL)
+    asyncio.run(index.on_pool_created({'pool_address': other_pool, 'address': mint, 'quote_mint': WSOL, 'slot': 12}))
+    index.close()
+
+    # Header plus two 96-byte records, appended without a rewrite
+    assert path.stat().st_size == 16 + 2 * 96
+
+    reloaded = PoolIndex(path=str(path))
+    assert reloaded.get(mint) == [pool, other_pool]
+    assert len(reloaded.get(WSOL)) == 2
+    assert reloaded.slot == 12
+    assert reloaded.get(new_key()) == []
+
+def test_torn_trailing_record_is_dropped(tmp_path):
+    path = tmp_path / 'pools.idx'
+    index = PoolIndex(path=str(path))
+    mint, pool = new_key(), new_key()
+    index.add(pool, mint, WSOL)
+    index.close()
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * 40)
+
+    reloaded = PoolIndex(path=str(path))
+    assert reloaded.get(mint) == [pool]
+    assert path.stat().st_size == 16 + 96
+
+def test_build_scans_only_the_mint_fields(tmp_path):
+    mint, pool = Pubkey.new_unique(), Pubkey.new_unique()
+    calls = []
+
+    class Client:
+        async def get_program_accounts(self, program_id, **kwargs):
+            calls.append(kwargs)
+            account = SimpleNamespace(data=bytes(mint) + bytes(Pubkey.from_string(WSOL)))
+            return SimpleNamespace(value=[SimpleNamespace(pubkey=pool, account=account)])
+
+    index = PoolIndex(path=str(tmp_path / 'pools.idx'))
+    assert asyncio.run(index.build(Client())) == 1
+    assert index.get(str(mint)) == [str(pool)]
+    assert calls[0]['filters'] == [AMM_V4_SIZE]
+    assert (calls[0]['data_slice'].offset, calls[0]['data_slice'].length) == (400, 64)
+    reloaded = PoolIndex(path=str(tmp_path / 'pools.idx'))
+    assert reloaded.get(str(mint)) == [str(pool)] and reloaded.complete
+
+def test_build_keeps_pools_added_while_it_scans(tmp_path):
+    index = PoolIndex(path=str(tmp_path / 'pools.idx'))
+    scanned_mint, scanned_pool = Pubkey.new_unique(), Pubkey.new_unique()
+    new_mint, new_pool = Pubkey.new_unique(), Pubkey.new_unique()
+
+    class SlowClient:
+        async def get_program_accounts(self, program_id, **kwargs):
+            await asyncio.sleep(0.01)
+            account = SimpleNamespace(data=bytes(scanned_mint) + bytes(Pubkey.from_string(WSOL)))
+            return SimpleNamespace(value=[SimpleNamespace(pubkey=scanned_pool, account=account)])
+
+    async def run():
+        build = asyncio.create_task(index.build(SlowClient()))
+        await asyncio.sleep(0)
+        # The feed reports a pool too new to be in the scan's snapshot
+        await index.on_pool_created({'pool_address': str(new_pool), 'address': str(new_mint), 'quote_mint': WSOL})
+        return await build
+
+    assert asyncio.run(run()) == 2
+    assert index.complete and index.get(str(new_mint)) == [str(new_pool)]
+    reloaded = PoolIndex(path=str(tmp_path / 'pools.idx'))
+    assert reloaded.get(str(new_mint)) == [str(new_pool)]
+    assert reloaded.get(str(scanned_mint)) == [str(scanned_pool)]
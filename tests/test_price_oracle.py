@@ -0,0 +1,96 @@
+import asyncio
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from aiohttp import web
+
+import services.price_oracle as oracle_module
+from services.price_oracle import PriceOracle
+
+JUPITER_PRICES = {f'Mint{i}': 0.001 * (i + 1) for i in range(150)}
+
+DEX_PAIRS = [
+    {'baseToken': {'address': 'NewMint'}, 'priceUsd': '0.2', 'liquidity': {'usd': 100}},
+    {'baseToken': {'address': 'NewMint'}, 'priceUsd': '0.25', 'liquidity': {'usd': 5000}}
+]
+
+async def start_fake_prices(monkeypatch, calls):
+    async def jupiter(request):
+        ids = request.query['ids'].split(',')
+        calls.append(('jupiter', ids))
+        await asyncio.sleep(0.05)
+        return web.json_response({'data': {
+            address: {'id': address, 'price': JUPITER_PRICES[address]}
+            for address in ids if address in JUPITER_PRICES
+        }})
+
+    async def dexscreener(request):
+        ids = request.match_info['ids'].split(',')
+        calls.append(('dexscreener', ids))
+        return web.json_response({'pairs': [pair for pair in DEX_PAIRS if pair['baseToken']['address'] in ids]})
+
+    app = web.Application()
+    app.router.add_get('/price', jupiter)
+    app.router.add_get('/tokens/{ids}', dexscreener)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    monkeypatch.setattr(oracle_module, 'JUPITER_PRICE_URL', f"{base_url}/price")
+    monkeypatch.setattr(oracle_module, 'DEXSCREENER_TOKENS_URL', f"{base_url}/tokens")
+    return runner
+
+def run_with_oracle(monkeypatch, scenario, **kwargs):
+    calls = []
+
+    async def run():
+        runner = await start_fake_prices(monkeypatch, calls)
+        oracle = PriceOracle(**kwargs)
+        try:
+            return await scenario(oracle)
+        finally:
+            await oracle.stop()
+            await runner.cleanup()
+
+    return asyncio.run(run()), calls
+
+def test_many_mints_are_fetched_in_batches(monkeypatch):
+    async def scenario(oracle):
+        return await oracle.get_prices(list(JUPITER_PRICES))
+
+    prices, calls = run_with_oracle(monkeypatch, scenario)
+    assert prices == JUPITER_PRICES
+    assert sorted(len(ids) for _, ids in calls) == [50, 100]
+
+def test_concurrent_lookups_share_one_request_and_hit_the_cache(monkeypatch):
+    async def scenario(oracle):
+        first = await asyncio.gather(*(oracle.get_price('Mint1') for _ in range(5)))
+        cached = await oracle.get_price('Mint1')
+        return first, cached, oracle.stats
+
+    (first, cached, stats), calls = run_with_oracle(monkeypatch, scenario, ttl=60)
+    assert first == [JUPITER_PRICES['Mint1']] * 5 and cached == JUPITER_PRICES['Mint1']
+    assert len(calls) == 1
+    assert stats['coalesced'] == 4 and stats['cache_hits'] == 1
+
+def test_jupiter_misses_fall_back_to_the_most_liquid_dexscreener_pair(monkeypatch):
+    async def scenario(oracle):
+        ticks = []
+
+        async def on_tick(tick):
+            ticks.append(tick)
+
+        await oracle.subscribe(on_tick)
+        oracle.track('Mint3')
+        oracle.track('NewMint')
+        oracle.track('Unknown')
+        prices = await oracle.poll_once()
+        await asyncio.sleep(0.01)
+        return prices, ticks
+
+    (prices, ticks), calls = run_with_oracle(monkeypatch, scenario)
+    assert prices == {'Mint3': JUPITER_PRICES['Mint3'], 'NewMint': 0.25}
+    assert [sorted(ids) for source, ids in calls if source == 'dexscreener'] == [['NewMint', 'Unknown']]
+    assert {tick['address']: tick['source'] for tick in ticks} == {'Mint3': 'jupiter', 'NewMint': 'dexscreener'}
@@ -0,0 +1,54 @@
+import asyncio
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import aiohttp
+
+from services.priority_fees import PriorityFeeEstimator, DEFAULT_FEES
+from fake_rpc import FakeRpcServer
+
+def test_defaults_until_sampled_then_percentile_tiers():
+    estimator = PriorityFeeEstimator('http://unused', min_fee=0, max_fee=10**9)
+    assert estimator.get_fee('entry') == DEFAULT_FEES['entry']
+
+    estimator.add_samples(list(range(0, 101)))
+    assert estimator.get_fee('exit') == 60
+    assert estimator.get_fee('entry') == 75
+    assert estimator.get_fee('stop_loss') == 95
+
+def test_tiers_are_clamped():
+    estimator = PriorityFeeEstimator('http://unused', min_fee=1000, max_fee=5000)
+    estimator.add_samples([0, 0, 0, 10**7])
+    assert estimator.get_fee('entry') == 1000
+    assert estimator.get_fee('stop_loss') == 5000
+
+def test_refresh_samples_only_new_slots_for_the_given_accounts():
+    async def run():
+        server = await FakeRpcServer().start()
+        pages = [
+            [{'slot': 10, 'prioritizationFee': 2000}, {'slot': 11, 'prioritizationFee': 4000}],
+            [{'slot': 11, 'prioritizationFee': 4000}, {'slot': 12, 'prioritizationFee': 8000}]
+        ]
+        server.on('getRecentPrioritizationFees', lambda params: pages.pop(0))
+        session = aiohttp.ClientSession()
+        estimator = PriorityFeeEstimator(server.url, session=session, accounts=['Pool1'], min_fee=0)
+        try:
+            await estimator.refresh()
+            await estimator.refresh()
+            return list(estimator.samples['rpc']), server.calls
+        finally:
+            await session.close()
+            await server.stop()
+
+    samples, calls = asyncio.run(run())
+    assert samples == [2000, 4000, 8000]
+    assert calls[0] == ('getRecentPrioritizationFees', [['Pool1']])
+
+def test_zero_fee_slots_do_not_drown_out_raydium_estimate():
+    estimator = PriorityFeeEstimator('http://unused', min_fee=0, max_fee=10**9)
+    estimator.add_samples([0] * 12, 'rpc')
+    estimator.add_samples([20000, 60000, 150000], 'raydium')
+    assert estimator.get_fee('exit') == 60000
+    assert estimator.get_fee('stop_loss') == 150000
+    assert estimator.get_stats()['window'] == {'rpc': 12, 'raydium': 3}
@@ -0,0 +1,77 @@
+import asyncio
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.quote_cache import QuoteCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def fetcher(quote, delay=0.0, calls=None):
+    async def fetch():
+        if calls is not None:
+            calls.append(quote)
+        await asyncio.sleep(delay)
+        return quote
+    return fetch
+
+def test_prefetched_quote_is_served_and_saves_latency():
+    async def run():
+        cache = QuoteCache(ttl=2.0)
+        calls = []
+        cache.prefetch('Mint1', 100, 1000, fetcher({'out': 5}, 0.05, calls))
+        cache.prefetch('Mint1', 100, 1000, fetcher({'out': 6}, 0.05, calls))
+        await asyncio.sleep(0.06)
+        quote = await cache.get('Mint1', 100, 1000)
+        return quote, calls, cache.get_stats()
+
+    quote, calls, stats = asyncio.run(run())
+    assert quote == {'out': 5}
+    assert len(calls) == 1
+    assert stats['hits'] == 1 and stats['hit_rate'] == 1.0
+    assert stats['avg_saved_ms'] >= 40
+
+def test_other_keys_and_stale_quotes_miss():
+    async def run():
+        clock = FakeClock()
+        cache = QuoteCache(ttl=2.0, clock=clock)
+        cache.prefetch('Mint1', 100, 1000, fetcher({'out': 5}))
+        await asyncio.sleep(0.01)
+        other_slippage = await cache.get('Mint1', 100, 500)
+        clock.now = 3.0
+        stale = await cache.get('Mint1', 100, 1000)
+        return other_slippage, stale, cache.get_stats()
+
+    other_slippage, stale, stats = asyncio.run(run())
+    assert other_slippage is None and stale is None
+    assert stats['misses'] == 1 and stats['expired'] == 1 and stats['hit_rate'] == 0.0
+
+def test_rejected_token_cancels_its_prefetch():
+    async def run():
+        cache = QuoteCache()
+        task = cache.prefetch('Mint1', 100, 1000, fetcher({'out': 5}, 1.0))
+        await asyncio.sleep(0)
+        cache.cancel('Mint1')
+        await asyncio.sleep(0)
+        return task, await cache.get('Mint1', 100, 1000), cache.get_stats()
+
+    task, quote, stats = asyncio.run(run())
+    assert task.cancelled() and quote is None
+    assert stats['cancelled'] == 1
+
+def test_failed_prefetch_is_a_miss():
+    async def fail():
+        raise RuntimeError("quote API down")
+
+    async def run():
+        cache = QuoteCache()
+        cache.prefetch('Mint1', 100, 1000, fail)
+        return await cache.get('Mint1', 100, 1000), cache.get_stats()
+
+    quote, stats = asyncio.run(run())
+    assert quote is None and stats['misses'] == 1
@@ -0,0 +1,143 @@
+import asyncio
+import struct
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from solders.pubkey import Pubkey
+
+from raydium.instructions import get_pool_info, decode_pool_info, WSOL_MINT
+from raydium.layouts import AMM_V4_SIZE, MARKET_V3_SIZE, AmmV4State, MarketV3State
+from utils.exceptions import PoolError
+from utils.pool_index import PoolIndex
+
+MINT = Pubkey.new_unique()
+KEYS = {name: Pubkey.new_unique() for name in (
+    'base_vault', 'quote_vault', 'lp_mint', 'open_orders', 'market_id', 'target_orders'
+)}
+MARKET_PROGRAM = Pubkey.from_string('srmqPvymJeFKQ4zGQed1GFppgkRHL9kaELCbyksJtPX')
+
+def make_pool(base_mint=MINT, quote_mint=WSOL_MINT, need_take_pnl=(0, 0)):
+    data = bytearray(AMM_V4_SIZE)
+    for offset, value in ((0, 6), (32, 6), (40, 9), (144, 25), (152, 10_000), (176, 25),
+                          (184, 10_000), (192, need_take_pnl[0]), (200, need_take_pnl[1]), (224, 1700000000)):
+        struct.pack_into('<Q', data, offset, value)
+    for offset, key in ((336, KEYS['base_vault']), (368, KEYS['quote_vault']), (400, base_mint),
+                        (432, quote_mint), (464, KEYS['lp_mint']), (496, KEYS['open_orders']),
+                        (528, KEYS['market_id']), (560, MARKET_PROGRAM), (592, KEYS['target_orders'])):
+        data[offset:offset + 32] = bytes(key)
+    return bytes(data)
+
+def make_vault(amount):
+    data = bytearray(165)
+    struct.pack_into('<Q', data, 64, amount)
+    return bytes(data)
+
+def make_market():
+    data = bytearray(MARKET_V3_SIZE)
+    data[13:45] = bytes(KEYS['market_id'])
+    # Search for a nonce that gives a valid (off-curve) vault signer
+    for nonce in range(256):
+        try:
+            Pubkey.create_program_address([bytes(KEYS['market_id']), struct.pack('<Q', nonce)], MARKET_PROGRAM)
+            break
+        except Exception:
+            continue
+    struct.pack_into('<Q', data, 45, nonce)
+    for offset in (253, 285, 317):
+        data[offset:offset + 32] = bytes(Pubkey.new_unique())
+    return bytes(data)
+
+def test_views_read_fields_in_place():
+    data = bytearray(make_pool())
+    pool = AmmV4State(data)
+    assert pool.base_mint == MINT and pool.quote_decimals == 9
+    assert pool.trade_fee_numerator == 25 and pool.trade_fee_denominator == 10_000
+
+    # No copy: the view sees later writes to the buffer
+    struct.pack_into('<Q', data, 32, 4)
+    assert pool.base_decimals == 4
+
+    with pytest.raises(PoolError):
+        AmmV4State(bytes(100))
+
+def test_decode_pool_info_reserves_price_and_market():
+    info = decode_pool_info(
+        'Pool', make_pool(need_take_pnl=(1_000_000, 0)),
+        make_vault(2_001_000_000), make_vault(10 * 10 ** 9), make_market()
+    )
+    assert info['base_reserve'] == 2_000_000_000 and info['quote_reserve'] == 10 * 10 ** 9
+    assert info['price'] == pytest.approx(10 / 2000)
+    assert info['base_vault'] == str(KEYS['base_vault'])
+    market = MarketV3State(make_market())
+    assert info['market']['vault_signer'] == str(market.vault_signer(MARKET_PROGRAM))
+
+class FakeClient:
+    def __init__(self, pools, accounts):
+        self.pools = pools
+        self.accounts = accounts
+        self.filters = []
+
+    async def get_program_accounts(self, program_id, encoding=None, filters=None):
+        self.filters.append(filters)
+        base, quote = filters[1].bytes, filters[2].bytes
+        return SimpleNamespace(value=self.pools.get((base, quote), []))
+
+    async def get_multiple_accounts(self, pubkeys):
+        return SimpleNamespace(value=[self.accounts.get(key) for key in pubkeys])
+
+def test_get_pool_info_filters_by_size_and_mints():
+    keyed = SimpleNamespace(pubkey=Pubkey.new_unique(), account=SimpleNamespace(data=make_pool()))
+    client = FakeClient(
+        {(str(MINT), str(WSOL_MINT)): [keyed]},
+        {
+            KEYS['base_vault']: SimpleNamespace(data=make_vault(5 * 10 ** 6)),
+            KEYS['quote_vault']: SimpleNamespace(data=make_vault(3 * 10 ** 9)),
+            KEYS['market_id']: SimpleNamespace(data=make_market())
+        }
+    )
+    info = asyncio.run(get_pool_info(client, str(MINT)))
+
+    assert info['pool_address'] == str(keyed.pubkey)
+    assert info['quote_reserve'] == 3 * 10 ** 9
+    size, base, quote = client.filters[0]
+    assert size == AMM_V4_SIZE and (base.offset, quote.offset) == (400, 432)
+
+    with pytest.raises(PoolError):
+        asyncio.run(get_pool_info(FakeClient({}, {}), str(MINT)))
+
+def test_get_pool_info_resolves_through_the_pool_index(tmp_path):
+    pool_address = Pubkey.new_unique()
+    accounts = {
+        pool_address: SimpleNamespace(data=make_pool()),
+        KEYS['base_vault']: SimpleNamespace(data=make_vault(5 * 10 ** 6)),
+        KEYS['quote_vault']: SimpleNamespace(data=make_vault(3 * 10 ** 9)),
+        KEYS['market_id']: SimpleNamespace(data=make_market())
+    }
+    index = PoolIndex(path=str(tmp_path / 'pools.idx'))
+
+    # First lookup scans and fills the index, the second never calls getProgramAccounts
+    keyed = SimpleNamespace(pubkey=pool_address, account=accounts[pool_address])
+    client = FakeClient({(str(MINT), str(WSOL_MINT)): [keyed]}, accounts)
+    asyncio.run(get_pool_info(client, str(MINT), pool_index=index))
+    assert index.get(str(MINT)) == [str(pool_address)]
+
+    client = FakeClient({}, accounts)
+    info = asyncio.run(get_pool_info(client, str(MINT), pool_index=index))
+    assert info['pool_address'] == str(pool_address)
+    assert client.filters == []
+
+def test_complete_pool_index_miss_never_scans(tmp_path):
+    index = PoolIndex(path=str(tmp_path / 'pools.idx'))
+    index.complete = True
+    # Indexed, but only against another quote mint
+    index.add(Pubkey.new_unique(), MINT, Pubkey.new_unique())
+
+    client = FakeClient({}, {})
+    with pytest.raises(PoolError):
+        asyncio.run(get_pool_info(client, str(MINT), pool_index=index))
+    with pytest.raises(PoolError):
+        asyncio.run(get_pool_info(client, str(Pubkey.new_unique()), pool_index=index))
+    assert client.filters == []
@@ -0,0 +1,205 @@
+import asyncio
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import aiohttp
+import base58
+from solders.keypair import Keypair
+
+from raydium.instructions import RAYDIUM_PROGRAM_ID
+import services.raydium_pools as pools_module
+from services.raydium_pools import RaydiumPoolFeed, parse_pool_creation, WSOL_MINT
+from fake_rpc import FakeRpcServer
+
+def new_key():
+    return str(Keypair().pubkey())
+
+def make_pool_transaction(signature, token_mint, slot=123, block_time=1_700_000_000):
+    """A getTransaction result containing a Raydium initialize2"""
+    accounts = [new_key() for _ in range(18)]
+    accounts[8] = token_mint
+    accounts[9] = WSOL_MINT
+    account_keys = accounts + [str(RAYDIUM_PROGRAM_ID)]
+    return {
+        'slot': slot,
+        'blockTime': block_time,
+        'transaction': {
+            'signatures': [signature],
+            'message': {
+                'accountKeys': account_keys,
+                'instructions': [{
+                    'programIdIndex': len(account_keys) - 1,
+                    'accounts': list(range(18)),
+                    'data': base58.b58encode(bytes([1, 254]) + bytes(24)).decode()
+                }]
+            }
+        },
+        'meta': {
+            'err': None,
+            'logMessages': [
+                'Program log: initialize2: InitializeInstruction2 { nonce: 254, open_time: 1700000005, '
+                'init_pc_amount: 5000000000, init_coin_amount: 1000000000000 }'
+            ]
+        }
+    }
+
+def test_parse_pool_creation_extracts_token_and_pool():
+    mint = new_key()
+    tx = make_pool_transaction('sig1', mint)
+
+    record = parse_pool_creation(tx)
+
+    assert record['address'] == mint
+    assert record['quote_mint'] == WSOL_MINT
+    assert record['pool_address'] == tx['transaction']['message']['accountKeys'][4]
+    assert record['slot'] == 123
+    assert record['created_at'] == 1_700_000_000
+    assert record['open_time'] == 1700000005
+    assert record['init_pc_amount'] == 5000000000
+
+def test_parse_pool_creation_ignores_other_transactions():
+    tx = make_pool_transaction('sig1', new_key())
+    tx['transaction']['message']['instructions'][0]['data'] = base58.b58encode(bytes([9])).decode()
+
+    assert parse_pool_creation(tx) is None
+
+def test_signature_transport_uses_until_cursor():
+    async def run():
+        mint = new_key()
+        pages = [
+            [{'signature': 'sigOld', 'err': None, 'slot': 1}],
+            [{'signature': 'sigNew', 'err': None, 'slot': 2}, {'signature': 'sigFailed', 'err': {'x': 1}, 'slot': 2}]
+        ]
+        server = await FakeRpcServer().start()
+        server.on('getSignaturesForAddress', lambda params: pages.pop(0) if pages else [])
+        server.on('getTransaction', lambda params: make_pool_transaction(params[0], mint, slot=2))
+
+        feed = RaydiumPoolFeed(server.url, transport='signatures', poll_interval=0.05)
+        received = []
+        async def on_pool(record):
+            received.append(record)
+        await feed.subscribe(on_pool)
+        await feed.start()
+        try:
+            for _ in range(100):
+                if received:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await feed.stop()
+            await server.stop()
+        return mint, received, server.calls
+
+    mint, received, calls = asyncio.run(run())
+    assert [record['address'] for record in received] == [mint]
+    assert received[0]['signature'] == 'sigNew'
+    signature_calls = [params for method, params in calls if method == 'getSignaturesForAddress']
+    assert 'until' not in signature_calls[0][1]
+    assert signature_calls[1][1]['until'] == 'sigOld'
+    # The old page is only used to place the cursor, failed signatures are skipped
+    fetched = [params[0] for method, params in calls if method == 'getTransaction']
+    assert fetched == ['sigNew']
+
+def test_websocket_transport_fetches_initialize2_signatures():
+    async def run():
+        mint = new_key()
+        server = await FakeRpcServer().start()
+        server.on('getTransaction', lambda params: make_pool_transaction(params[0], mint, slot=77))
+
+        feed = RaydiumPoolFeed(server.url, ws_url=server.ws_url)
+        received = []
+        async def on_pool(record):
+            received.append(record)
+        await feed.subscribe(on_pool)
+        await feed.start()
+        try:
+            for _ in range(100):
+                if server.ws_messages:
+                    break
+                await asyncio.sleep(0.02)
+            server.notify('logsNotification', 1, {
+                'context': {'slot': 76},
+                'value': {'signature': 'swapSig', 'err': None, 'logs': ['Program log: ray_log: swap']}
+            })
+            server.notify('logsNotification', 1, {
+                'context': {'slot': 77},
+                'value': {'signature': 'poolSig', 'err': None, 'logs': ['Program log: initialize2: InitializeInstruction2 { nonce: 1 }']}
+            })
+            for _ in range(100):
+                if received:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await feed.stop()
+            await server.stop()
+        return mint, received, server
+
+    mint, received, server = asyncio.run(run())
+    subscribe = server.ws_messages[0]
+    assert subscribe['method'] == 'logsSubscribe'
+    assert subscribe['params'][0] == {'mentions': [str(RAYDIUM_PROGRAM_ID)]}
+    assert [record['address'] for record in received] == [mint]
+    assert received[0]['slot'] == 77
+    assert [params[0] for method, params in server.calls if method == 'getTransaction'] == ['poolSig']
+
+def test_signature_poll_pages_back_to_the_cursor(monkeypatch):
+    monkeypatch.setattr(pools_module, 'SIGNATURE_PAGE_SIZE', 2)
+
+    async def run():
+        mint = new_key()
+        # Five new signatures since the cursor, newest first
+        history = [{'signature': f'sig{n}', 'err': None, 'slot': n} for n in range(5, 0, -1)]
+
+        def signatures(params):
+            options = params[1]
+            entries = history
+            if 'before' in options:
+                entries = entries[[e['signature'] for e in entries].index(options['before']) + 1:]
+            return entries[:options['limit']]
+
+        server = await FakeRpcServer().start()
+        server.on('getSignaturesForAddress', signatures)
+        server.on('getTransaction', lambda params: make_pool_transaction(params[0], mint))
+        session = aiohttp.ClientSession()
+        feed = RaydiumPoolFeed(server.url, session=session, transport='signatures')
+        feed.until = 'sig0'
+        try:
+            records = await feed.poll_once()
+        finally:
+            await session.close()
+            await server.stop()
+        return records, feed.until, server.calls
+
+    records, until, calls = asyncio.run(run())
+    assert [record['signature'] for record in records] == ['sig1', 'sig2', 'sig3', 'sig4', 'sig5']
+    assert until == 'sig5'
+    befores = [params[1].get('before') for method, params in calls if method == 'getSignaturesForAddress']
+    assert befores == [None, 'sig4', 'sig2']
+
+def test_signature_poll_retries_transactions_that_failed_to_fetch():
+    async def run():
+        mint = new_key()
+        pages = [[{'signature': 'sig1', 'err': None, 'slot': 1}]]
+        failures = [Exception('node is behind')]
+
+        server = await FakeRpcServer().start()
+        server.on('getSignaturesForAddress', lambda params: pages.pop(0) if pages else [])
+        server.on('getTransaction', lambda params: failures.pop() if failures else make_pool_transaction(params[0], mint))
+        session = aiohttp.ClientSession()
+        feed = RaydiumPoolFeed(server.url, session=session, transport='signatures')
+        feed.until = 'sig0'
+        try:
+            first = await feed.poll_once()
+            # The cursor has moved past sig1, but it is retried from the queue
+            second = await feed.poll_once()
+            third = await feed.poll_once()
+        finally:
+            await session.close()
+            await server.stop()
+        return mint, first, second, third, feed.until
+
+    mint, first, second, third, until = asyncio.run(run())
+    assert first == [] and until == 'sig1'
+    assert [record['address'] for record in second] == [mint]
+    assert third == []
@@ -0,0 +1,93 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from solders.pubkey import Pubkey
+from spl.token.constants import TOKEN_PROGRAM_ID
+
+from raydium.instructions import (
+    AMM_AUTHORITY, RAYDIUM_PROGRAM_ID, SWAP_BASE_IN, SWAP_BASE_OUT, WSOL_MINT, _SWAP_DATA,
+    SwapTemplate, create_swap_instruction, decode_pool_info
+)
+from raydium.quote import quote_swap
+from raydium.swap import RaydiumSwapBuilder
+from utils.exceptions import PoolError
+from utils.token_accounts import SYNC_NATIVE, TokenAccountCache, derive_ata
+from tests.test_raydium_layouts import MINT, make_market, make_pool, make_vault
+
+OWNER = Pubkey.new_unique()
+
+def make_pool_info():
+    return decode_pool_info(
+        str(Pubkey.new_unique()), make_pool(),
+        make_vault(2_000_000_000), make_vault(10 * 10 ** 9), make_market()
+    )
+
+def test_template_accounts_in_swap_order():
+    info = make_pool_info()
+    template = SwapTemplate(info)
+    keys = [str(meta.pubkey) for meta in template.metas]
+    assert len(keys) == 15
+    assert keys[:3] == [str(TOKEN_PROGRAM_ID), info['pool_address'], str(AMM_AUTHORITY)]
+    assert keys[5:9] == [info['base_vault'], info['quote_vault'], info['market_program_id'], info['market_id']]
+    assert keys[-1] == info['market']['vault_signer']
+    assert template.output_mint(WSOL_MINT) == str(MINT)
+
+    with pytest.raises(PoolError):
+        template.output_mint(Pubkey.new_unique())
+
+def test_create_swap_instruction_defaults_destination_to_ata():
+    info = make_pool_info()
+    source = Pubkey.new_unique()
+    ix = create_swap_instruction(info, OWNER, str(WSOL_MINT), 1000, 900, source)
+    assert ix.program_id == RAYDIUM_PROGRAM_ID
+    assert _SWAP_DATA.unpack(bytes(ix.data)) == (SWAP_BASE_IN, 1000, 900)
+    user = ix.accounts[-3:]
+    assert [meta.pubkey for meta in user] == [source, derive_ata(OWNER, MINT), OWNER]
+    assert user[2].is_signer and not user[2].is_writable
+
+def test_buy_wraps_sol_and_creates_output_account_once():
+    info = make_pool_info()
+    cache = TokenAccountCache(OWNER)
+    builder = RaydiumSwapBuilder(OWNER, cache)
+    quote = quote_swap(info, WSOL_MINT, 100_000_000, 0.01)
+
+    tx = builder.build_from_quote(info, quote, priority_fee=5000)
+    programs = [str(ix.program_id) for ix in tx.instructions]
+    swap = tx.instructions[-2]
+    assert swap.program_id == RAYDIUM_PROGRAM_ID
+    assert _SWAP_DATA.unpack(bytes(swap.data)) == (SWAP_BASE_IN, 100_000_000, quote['min_amount_out'])
+    assert any(bytes(ix.data) == SYNC_NATIVE for ix in tx.instructions)
+    # Compute budget, wrap (create, transfer, sync), output ATA create, swap, unwrap
+    assert len(programs) == 8
+    assert tx.instructions[-1].accounts[0].pubkey == cache.get(WSOL_MINT)
+
+    cache.mark_created(MINT)
+    assert len(builder.build_from_quote(info, quote, priority_fee=5000).instructions) == 7
+    assert len(builder.templates) == 1
+
+def test_exact_out_sell_unwraps_proceeds():
+    info = make_pool_info()
+    builder = RaydiumSwapBuilder(OWNER)
+    tx = builder.build(info, MINT, 5000, 4000, priority_fee=0, exact_out=True)
+    swap = tx.instructions[-2]
+    assert _SWAP_DATA.unpack(bytes(swap.data)) == (SWAP_BASE_OUT, 5000, 4000)
+    assert swap.accounts[-3].pubkey == derive_ata(OWNER, MINT)
+    assert not any(bytes(ix.data) == SYNC_NATIVE for ix in tx.instructions)
+
+def test_sol_leg_uses_the_ata_even_when_a_non_ata_wsol_account_exists():
+    info = make_pool_info()
+    cache = TokenAccountCache(OWNER)
+    cache.accounts[str(WSOL_MINT)] = Pubkey.new_unique()
+    cache.existing.add(str(WSOL_MINT))
+    builder = RaydiumSwapBuilder(OWNER, cache)
+
+    tx = builder.build(info, WSOL_MINT, 1000, 900, priority_fee=0)
+    create, transfer_ix, sync, _, swap, close = tx.instructions[2:]
+    ata = derive_ata(OWNER, WSOL_MINT)
+    assert create.accounts[1].pubkey == ata
+    assert transfer_ix.accounts[1].pubkey == ata
+    assert sync.accounts[0].pubkey == ata
+    assert swap.accounts[-3].pubkey == ata
+    assert close.accounts[0].pubkey == ata
@@ -0,0 +1,138 @@
+import asyncio
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from utils.rpc_pool import RpcClientPool, RpcEndpoint, PooledClient
+from utils.exceptions import NetworkError
+from fake_rpc import FakeRpcServer
+
+async def start_servers(*slots):
+    servers = []
+    for slot in slots:
+        server = await FakeRpcServer().start()
+        server.on('getSlot', slot)
+        servers.append(server)
+    return servers
+
+async def dead_endpoint():
+    server = await FakeRpcServer().start()
+    await server.stop()
+    return server.url
+
+async def stop_all(pool, servers):
+    await pool.close()
+    for server in servers:
+        await server.stop()
+
+def test_slow_read_is_hedged_to_another_endpoint():
+    async def slow_slot(params):
+        await asyncio.sleep(1)
+        return 100
+
+    async def run():
+        slow, fast = await start_servers(100, 100)
+        pool = RpcClientPool([slow.url, fast.url], hedge_delay=0.05)
+        try:
+            pool.select = lambda exclude=(): next(e for e in pool.endpoints if e not in exclude)
+            slow.on('getSlot', slow_slot)
+            started = asyncio.get_running_loop().time()
+            response = await PooledClient(pool).get_slot()
+            return response.value, asyncio.get_running_loop().time() - started, pool.stats
+        finally:
+            await stop_all(pool, [slow, fast])
+
+    slot, elapsed, stats = asyncio.run(run())
+    assert slot == 100 and elapsed < 0.5
+    assert stats['hedged'] == 1 and stats['hedge_wins'] == 1
+
+def test_failing_endpoint_trips_its_circuit():
+    async def run():
+        (healthy,) = await start_servers(50)
+        broken = await dead_endpoint()
+        pool = RpcClientPool([broken, healthy.url], failure_threshold=2, cooldown=60)
+        try:
+            pool.select = lambda exclude=(), select=pool.select: (
+                pool.endpoints[0] if pool.endpoints[0] not in exclude and pool.endpoints[0].available(pool.clock())
+                else select(exclude)
+            )
+            for _ in range(4):
+                assert (await pool.read('get_slot')).value == 50
+            return pool.get_stats()
+        finally:
+            await stop_all(pool, [healthy])
+
+    stats = asyncio.run(run())
+    broken = list(stats['endpoints'].values())[0]
+    assert broken['requests'] == 2 and broken['circuit_opens'] == 1
+    assert stats['failovers'] == 2
+    assert not broken['available']
+
+def test_lagging_endpoint_is_skipped():
+    async def run():
+        behind, current = await start_servers(900, 1000)
+        pool = RpcClientPool([behind.url, current.url], max_slot_lag=20)
+        try:
+            await pool.check_slots()
+            picks = {pool.select().url for _ in range(50)}
+            return picks, current.url, pool.endpoints[0].lagging
+        finally:
+            await stop_all(pool, [behind, current])
+
+    picks, current_url, lagging = asyncio.run(run())
+    assert lagging and picks == {current_url}
+
+def test_no_available_endpoint_raises():
+    async def run():
+        pool = RpcClientPool([await dead_endpoint()], failure_threshold=1, cooldown=60)
+        try:
+            with pytest.raises(Exception):
+                await pool.read('get_slot')
+            with pytest.raises(NetworkError):
+                await pool.read('get_slot')
+        finally:
+            await stop_all(pool, [])
+
+    asyncio.run(run())
+
+def test_open_circuit_admits_a_single_trial_request():
+    endpoint = RpcEndpoint('http://unused', None, failure_threshold=1, cooldown=10)
+    endpoint.record_failure(0)
+    assert not endpoint.available(5)
+    assert endpoint.available(10)
+
+    endpoint.claim(10)
+    assert not endpoint.available(11)
+    # A trial that never reports back expires after another cooldown
+    assert endpoint.available(20)
+
+    endpoint.claim(20)
+    endpoint.record_success(0.01)
+    assert endpoint.available(21) and endpoint.probe_at is None
+
+def test_program_account_scans_are_not_hedged():
+    class SlowClient:
+        calls = 0
+
+        def __init__(self, url, commitment=None):
+            self.url = url
+
+        async def get_program_accounts(self, *args, **kwargs):
+            SlowClient.calls += 1
+            await asyncio.sleep(0.2)
+            return self.url
+
+        async def close(self):
+            pass
+
+    async def run():
+        pool = RpcClientPool(['http://a', 'http://b'], hedge_delay=0.02, client_factory=SlowClient)
+        result = await pool.read('get_program_accounts', 'Program')
+        await pool.close()
+        return result, pool.stats
+
+    result, stats = asyncio.run(run())
+    assert result in ('http://a', 'http://b')
+    assert SlowClient.calls == 1 and stats['hedged'] == 0
@@ -0,0 +1,129 @@
+import asyncio
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from aiohttp import web
+
+import agents.scout_agent as scout_module
+from agents.scout_agent import AsyncScoutAgent
+
+JUPITER_TOKENS = [
+    {'address': 'MintA111111111111111111111111111111111111111', 'symbol': 'AAA', 'name': 'Token A'},
+    {'address': 'MintB111111111111111111111111111111111111111', 'symbol': 'BBB', 'name': 'Token B'}
+]
+
+DEX_PAIRS = {
+    'pairs': [
+        {
+            'baseToken': {'address': 'MintC111111111111111111111111111111111111111', 'symbol': 'CCC'},
+            'priceUsd': '0.5',
+            'liquidity': {'usd': 2500},
+            'volume': {'h24': 100}
+        }
+    ]
+}
+
+async def start_fake_sources(jupiter_tokens=JUPITER_TOKENS):
+    """Serve fake Jupiter and DexScreener endpoints on a local port"""
+    async def jupiter(request):
+        return web.json_response(jupiter_tokens)
+
+    async def dexscreener(request):
+        return web.json_response(DEX_PAIRS)
+
+    app = web.Application()
+    app.router.add_get('/jupiter', jupiter)
+    app.router.add_get('/dexscreener', dexscreener)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+def point_scout_at(monkeypatch, base_url):
+    monkeypatch.setattr(scout_module, 'JUPITER_TOKENS_URL', f"{base_url}/jupiter")
+    monkeypatch.setattr(scout_module, 'DEXSCREENER_TOKENS_URL', f"{base_url}/dexscreener")
+
+async def wait_for(predicate, attempts=50):
+    for _ in range(attempts):
+        if predicate():
+            return
+        await asyncio.sleep(0.02)
+
+def test_async_scout_delivers_tokens_to_subscribers(monkeypatch):
+    async def run():
+        runner, base_url = await start_fake_sources()
+        point_scout_at(monkeypatch, base_url)
+
+        received = []
+        async def on_token(token_info):
+            received.append(token_info)
+
+        scout = AsyncScoutAgent(poll_interval=0.05, seed_on_start=False, index_path=None, host_budgets={})
+        try:
+            assert await scout.initialize()
+            await scout.subscribe(on_token)
+            await scout.start()
+            await wait_for(lambda: len(received) >= 3)
+        finally:
+            await scout.cleanup()
+            await runner.cleanup()
+        return received
+
+    received = asyncio.run(run())
+    assert sorted(token['symbol'] for token in received) == ['AAA', 'BBB', 'CCC']
+
+def test_seeding_only_forwards_tokens_listed_after_startup(monkeypatch):
+    async def run():
+        jupiter_tokens = list(JUPITER_TOKENS)
+        runner, base_url = await start_fake_sources(jupiter_tokens)
+        point_scout_at(monkeypatch, base_url)
+
+        received = []
+        async def on_token(token_info):
+            received.append(token_info)
+
+        scout = AsyncScoutAgent(poll_interval=0.05, index_path=None, host_budgets={})
+        try:
+            assert await scout.initialize()
+            seed_stats = scout.seed_stats
+            await scout.subscribe(on_token)
+            await scout.start()
+            jupiter_tokens.append(
+                {'address': 'MintD111111111111111111111111111111111111111', 'symbol': 'DDD', 'name': 'Token D'}
+            )
+            await wait_for(lambda: received)
+            await asyncio.sleep(0.1)
+        finally:
+            await scout.cleanup()
+            await runner.cleanup()
+        return seed_stats, received
+
+    seed_stats, received = asyncio.run(run())
+    assert seed_stats['tokens_seeded'] == 3
+    assert seed_stats['log_lines_skipped'] == 3 * scout_module.TOKEN_LOG_LINES
+    assert [token['symbol'] for token in received] == ['DDD']
+
+def test_known_tokens_are_snapshotted_while_running(monkeypatch, tmp_path):
+    monkeypatch.setattr(scout_module, 'SNAPSHOT_EVERY', 2)
+
+    async def run():
+        runner, base_url = await start_fake_sources()
+        point_scout_at(monkeypatch, base_url)
+
+        path = tmp_path / 'known_tokens.idx'
+        scout = AsyncScoutAgent(poll_interval=0.05, seed_on_start=False, index_path=str(path), host_budgets={})
+        try:
+            assert await scout.initialize()
+            await scout.start()
+            await wait_for(lambda: path.exists())
+            # A crash here skips cleanup(); the next start must still know the tokens
+            restored = scout_module.KnownTokenIndex(path=str(path))
+            return len(restored)
+        finally:
+            await scout.cleanup()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) >= 2
@@ -0,0 +1,68 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from utils.task_graph import TaskGraph
+
+def step(delay, value=None, log=None, name=None):
+    async def run(**deps):
+        if log is not None:
+            log.append((name, 'start', sorted(deps)))
+        await asyncio.sleep(delay)
+        return value if value is not None else deps
+    return run
+
+def test_independent_steps_overlap_and_results_flow_to_dependents():
+    graph = TaskGraph()
+    graph.add('quote', step(0.05, 'q'))
+    graph.add('fee', step(0.02, 1000))
+    graph.add('blockhash', step(0.03, 'bh'))
+    graph.add('swap', step(0.02), 'quote', 'fee')
+    graph.add('sign', step(0, 'signed'), 'swap', 'blockhash')
+
+    started = time.perf_counter()
+    results = asyncio.run(graph.run())
+    elapsed = time.perf_counter() - started
+
+    assert results['swap'] == {'quote': 'q', 'fee': 1000}
+    assert results['sign'] == 'signed'
+    # quote → swap → sign, not the sum of every step
+    assert elapsed < 0.11
+    assert [name for name, _ in graph.critical_path()] == ['quote', 'swap', 'sign']
+    assert set(graph.durations()) == {'quote', 'fee', 'blockhash', 'swap', 'sign'}
+
+def test_critical_path_follows_the_slowest_dependency():
+    graph = TaskGraph()
+    graph.add('quote', step(0.01))
+    graph.add('balance', step(0.06))
+    graph.add('send', step(0), 'quote', 'balance')
+    asyncio.run(graph.run())
+
+    assert [name for name, _ in graph.critical_path('send')] == ['balance', 'send']
+    assert graph.finished_at('send') >= 60
+
+def test_failed_step_cancels_the_rest():
+    log = []
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("no quote")
+
+    graph = TaskGraph()
+    graph.add('quote', fail)
+    graph.add('balance', step(1, log=log, name='balance'))
+    graph.add('send', step(0, log=log, name='send'), 'quote', 'balance')
+
+    started = time.perf_counter()
+    with pytest.raises(ValueError):
+        asyncio.run(graph.run())
+    assert time.perf_counter() - started < 0.5
+    assert ('send', 'start', ['balance', 'quote']) not in log
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError):
+        TaskGraph().add('swap', step(0), 'quote')
@@ -0,0 +1,59 @@
+import asyncio
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import aiohttp
+from solders.pubkey import Pubkey
+from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID
+from spl.token.instructions import get_associated_token_address
+
+from utils.token_accounts import TokenAccountCache, create_ata_idempotent_instruction, derive_ata
+from fake_rpc import FakeRpcServer
+
+OWNER = Pubkey.from_string('9WzDXwBbmkg8ZTbNMqUxvQRAyrZzDsGYdLVL9zYtAWWM')
+USDC = 'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v'
+BONK = 'DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263'
+
+def test_derivation_matches_spl():
+    assert derive_ata(OWNER, USDC) == get_associated_token_address(OWNER, Pubkey.from_string(USDC))
+
+def test_create_instruction_is_idempotent_variant():
+    ix = create_ata_idempotent_instruction(OWNER, OWNER, USDC)
+    assert ix.program_id == ASSOCIATED_TOKEN_PROGRAM_ID
+    assert bytes(ix.data) == bytes([1])
+    assert ix.accounts[0].is_signer and ix.accounts[0].is_writable
+    assert ix.accounts[1].pubkey == derive_ata(OWNER, USDC)
+    assert ix.accounts[5].pubkey == TOKEN_PROGRAM_ID
+
+def test_cache_skips_create_once_account_exists():
+    cache = TokenAccountCache(OWNER)
+    assert len(cache.create_instructions(USDC)) == 1
+    cache.mark_created(USDC)
+    assert cache.create_instructions(USDC) == []
+    assert cache.get(USDC) == derive_ata(OWNER, USDC)
+
+def test_load_scans_owner_accounts_once():
+    held = Pubkey.new_unique()
+
+    def accounts(params):
+        return {'context': {'slot': 1}, 'value': [
+            {'pubkey': str(held), 'account': {'data': {'parsed': {'info': {'mint': BONK}}}}}
+        ]}
+
+    async def run():
+        server = await FakeRpcServer().start()
+        server.on('getTokenAccountsByOwner', accounts)
+        cache = TokenAccountCache(OWNER)
+        try:
+            async with aiohttp.ClientSession() as session:
+                await cache.load(session, server.url)
+        finally:
+            await server.stop()
+        return cache, server
+
+    cache, server = asyncio.run(run())
+    assert [method for method, _ in server.calls] == ['getTokenAccountsByOwner']
+    assert server.calls[0][1][1] == {'programId': str(TOKEN_PROGRAM_ID)}
+    assert cache.exists(BONK) and cache.get(BONK) == held
+    assert not cache.exists(USDC)
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from utils.token_cache import TokenInfo, TokenRingBuffer
+
+def make_token(i):
+    return TokenInfo(address=f"Mint{i}", symbol=f"T{i}", price=i, created_at=1000 + i)
+
+def test_token_info_behaves_like_the_old_dict():
+    token = make_token(1)
+
+    assert token['symbol'] == 'T1'
+    assert token.get('liquidity') == 0
+    assert token.get('missing', 'default') == 'default'
+    assert 'price' in token
+    with pytest.raises(KeyError):
+        token['missing']
+    assert token.to_dict()['address'] == 'Mint1'
+
+def test_ring_buffer_keeps_the_newest_entries_in_order():
+    cache = TokenRingBuffer(capacity=3)
+    for i in range(5):
+        cache.append(make_token(i))
+
+    assert len(cache) == 3
+    assert [token.symbol for token in cache] == ['T2', 'T3', 'T4']
+    assert cache[-1].symbol == 'T4'
+    assert [token.symbol for token in cache[-2:]] == ['T3', 'T4']
+    assert [token.symbol for token in cache.latest(2)] == ['T3', 'T4']
+
+def test_view_is_stable_until_entries_are_overwritten():
+    cache = TokenRingBuffer(capacity=4)
+    for i in range(3):
+        cache.append(make_token(i))
+    view = cache.view()
+
+    cache.append(make_token(3))
+    assert [token.symbol for token in view] == ['T0', 'T1', 'T2']
+
+    cache.append(make_token(4))
+    assert [token.symbol for token in view] == ['T1', 'T2']
+    assert len(view) == 2
+
+def test_clear_empties_outstanding_views():
+    cache = TokenRingBuffer(capacity=4)
+    cache.append(make_token(0))
+    view = cache.view()
+
+    cache.clear()
+    assert len(cache) == 0
+    assert list(view) == []
+
+    cache.append(make_token(1))
+    assert [token.symbol for token in cache] == ['T1']
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from solders.keypair import Keypair
+
+from utils.token_index import KnownTokenIndex, mint_key, KEY_SIZE
+
+def make_mints(count):
+    return [str(Keypair().pubkey()) for _ in range(count)]
+
+def test_add_and_lookup_across_growth():
+    index = KnownTokenIndex(capacity=8)
+    mints = make_mints(500)
+
+    assert all(index.add(mint) for mint in mints)
+    assert not index.add(mints[0])
+    assert len(index) == 500
+    assert all(mint in index for mint in mints)
+    assert str(Keypair().pubkey()) not in index
+    assert index.memory_stats()['load_factor'] <= 0.7
+
+def test_non_pubkey_addresses_are_still_indexed():
+    index = KnownTokenIndex()
+    index.add('not-a-mint')
+
+    assert len(mint_key('not-a-mint')) == KEY_SIZE
+    assert 'not-a-mint' in index
+    assert 'also-not-a-mint' not in index
+
+def test_bloom_filter_is_optional():
+    index = KnownTokenIndex(use_bloom=False)
+    mint = make_mints(1)[0]
+    index.add(mint)
+
+    assert mint in index
+    assert index.memory_stats()['bloom_bytes'] == 0
+
+def test_snapshot_is_memory_mapped_on_reload(tmp_path):
+    path = str(tmp_path / 'known_tokens.idx')
+    mints = make_mints(200)
+    index = KnownTokenIndex(capacity=64, path=path)
+    index.update(mints)
+    assert index.save()
+
+    restored = KnownTokenIndex(path=path)
+    assert restored.memory_stats()['memory_mapped']
+    assert len(restored) == 200
+    assert all(mint in restored for mint in mints)
+
+    # Writes after a reload must not touch the file until the next save
+    extra = make_mints(1)[0]
+    restored.add(extra)
+    assert extra not in KnownTokenIndex(path=path)
+    restored.save()
+    assert extra in KnownTokenIndex(path=path)
+
+def test_corrupt_snapshot_starts_empty(tmp_path):
+    path = tmp_path / 'known_tokens.idx'
+    path.write_bytes(b'garbage')
+
+    index = KnownTokenIndex(path=str(path))
+    assert len(index) == 0
@@ -0,0 +1,79 @@
+import sys
+import asyncio
+import threading
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from agents.scout_agent import ScoutAgent, SOURCE_DEXSCREENER
+from utils.token_stream import Subscription
+
+def make_pair(address):
+    return {'address': address, 'symbol': address.upper(), 'name': address, 'liquidity': 1000}
+
+def test_micro_batches_fill_up_to_max_batch():
+    async def run():
+        subscription = Subscription(asyncio.get_running_loop(), max_batch=3, max_wait_ms=200)
+        subscription.push([1, 2])
+        asyncio.get_running_loop().call_later(0.02, subscription.push, [3, 4])
+        first = await subscription.next_batch()
+        second = await subscription.next_batch()
+        return first, second
+
+    assert asyncio.run(run()) == ([1, 2, 3], [4])
+
+def test_slow_consumer_policies():
+    async def fill(policy):
+        subscription = Subscription(asyncio.get_running_loop(), max_wait_ms=0, max_buffer=2, policy=policy)
+        subscription.push([1, 2, 3])
+        await asyncio.sleep(0)
+        return subscription, await subscription.next_batch()
+
+    subscription, batch = asyncio.run(fill('drop_oldest'))
+    assert batch == [2, 3] and subscription.stats['dropped'] == 1
+
+    subscription, batch = asyncio.run(fill('drop_newest'))
+    assert batch == [1, 2] and subscription.stats['dropped'] == 1
+
+    subscription, batch = asyncio.run(fill('disconnect'))
+    assert batch == [1, 2] and subscription.closed
+
+    with pytest.raises(ValueError):
+        Subscription(None, policy='block')
+
+def test_threaded_scout_streams_to_every_subscriber():
+    scout = ScoutAgent(seed_on_start=False, index_path=None)
+    scout.is_running = True
+    scout.dispatch_thread = threading.Thread(target=scout._dispatch_tokens, daemon=True)
+    scout.dispatch_thread.start()
+
+    async def consume(received):
+        async for batch in scout.stream(max_batch=5, max_wait_ms=100):
+            received.extend(token['address'] for token in batch)
+            if len(received) >= 5:
+                break
+
+    async def run():
+        first, second = [], []
+        consumers = [
+            asyncio.create_task(consume(first)),
+            asyncio.create_task(consume(second))
+        ]
+        while len(scout.fanout.get_stats()) < 2:
+            await asyncio.sleep(0.01)
+
+        def produce():
+            for i in range(5):
+                scout._process_new_token(make_pair(f'mint{i}'), SOURCE_DEXSCREENER)
+        threading.Thread(target=produce).start()
+        await asyncio.wait_for(asyncio.gather(*consumers), timeout=5)
+        return first, second
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        scout.cleanup()
+
+    assert sorted(first) == sorted(second) == [f'mint{i}' for i in range(5)]
+    assert not scout.fanout.has_subscribers.is_set()
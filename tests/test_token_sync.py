@@ -0,0 +1,80 @@
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from utils.token_sync import JupiterTokenSync, TokenListParser, iter_tokens, extract_tokens
+
+def make_body(*addresses):
+    return json.dumps([{'address': address, 'symbol': address[:3]} for address in addresses]).encode()
+
+def test_first_sync_returns_every_token_and_stores_validators():
+    sync = JupiterTokenSync()
+    added = sync.apply(200, {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}, make_body('AAA1', 'BBB1'))
+
+    assert [token['address'] for token in added] == ['AAA1', 'BBB1']
+    assert sync.token_count == 2
+    headers = sync.request_headers()
+    assert headers['If-None-Match'] == '"v1"'
+    assert headers['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+    assert 'gzip' in headers['Accept-Encoding']
+
+def test_not_modified_and_identical_body_skip_the_pass():
+    sync = JupiterTokenSync()
+    body = make_body('AAA1', 'BBB1')
+    sync.apply(200, {}, body)
+
+    assert sync.apply(304, {}, b'') is None
+    assert sync.apply(200, {}, body) is None
+    assert sync.stats['not_modified'] == 1
+    assert sync.stats['unchanged'] == 1
+
+def test_changed_body_returns_only_added_mints():
+    sync = JupiterTokenSync()
+    sync.apply(200, {}, make_body('AAA1', 'BBB1'))
+
+    added = sync.apply(200, {}, make_body('BBB1', 'CCC1', 'DDD1'))
+
+    assert [token['address'] for token in added] == ['CCC1', 'DDD1']
+    assert sync.stats['removed'] == 1
+    assert sync.token_count == 3
+
+def test_error_status_keeps_previous_state():
+    sync = JupiterTokenSync()
+    sync.apply(200, {'ETag': '"v1"'}, make_body('AAA1'))
+
+    assert sync.apply(500, {}, b'') is None
+    assert sync.token_count == 1
+    assert sync.etag == '"v1"'
+
+def test_streaming_parser_handles_split_chunks_and_keeps_only_needed_fields():
+    body = json.dumps([
+        {'address': 'ÅAA1', 'symbol': 'AAA', 'name': 'A', 'tags': ['x', {'nested': ']'}], 'logoURI': 'u'},
+        {'address': 'BBB1', 'symbol': 'BBB', 'name': 'B', 'decimals': 9}
+    ], ensure_ascii=False).encode()
+
+    parser = TokenListParser()
+    rows = []
+    for i in range(len(body)):
+        rows.extend(parser.feed(body[i:i + 1]))
+    parser.close()
+
+    assert rows == [('ÅAA1', 'AAA', 'A'), ('BBB1', 'BBB', 'B')]
+    assert list(iter_tokens(body, chunk_size=7)) == rows
+
+def test_truncated_list_is_rejected():
+    body = make_body('AAA1', 'BBB1')
+    with pytest.raises(ValueError):
+        extract_tokens(body[:-5])
+
+def test_apply_async_parses_in_an_executor():
+    sync = JupiterTokenSync()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        added = asyncio.run(sync.apply_async(200, {}, make_body('AAA1', 'BBB1'), executor))
+
+    assert added == [{'address': 'AAA1', 'symbol': 'AAA', 'name': None}, {'address': 'BBB1', 'symbol': 'BBB', 'name': None}]
+    assert sync.token_count == 2
@@ -0,0 +1,156 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.append(str(Path(__file__).parent.parent))
+
+import base58
+from solana.transaction import Transaction
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.system_program import transfer, TransferParams
+
+# The agent reads its config on import; no real wallet is used here
+os.environ.setdefault('WALLET_PRIVATE_KEY', base58.b58encode(bytes(Keypair())).decode())
+
+import agents.trading_agent as trading_agent
+from agents.trading_agent import TradingAgent
+from raydium.instructions import RAYDIUM_PROGRAM_ID, WSOL_MINT
+from raydium.swap import RaydiumSwapBuilder
+from tests.test_raydium_layouts import KEYS, MINT, FakeClient, make_market, make_pool, make_vault
+from utils.pool_index import PoolIndex
+from utils.token_accounts import TokenAccountCache
+
+class SlowClient(FakeClient):
+    """RPC stub answering getMultipleAccounts after a network-like delay"""
+
+    def __init__(self, accounts, delay):
+        super().__init__({}, accounts)
+        self.delay = delay
+
+    async def get_multiple_accounts(self, pubkeys):
+        await asyncio.sleep(self.delay)
+        return await super().get_multiple_accounts(pubkeys)
+
+def make_agent(wallet, jupiter_tx, jupiter_quotes, sent, client=None, pool_index=None,
+               quote_delay=0.0, confirm_delay=0.0):
+    """Trading agent with the wallet, Jupiter, sending and confirmation stubbed out"""
+    agent = TradingAgent(
+        wallet_manager=SimpleNamespace(keypair=wallet, phantom_public_key=wallet.pubkey(), client=client),
+        pool_index=pool_index
+    )
+    agent.token_accounts = TokenAccountCache(wallet.pubkey())
+    agent.swap_builder = RaydiumSwapBuilder(wallet.pubkey(), agent.token_accounts)
+    agent.balance_ledger = SimpleNamespace(
+        reserve=lambda amount_sol: 1,
+        settle=lambda reservation, slot=None: None,
+        release=lambda reservation: None
+    )
+
+    async def fetch_buy_quote(mint, lamports):
+        jupiter_quotes.append(mint)
+        await asyncio.sleep(quote_delay)
+        return {'route': 'jupiter'}
+
+    async def build_swap(quote, priority_fee):
+        return jupiter_tx
+
+    async def send_swap(transaction):
+        sent.append(transaction)
+        return 'Sig1'
+
+    async def confirm_swap(send):
+        await asyncio.sleep(confirm_delay)
+        return {'slot': 7, 'source': 'poll', 'confirm_ms': 1.0}
+
+    async def get_recent_blockhash():
+        return Hash.new_unique()
+
+    agent._fetch_buy_quote = fetch_buy_quote
+    agent._build_swap = build_swap
+    agent._send_swap = send_swap
+    agent._confirm_swap = confirm_swap
+    agent._get_recent_blockhash = get_recent_blockhash
+    return agent
+
+def make_jupiter_tx(wallet):
+    return Transaction(fee_payer=wallet.pubkey(), instructions=[
+        transfer(TransferParams(from_pubkey=wallet.pubkey(), to_pubkey=wallet.pubkey(), lamports=1))
+    ])
+
+def new_token(address=str(MINT)):
+    return {'address': address, 'symbol': 'TKN', 'price': 1.0, 'created_at': time.time()}
+
+def run_new_token(tmp_path, market=True, delay=0.01):
+    """Hand a freshly detected, indexed token to the agent with only the RPC and Jupiter stubbed"""
+    wallet = Keypair()
+    pool_address = Pubkey.new_unique()
+    accounts = {
+        pool_address: SimpleNamespace(data=make_pool()),
+        KEYS['base_vault']: SimpleNamespace(data=make_vault(2_000_000_000)),
+        KEYS['quote_vault']: SimpleNamespace(data=make_vault(10 * 10 ** 9))
+    }
+    if market:
+        accounts[KEYS['market_id']] = SimpleNamespace(data=make_market())
+    index = PoolIndex(path=str(tmp_path / 'pools.idx'))
+    index.complete = True
+    index.add(pool_address, MINT, WSOL_MINT)
+
+    jupiter_tx = make_jupiter_tx(wallet)
+    jupiter_quotes, sent = [], []
+
+    async def run():
+        agent = make_agent(wallet, jupiter_tx, jupiter_quotes, sent, SlowClient(accounts, delay), index)
+        try:
+            await agent.handle_new_token(new_token())
+            return str(MINT) in agent.active_trades
+        finally:
+            await agent.http_pool.close()
+
+    return asyncio.run(run()), jupiter_quotes, sent, jupiter_tx
+
+def test_new_token_is_bought_natively_from_the_pool_index(tmp_path):
+    ok, jupiter_quotes, sent, _ = run_new_token(tmp_path)
+    # The Jupiter quote is never even prefetched
+    assert ok and not jupiter_quotes
+    (transaction,) = sent
+    assert any(ix.program_id == RAYDIUM_PROGRAM_ID for ix in transaction.instructions)
+    assert transaction.signatures[0] != Signature.default()
+
+def test_buy_falls_back_to_jupiter_when_the_native_build_fails(tmp_path):
+    # Without its market account the pool can be quoted but not built
+    ok, jupiter_quotes, sent, jupiter_tx = run_new_token(tmp_path, market=False)
+    assert ok and jupiter_quotes == [str(MINT)]
+    assert sent == [jupiter_tx] and jupiter_tx.signatures[0] != Signature.default()
+
+def test_buy_goes_through_jupiter_when_pool_state_is_late(tmp_path, monkeypatch):
+    monkeypatch.setattr(trading_agent, 'POOL_STATE_WAIT', 0.02)
+    ok, jupiter_quotes, sent, jupiter_tx = run_new_token(tmp_path, delay=0.2)
+    assert ok and jupiter_quotes == [str(MINT)]
+    assert sent == [jupiter_tx]
+
+def test_batch_prefetches_quotes_while_earlier_candidates_are_bought():
+    wallet = Keypair()
+    tokens = [new_token(str(Pubkey.new_unique())) for _ in range(2)]
+    jupiter_quotes, sent = [], []
+
+    async def run():
+        agent = make_agent(wallet, make_jupiter_tx(wallet), jupiter_quotes, sent,
+                           quote_delay=0.05, confirm_delay=0.1)
+        try:
+            await agent.handle_new_tokens(tokens)
+            return agent
+        finally:
+            await agent.http_pool.close()
+
+    agent = asyncio.run(run())
+    assert set(agent.active_trades) == {token['address'] for token in tokens}
+    # One quote each, both started on delivery - the second was ready when its turn came
+    assert jupiter_quotes == [token['address'] for token in tokens]
+    stats = agent.get_quote_cache_stats()
+    assert stats['hits'] == 2 and stats['misses'] == 0
+    assert stats['saved_ms_total'] >= 40
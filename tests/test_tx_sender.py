@@ -0,0 +1,97 @@
+import asyncio
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import aiohttp
+import pytest
+
+from services.tx_sender import RacingSender
+from services.confirmations import ConfirmationService
+from utils.exceptions import TransactionError
+from fake_rpc import FakeRpcServer
+
+RAW_TX = b'\x01signed-transaction'
+
+async def slow_accept(params):
+    await asyncio.sleep(0.2)
+    return 'Sig1'
+
+def test_first_accepting_endpoint_wins_and_rebroadcasts_until_confirmed():
+    statuses = {'Sig1': None}
+
+    async def run():
+        fast, slow, broken = [await FakeRpcServer().start() for _ in range(3)]
+        fast.on('sendTransaction', 'Sig1')
+        slow.on('sendTransaction', slow_accept)
+        broken.on('sendTransaction', Exception('node is behind'))
+        fast.on('getSignatureStatuses', lambda params: {'context': {'slot': 1}, 'value': [statuses['Sig1']]})
+
+        session = aiohttp.ClientSession()
+        confirmations = ConfirmationService(fast.url, session=session, transport='poll', poll_interval=0.02)
+        sender = RacingSender([slow.url, fast.url, broken.url], session=session,
+                              confirmations=confirmations, rebroadcast_interval=0.05)
+        await confirmations.start()
+        try:
+            signature = await sender.send(RAW_TX)
+            await asyncio.sleep(0.3)
+            statuses['Sig1'] = {'slot': 2, 'err': None, 'confirmationStatus': 'confirmed'}
+            await sender.confirm(signature)
+            # A resend already on the wire when confirmation arrived may still land
+            await asyncio.sleep(0.03)
+            sends = len([call for call in fast.calls if call[0] == 'sendTransaction'])
+            await asyncio.sleep(0.15)
+            sends_after = len([call for call in fast.calls if call[0] == 'sendTransaction'])
+            return signature, sends, sends_after, fast.calls[0][1], sender.get_stats(), fast, slow, broken
+        finally:
+            await sender.close()
+            await confirmations.stop()
+            await session.close()
+            for server in (fast, slow, broken):
+                await server.stop()
+
+    signature, sends, sends_after, params, stats, fast, slow, broken = asyncio.run(run())
+    assert signature == 'Sig1'
+    assert params[1]['encoding'] == 'base64' and params[1]['maxRetries'] == 0
+    assert sends > 1 and sends_after == sends
+    assert stats[fast.url]['first'] == 1 and stats[fast.url]['landed'] == 1
+    assert stats[slow.url]['accepted'] >= 1 and stats[slow.url]['avg_latency_ms'] >= 200
+    assert stats[broken.url]['accepted'] == 0 and stats[broken.url]['errors'] == stats[broken.url]['sent']
+
+def test_raises_when_no_endpoint_accepts():
+    async def run():
+        servers = [await FakeRpcServer().start() for _ in range(2)]
+        for server in servers:
+            server.on('sendTransaction', Exception('blockhash not found'))
+        sender = RacingSender([server.url for server in servers])
+        try:
+            with pytest.raises(TransactionError):
+                await sender.send(RAW_TX)
+            return sender.rebroadcasts
+        finally:
+            await sender.close()
+            for server in servers:
+                await server.stop()
+
+    assert asyncio.run(run()) == {}
+
+def test_rebroadcast_stops_when_blockhash_expires():
+    async def run():
+        server = await FakeRpcServer().start()
+        server.on('sendTransaction', 'Sig2')
+        server.on('getBlockHeight', 500)
+        sender = RacingSender([server.url], rebroadcast_interval=0.02)
+        try:
+            await sender.send(RAW_TX, last_valid_block_height=400)
+            for _ in range(50):
+                if not sender.rebroadcasts:
+                    break
+                await asyncio.sleep(0.02)
+            return sender.rebroadcasts, [method for method, _ in server.calls]
+        finally:
+            await sender.close()
+            await server.stop()
+
+    rebroadcasts, methods = asyncio.run(run())
+    assert rebroadcasts == {}
+    assert methods == ['sendTransaction', 'getBlockHeight']
@@ -110,12 +110,16 @@ class TradingBotUI:
             
             if self.bot.is_running:
                 active_trades = self.bot.get_active_trades()
+                live_prices = self.bot.get_live_prices()
                 if active_trades:
                     trades_data = []
                     for address, trade in active_trades.items():
+                        tick = live_prices.get(address)
                         trades_data.append({
                             "Symbol": trade['token_data']['symbol'],
                             "Entry": f"${trade['entry_price']:.8f}",
+                            "Price": f"${tick['price']:.8f}" if tick else "-",
+                            "P/L": f"{(tick['price'] / trade['entry_price'] - 1) * 100:+.2f}%" if tick and trade['entry_price'] else "-",
                             "Size": f"{trade['position_size']} SOL"
                         })
                     trades_container.dataframe(
@@ -0,0 +1,134 @@
+import bisect
+import itertools
+import math
+import threading
+import time
+from queue import Empty
+
+DEFAULT_WEIGHTS = {
+    'age': 0.4,
+    'liquidity': 0.3,
+    'volume': 0.1,
+    'source': 0.2
+}
+
+def _log_scale(value, ceiling):
+    """Map a dollar amount onto 0..1 on a log scale, 1 at ``ceiling``"""
+    try:
+        value = float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    if value <= 0:
+        return 0.0
+    return min(math.log10(1 + value) / math.log10(1 + ceiling), 1.0)
+
+class CandidateQueue:
+    """Bounded priority queue of token candidates
+
+    The best-scoring candidate is handed out first. Candidates older than
+    ``max_age`` are evicted instead of delivered, and when the queue is full
+    the lowest-scoring entry is dropped. Thread-safe, with a blocking ``get``
+    matching ``queue.Queue``.
+    """
+
+    def __init__(self, maxsize=1000, max_age=60, weights=None, source_weights=None,
+                 score_func=None, clock=time.time):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.source_weights = source_weights or {}
+        self.score_func = score_func or self.default_score
+        self.clock = clock
+        self._entries = []  # sorted ascending by (score, -sequence); best is last
+        self._sequence = itertools.count()
+        self._not_empty = threading.Condition()
+        self.stats = {
+            'enqueued': 0,
+            'delivered': 0,
+            'dropped_full': 0,
+            'dropped_stale': 0
+        }
+
+    def default_score(self, token):
+        """Weighted score from freshness, liquidity, volume and source"""
+        age = self.clock() - (token.get('created_at') or 0)
+        freshness = max(0.0, 1.0 - age / self.max_age) if self.max_age else 1.0
+        return (
+            self.weights['age'] * freshness
+            + self.weights['liquidity'] * _log_scale(token.get('liquidity'), 1_000_000)
+            + self.weights['volume'] * _log_scale(token.get('volume'), 10_000_000)
+            + self.weights['source'] * self.source_weights.get(token.get('source'), 0.5)
+        )
+
+    def _is_stale(self, token):
+        return self.max_age and self.clock() - (token.get('created_at') or 0) > self.max_age
+
+    def _evict_stale(self):
+        fresh = [entry for entry in self._entries if not self._is_stale(entry[2])]
+        self.stats['dropped_stale'] += len(self._entries) - len(fresh)
+        self._entries = fresh
+
+    def put(self, token):
+        """Queue a candidate, returning False if it was dropped"""
+        with self._not_empty:
+            if self._is_stale(token):
+                self.stats['dropped_stale'] += 1
+                return False
+
+            entry = (self.score_func(token), -next(self._sequence), token)
+            if len(self._entries) >= self.maxsize:
+                self._evict_stale()
+            if len(self._entries) >= self.maxsize:
+                if entry[:2] <= self._entries[0][:2]:
+                    self.stats['dropped_full'] += 1
+                    return False
+                self._entries.pop(0)
+                self.stats['dropped_full'] += 1
+
+            bisect.insort(self._entries, entry, key=lambda item: item[:2])
+            self.stats['enqueued'] += 1
+            self._not_empty.notify()
+            return True
+
+    def _pop_live(self):
+        while self._entries:
+            token = self._entries.pop()[2]
+            if self._is_stale(token):
+                self.stats['dropped_stale'] += 1
+                continue
+            self.stats['delivered'] += 1
+            return token
+        return None
+
+    def get(self, timeout=None):
+        """Remove and return the best live candidate, raising queue.Empty on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._not_empty:
+            while True:
+                token = self._pop_live()
+                if token is not None:
+                    return token
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise Empty
+                self._not_empty.wait(remaining)
+
+    def get_nowait(self):
+        with self._not_empty:
+            token = self._pop_live()
+        if token is None:
+            raise Empty
+        return token
+
+    def qsize(self):
+        return len(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._not_empty:
+            self._entries.clear()
+
+    def get_stats(self):
+        return {**self.stats, 'depth': len(self._entries)}
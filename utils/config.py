@@ -19,7 +19,10 @@ class Config:
                 config = yaml.safe_load(f)
 
             # Network settings
-            self.RPC_ENDPOINT = config['network']['rpc_endpoints'][0]
+            self.RPC_ENDPOINTS = config['network']['rpc_endpoints']
+            self.RPC_ENDPOINT = self.RPC_ENDPOINTS[0]
+            self.REBROADCAST_INTERVAL = config['network'].get('rebroadcast_interval', 2)
+            self.BLOCKHASH_REFRESH_INTERVAL = config['network'].get('blockhash_refresh_interval', 1)
             self.MAX_RETRIES = config['network']['max_retries']
             self.TIMEOUT = config['network']['timeout']
             
@@ -44,6 +47,21 @@ class Config:
             self.PRICE_UPDATE = trading['monitor_settings']['price_update']
             self.MAX_AGE = trading['monitor_settings']['max_age']
             
+            # Scout settings
+            scout = config.get('scout', {})
+            self.TOKEN_CACHE_SIZE = scout.get('token_cache_size', 100)
+            pool_feed = scout.get('pool_feed', {})
+            self.POOL_FEED_ENABLED = pool_feed.get('enabled', False)
+            self.POOL_FEED_TRANSPORT = pool_feed.get('transport', 'websocket')
+            self.POOL_FEED_POLL_INTERVAL = pool_feed.get('poll_interval', 1)
+
+            # HTTP client settings
+            http = config.get('http', {})
+            self.HTTP_LIMIT_PER_HOST = http.get('limit_per_host', 8)
+            self.HTTP_KEEPALIVE_TIMEOUT = http.get('keepalive_timeout', 60)
+            self.HTTP_DNS_CACHE_TTL = http.get('dns_cache_ttl', 300)
+            self.HTTP_PREWARM_URLS = http.get('prewarm', [])
+            
             # Performance settings
             self.MEMORY_LIMIT_MB = config['performance']['memory_limit_mb']
             self.MAX_LATENCY_MS = config['performance']['max_latency_ms']
@@ -1,16 +1,19 @@
-import aiohttp
 import asyncio
 from utils.logger import setup_logger
+from utils.http_client import HttpClientPool
 
 class DexScreener:
-    def __init__(self):
+    def __init__(self, http_pool=None):
         self.logger = setup_logger("dexscreener")
+        self.http_pool = http_pool
+        self._owns_http_pool = http_pool is None
         self.session = None
         
     async def initialize(self):
         """Initialize DexScreener connection"""
         if not self.session:
-            self.session = aiohttp.ClientSession()
+            self.session = self.http_pool or HttpClientPool()
+            self._owns_http_pool = self.http_pool is None
             
     async def test_connection(self):
         """Test connection to DexScreener API"""
@@ -31,9 +34,9 @@ class DexScreener:
         
     async def close(self):
         """Close the API session"""
-        if self.session:
+        if self.session and self._owns_http_pool:
             await self.session.close()
-            self.session = None
+        self.session = None
             
     async def _make_request(self, endpoint):
         """Make API request with rate limiting and retries"""
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+import aiohttp
+
+from utils.logger import setup_logger
+
+class HttpClientPool:
+    """Process-wide HTTP client layer with one keep-alive pool per host
+
+    Quacks like an aiohttp.ClientSession for get/post/request/ws_connect:
+    each call is routed to a session dedicated to the URL's host, so every
+    host keeps its own warm connections, connection limit and metrics.
+    """
+
+    def __init__(self, limit_per_host=8, keepalive_timeout=60, ttl_dns_cache=300,
+                 timeout=10, host_limits=None):
+        self.logger = setup_logger("http_client")
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.host_limits = host_limits or {}
+        self.sessions = {}
+        self.metrics = {}
+        self.closed = False
+
+    def session_for(self, url):
+        """The session serving `url`'s host, created on first use"""
+        parsed = urlparse(url)
+        host = f"{parsed.scheme}://{parsed.netloc}"
+        session = self.sessions.get(host)
+        if session is None or session.closed:
+            session = self._create_session(host)
+            self.sessions[host] = session
+            self.closed = False
+        return session
+
+    def _create_session(self, host):
+        metrics = self.metrics.setdefault(host, {
+            'requests': 0,
+            'errors': 0,
+            'connections_opened': 0,
+            'connections_reused': 0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0,
+            'latency_total_ms': 0.0
+        })
+        connector = aiohttp.TCPConnector(
+            limit=self.host_limits.get(urlparse(host).hostname, self.limit_per_host),
+            ttl_dns_cache=self.ttl_dns_cache,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            trace_configs=[self._trace_config(metrics)]
+        )
+
+    def _trace_config(self, metrics):
+        trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=SimpleNamespace)
+
+        async def on_request_start(session, ctx, params):
+            ctx.started = time.perf_counter()
+
+        async def on_request_end(session, ctx, params):
+            metrics['requests'] += 1
+            metrics['latency_total_ms'] += (time.perf_counter() - ctx.started) * 1000
+
+        async def on_request_exception(session, ctx, params):
+            metrics['errors'] += 1
+
+        def count(key):
+            async def handler(session, ctx, params):
+                metrics[key] += 1
+            return handler
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(count('connections_opened'))
+        trace_config.on_connection_reuseconn.append(count('connections_reused'))
+        trace_config.on_dns_cache_hit.append(count('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(count('dns_cache_misses'))
+        return trace_config
+
+    def request(self, method, url, **kwargs):
+        return self.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.session_for(url).get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session_for(url).post(url, **kwargs)
+
+    def ws_connect(self, url, **kwargs):
+        # Websockets share the pool of the matching HTTP host
+        parsed = urlparse(url)
+        scheme = {'wss': 'https', 'ws': 'http'}.get(parsed.scheme, parsed.scheme)
+        return self.session_for(f"{scheme}://{parsed.netloc}").ws_connect(url, **kwargs)
+
+    async def prewarm(self, urls):
+        """Open a connection to every host up front so trades skip the TCP+TLS handshake"""
+        async def warm(url):
+            try:
+                async with self.session_for(url).head(url, allow_redirects=False) as response:
+                    await response.read()
+                return True
+            except Exception as e:
+                self.logger.warning(f"⚠️ Could not pre-warm {url}: {str(e)}")
+                return False
+
+        results = await asyncio.gather(*(warm(url) for url in urls))
+        self.logger.info(f"🔥 Pre-warmed {sum(results)}/{len(results)} hosts")
+        return sum(results)
+
+    def get_stats(self):
+        """Request, error, latency and connection counters per host"""
+        stats = {}
+        for host, metrics in self.metrics.items():
+            requests = metrics['requests']
+            stats[host] = {
+                **{key: value for key, value in metrics.items() if key != 'latency_total_ms'},
+                'avg_latency_ms': metrics['latency_total_ms'] / requests if requests else 0.0
+            }
+        return stats
+
+    async def close(self):
+        """Close every per-host session"""
+        sessions = list(self.sessions.values())
+        self.sessions.clear()
+        await asyncio.gather(*(session.close() for session in sessions if not session.closed))
+        self.closed = True
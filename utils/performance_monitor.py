@@ -1,6 +1,10 @@
-import psutil
 import time
 from collections import deque
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 from utils.config import config
 from utils.logger import setup_logger
 
@@ -8,8 +12,14 @@ class PerformanceMonitor:
     def __init__(self):
         self.logger = setup_logger("performance_monitor")
         self.execution_times = deque(maxlen=1000)
-        self.process = psutil.Process()
+        # RSS/CPU sampling is skipped without psutil
+        self.process = psutil.Process() if psutil else None
         self.start_time = time.time()
+        self.stats_sources = {}
+
+    def register_stats_source(self, name, stats_func):
+        """Include a component's stats in the performance metrics"""
+        self.stats_sources[name] = stats_func
 
     def record_execution(self, execution_time: float):
         """Record execution time in milliseconds"""
@@ -22,10 +32,12 @@ class PerformanceMonitor:
 
     def check_system_resources(self):
         """Monitor system resources"""
-        memory_usage = self.process.memory_info().rss / 1024 / 1024  # MB
-        cpu_percent = self.process.cpu_percent()
+        memory_usage = cpu_percent = None
+        if self.process:
+            memory_usage = self.process.memory_info().rss / 1024 / 1024  # MB
+            cpu_percent = self.process.cpu_percent()
         
-        if memory_usage > config.MEMORY_LIMIT_MB:
+        if memory_usage is not None and memory_usage > config.MEMORY_LIMIT_MB:
             self.logger.warning(
                 f"High memory usage: {memory_usage:.2f}MB"
             )
@@ -44,5 +56,6 @@ class PerformanceMonitor:
         return {
             **metrics,
             'execution_times_95th': sorted(self.execution_times)[int(len(self.execution_times)*0.95)] if self.execution_times else 0,
-            'total_executions': len(self.execution_times)
+            'total_executions': len(self.execution_times),
+            'components': {name: stats_func() for name, stats_func in self.stats_sources.items()}
         } 
\ No newline at end of file
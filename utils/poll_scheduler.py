@@ -0,0 +1,166 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+RATE_LIMITED_STATUSES = (429, 503)
+
+def parse_retry_after(value, now=None):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds"""
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at - (now if now is not None else time.time()), 0.0)
+
+class HostBudget:
+    """Token bucket enforcing a requests-per-minute budget for one host"""
+
+    def __init__(self, requests_per_minute, clock=time.monotonic):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, requests_per_minute / 12.0)  # up to 5s worth of burst
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+class SourceSchedule:
+    """Polling state of one source"""
+
+    def __init__(self, name, host, interval, min_interval, max_interval):
+        self.name = name
+        self.host = host
+        self.base_interval = interval
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.next_run = 0.0
+        self.failures = 0
+        self.change_rate = 0.5
+        self.polls = 0
+        self.rate_limited = 0
+        self.errors = 0
+
+class PollScheduler:
+    """Per-source polling scheduler
+
+    Each source keeps its own interval, which shrinks while the source keeps
+    changing and grows while it stays the same. Errors and rate limits back
+    off exponentially with jitter (honouring Retry-After), and every host has
+    a requests-per-minute budget shared by the sources that hit it.
+    """
+
+    def __init__(self, jitter=0.1, max_backoff=60.0, clock=time.monotonic, rng=random.random):
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.rng = rng
+        self.sources = {}
+        self.budgets = {}
+        self._lock = threading.Lock()
+
+    def add_source(self, name, host, interval, min_interval=None, max_interval=None):
+        self.sources[name] = SourceSchedule(
+            name,
+            host,
+            interval,
+            min_interval if min_interval is not None else interval / 2,
+            max_interval if max_interval is not None else interval * 15
+        )
+
+    def set_budget(self, host, requests_per_minute):
+        self.budgets[host] = HostBudget(requests_per_minute, clock=self.clock)
+
+    def _jittered(self, delay):
+        return delay * (1 + self.jitter * (2 * self.rng() - 1))
+
+    def wait_time(self, name):
+        """Seconds until a source is due and its host budget allows a request"""
+        with self._lock:
+            source = self.sources[name]
+            wait = max(source.next_run - self.clock(), 0.0)
+            budget = self.budgets.get(source.host)
+            if budget:
+                wait = max(wait, budget.wait_time())
+            return wait
+
+    def next_due(self):
+        """Return (name, wait) for the source that can run soonest"""
+        return min(((name, self.wait_time(name)) for name in self.sources), key=lambda item: item[1])
+
+    def begin(self, name):
+        """Charge a request against the source's host budget"""
+        with self._lock:
+            budget = self.budgets.get(self.sources[name].host)
+            if budget:
+                budget.consume()
+            self.sources[name].polls += 1
+
+    def record_result(self, name, status, changed=False, retry_after=None):
+        """Schedule the next poll of a source from the outcome of this one"""
+        if status in RATE_LIMITED_STATUSES:
+            self._back_off(name, parse_retry_after(retry_after), rate_limited=True)
+            return
+        if status is None or status >= 500:
+            self._back_off(name)
+            return
+
+        with self._lock:
+            source = self.sources[name]
+            source.failures = 0
+            # Exponentially weighted change rate, mostly for reporting
+            source.change_rate = 0.8 * source.change_rate + 0.2 * (1.0 if changed else 0.0)
+            if changed:
+                source.interval = max(source.min_interval, source.interval / 2)
+            else:
+                source.interval = min(source.max_interval, source.interval * 1.5)
+            source.next_run = self.clock() + self._jittered(source.interval)
+
+    def record_error(self, name):
+        self._back_off(name)
+
+    def _back_off(self, name, retry_after=None, rate_limited=False):
+        with self._lock:
+            source = self.sources[name]
+            source.failures += 1
+            if rate_limited:
+                source.rate_limited += 1
+            else:
+                source.errors += 1
+            backoff = min(self.max_backoff, source.base_interval * 2 ** source.failures)
+            # Full jitter between half and all of the backoff
+            delay = backoff * (0.5 + 0.5 * self.rng())
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            source.next_run = self.clock() + delay
+
+    def get_stats(self):
+        return {
+            name: {
+                'interval': source.interval,
+                'change_rate': source.change_rate,
+                'polls': source.polls,
+                'failures': source.failures,
+                'rate_limited': source.rate_limited,
+                'errors': source.errors
+            }
+            for name, source in self.sources.items()
+        }
@@ -0,0 +1,175 @@
+import os
+import struct
+from solana.rpc.types import DataSliceOpts
+from solders.pubkey import Pubkey
+from raydium.instructions import RAYDIUM_PROGRAM_ID
+from raydium.layouts import AMM_V4_SIZE, AMM_V4_BASE_MINT_OFFSET
+from utils.logger import setup_logger
+from utils.token_index import mint_key, KEY_SIZE
+
+_MAGIC = b'RPIX'
+_VERSION = 2
+# magic, version, flags, slot the index is current as of
+_HEADER = struct.Struct('<4sHHQ')
+# Set once a full scan has been written - lookups that miss are then authoritative
+_FLAG_COMPLETE = 1
+# pool address, then the two mints it trades
+_RECORD = struct.Struct(f'<{KEY_SIZE}s{KEY_SIZE}s{KEY_SIZE}s')
+
+POOL_INDEX_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'raydium_pools.idx')
+
+class PoolIndex:
+    """Mint → Raydium AMM v4 pool(s), kept in memory and on disk
+
+    The file is a small header followed by fixed 96-byte records (pool,
+    mint, mint), so new pools are appended in place and a snapshot loads
+    with a single read. Lookups are a dict hit on the raw 32-byte mint key.
+    Built once with a sliced getProgramAccounts scan, then kept current
+    from the new-pool feed. ``complete`` is set (and persisted) once that
+    scan has run, after which a miss means the mint has no pool.
+    """
+
+    def __init__(self, path=POOL_INDEX_PATH):
+        self.logger = setup_logger("pool_index")
+        self.path = path
+        self.slot = 0
+        self.complete = False
+        self._pools = {}
+        self._by_mint = {}
+        self._file = None
+        self.stats = {'lookups': 0, 'hits': 0, 'appended': 0}
+
+        if path and os.path.exists(path):
+            try:
+                self._load(path)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable pool index: {str(e)}")
+                self._pools.clear()
+                self._by_mint.clear()
+                self.complete = False
+
+    def __len__(self):
+        return len(self._pools)
+
+    def __contains__(self, mint):
+        return mint_key(str(mint)) in self._by_mint
+
+    def get(self, mint):
+        """Pool addresses trading a mint, oldest first"""
+        self.stats['lookups'] += 1
+        pools = self._by_mint.get(mint_key(str(mint)))
+        if not pools:
+            return []
+        self.stats['hits'] += 1
+        return [str(Pubkey(pool)) for pool in pools]
+
+    def _insert(self, pool, mint_a, mint_b):
+        if pool in self._pools:
+            return False
+        self._pools[pool] = (mint_a, mint_b)
+        for mint in (mint_a, mint_b):
+            self._by_mint.setdefault(mint, []).append(pool)
+        return True
+
+    def add(self, pool_address, mint_a, mint_b, slot=None):
+        """Index a pool, appending it to the file - returns True if it was new"""
+        pool = bytes(Pubkey.from_string(str(pool_address)))
+        mint_a, mint_b = mint_key(str(mint_a)), mint_key(str(mint_b))
+        added = self._insert(pool, mint_a, mint_b)
+        if slot and slot > self.slot:
+            self.slot = slot
+        if added and self.path:
+            self._append(_RECORD.pack(pool, mint_a, mint_b))
+        return added
+
+    async def on_pool_created(self, record):
+        """RaydiumPoolFeed subscriber keeping the index current"""
+        self.add(record['pool_address'], record['address'], record['quote_mint'], record.get('slot'))
+
+    async def build(self, client, program_id=None):
+        """Fill in from one getProgramAccounts scan that only returns the two mint fields
+
+        Scan results are merged into what is already indexed: pools the feed
+        added while the scan ran are newer than its snapshot and are kept.
+        """
+        response = await client.get_program_accounts(
+            program_id or RAYDIUM_PROGRAM_ID,
+            encoding="base64",
+            data_slice=DataSliceOpts(offset=AMM_V4_BASE_MINT_OFFSET, length=2 * KEY_SIZE),
+            filters=[AMM_V4_SIZE]
+        )
+        for keyed in response.value:
+            data = keyed.account.data
+            self._insert(bytes(keyed.pubkey), bytes(data[:KEY_SIZE]), bytes(data[KEY_SIZE:2 * KEY_SIZE]))
+        self.slot = max(self.slot, getattr(getattr(response, 'context', None), 'slot', 0) or 0)
+        self.complete = True
+        self.save()
+        self.logger.info(f"📚 Pool index built: {len(self._pools)} pools, {len(self._by_mint)} mints")
+        return len(self._pools)
+
+    def _append(self, record):
+        if self._file is None:
+            if not os.path.exists(self.path):
+                # The first snapshot already holds the new record
+                self.save()
+                return
+            self._file = open(self.path, 'r+b')
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(record)
+        self._file.flush()
+        self.stats['appended'] += 1
+
+    def _header(self):
+        return _HEADER.pack(_MAGIC, _VERSION, _FLAG_COMPLETE if self.complete else 0, self.slot)
+
+    def save(self, path=None):
+        """Write a compact snapshot of every pool"""
+        path = path or self.path
+        if not path:
+            return False
+        self.close()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self._header())
+            f.write(b''.join(
+                _RECORD.pack(pool, mint_a, mint_b) for pool, (mint_a, mint_b) in self._pools.items()
+            ))
+        os.replace(tmp_path, path)
+        return True
+
+    def _load(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ValueError("Corrupt pool index")
+        magic, version, flags, slot = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Unsupported pool index")
+
+        self.slot = slot
+        self.complete = bool(flags & _FLAG_COMPLETE)
+        # A torn trailing record from an interrupted append is ignored
+        end = _HEADER.size + (len(data) - _HEADER.size) // _RECORD.size * _RECORD.size
+        for pool, mint_a, mint_b in _RECORD.iter_unpack(memoryview(data)[_HEADER.size:end]):
+            self._insert(pool, mint_a, mint_b)
+        if end != len(data):
+            self.save(path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def memory_stats(self):
+        return {
+            'pools': len(self._pools),
+            'mints': len(self._by_mint),
+            'slot': self.slot,
+            'complete': self.complete,
+            'file_bytes': _HEADER.size + len(self._pools) * _RECORD.size,
+            **self.stats
+        }
@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+class QuoteCache:
+    """Short-lived cache of swap quotes keyed by (mint, amount, slippage)
+
+    prefetch() starts a quote request in the background while the caller
+    is still deciding whether to trade; get() hands back that quote if it
+    is still fresh, waiting for it if it is in flight. cancel() drops
+    everything for a mint once the token is rejected or bought.
+    """
+
+    def __init__(self, ttl=2.0, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = {}
+        self.stats = {
+            'prefetched': 0,
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'cancelled': 0,
+            'saved_ms_total': 0.0
+        }
+
+    def prefetch(self, mint, amount, slippage_bps, fetch):
+        """Start fetching a quote in the background unless one is already cached"""
+        key = (mint, amount, slippage_bps)
+        entry = self.entries.get(key)
+        if entry and not self._expired(entry):
+            return entry['task']
+
+        entry = {'started': self.clock(), 'fetched_at': None, 'fetch_ms': None}
+
+        async def run():
+            quote = await fetch()
+            entry['fetched_at'] = self.clock()
+            entry['fetch_ms'] = (entry['fetched_at'] - entry['started']) * 1000
+            return quote
+
+        entry['task'] = asyncio.ensure_future(run())
+        # A failed prefetch is reported as a miss by get()
+        entry['task'].add_done_callback(lambda task: task.cancelled() or task.exception())
+        self.entries[key] = entry
+        self.stats['prefetched'] += 1
+        return entry['task']
+
+    def _expired(self, entry):
+        return entry['fetched_at'] is not None and self.clock() - entry['fetched_at'] > self.ttl
+
+    async def get(self, mint, amount, slippage_bps):
+        """A fresh prefetched quote, or None if the caller has to fetch its own"""
+        entry = self.entries.get((mint, amount, slippage_bps))
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        if self._expired(entry):
+            self.stats['expired'] += 1
+            self.entries.pop((mint, amount, slippage_bps), None)
+            return None
+
+        waited = self.clock()
+        try:
+            quote = await asyncio.shield(entry['task'])
+        except asyncio.CancelledError:
+            if not entry['task'].cancelled():
+                raise
+            self.stats['misses'] += 1
+            return None
+        except Exception:
+            self.stats['misses'] += 1
+            return None
+
+        waited_ms = (self.clock() - waited) * 1000
+        self.stats['hits'] += 1
+        self.stats['saved_ms_total'] += max(entry['fetch_ms'] - waited_ms, 0.0)
+        return quote
+
+    def cancel(self, mint):
+        """Drop every quote for a mint, cancelling requests still in flight"""
+        for key in [key for key in self.entries if key[0] == mint]:
+            task = self.entries.pop(key)['task']
+            if not task.done():
+                task.cancel()
+                self.stats['cancelled'] += 1
+
+    def get_stats(self):
+        """Hit rate and average latency saved per hit"""
+        lookups = self.stats['hits'] + self.stats['misses'] + self.stats['expired']
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'avg_saved_ms': self.stats['saved_ms_total'] / self.stats['hits'] if self.stats['hits'] else 0.0
+        }
@@ -0,0 +1,249 @@
+import asyncio
+import random
+import time
+from collections import deque
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Confirmed
+from utils.logger import setup_logger
+from utils.exceptions import NetworkError
+
+# Reads are only hedged on an endpoint's own p95 once it has this many samples
+MIN_LATENCY_SAMPLES = 20
+
+# Methods that must not be duplicated by hedging
+WRITE_METHODS = frozenset({'send_transaction', 'send_raw_transaction', 'request_airdrop'})
+
+# Heavy scans that are always slow - only retried elsewhere on failure, never hedged
+SCAN_METHODS = frozenset({'get_program_accounts'})
+
+class RpcEndpoint:
+    """Health of one RPC endpoint: latency, circuit breaker and slot lag"""
+
+    def __init__(self, url, client, failure_threshold=3, cooldown=30):
+        self.url = url
+        self.client = client
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latencies = deque(maxlen=200)
+        self.ewma = None
+        self.failures = 0
+        self.opened_at = None
+        # When the half-open trial request was let through, if one is in flight
+        self.probe_at = None
+        self.slot = 0
+        self.lagging = False
+        self.stats = {'requests': 0, 'errors': 0, 'circuit_opens': 0}
+
+    def is_open(self):
+        return self.failures >= self.failure_threshold
+
+    def available(self, now):
+        """Circuit closed, or cooled down with no trial request in flight
+
+        A trial that never reports back (e.g. cancelled) expires after
+        another cooldown so the endpoint can be probed again.
+        """
+        if not self.is_open():
+            return True
+        if now - self.opened_at < self.cooldown:
+            return False
+        return self.probe_at is None or now - self.probe_at >= self.cooldown
+
+    def claim(self, now):
+        """Note a request going to this endpoint - the single trial if its circuit is open"""
+        if self.is_open():
+            self.probe_at = now
+
+    def p95(self):
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95)]
+
+    def record_success(self, latency):
+        self.stats['requests'] += 1
+        self.latencies.append(latency)
+        self.ewma = latency if self.ewma is None else 0.8 * self.ewma + 0.2 * latency
+        self.failures = 0
+        self.opened_at = None
+        self.probe_at = None
+
+    def record_failure(self, now):
+        self.stats['requests'] += 1
+        self.stats['errors'] += 1
+        self.failures += 1
+        self.probe_at = None
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None or now - self.opened_at >= self.cooldown:
+                self.stats['circuit_opens'] += 1
+            self.opened_at = now
+
+class RpcClientPool:
+    """AsyncClients for every configured endpoint, picked by health
+
+    - selection is weighted by inverse latency (EWMA) among healthy endpoints
+    - ``failure_threshold`` consecutive errors open an endpoint's circuit for
+      ``cooldown`` seconds, after which one trial request may close it again
+    - a read still running past its endpoint's p95 is duplicated on another
+      endpoint and the first answer wins (scans are only retried on failure)
+    - endpoints more than ``max_slot_lag`` slots behind the best one are
+      skipped while any up-to-date endpoint is available
+    """
+
+    def __init__(self, endpoints, commitment=Confirmed, failure_threshold=3, cooldown=30,
+                 hedge_delay=1.0, max_slot_lag=20, slot_interval=5, client_factory=AsyncClient,
+                 clock=time.monotonic):
+        if not endpoints:
+            raise ValueError("RpcClientPool needs at least one RPC endpoint")
+
+        self.logger = setup_logger("rpc_pool")
+        self.endpoints = [
+            RpcEndpoint(url, client_factory(url, commitment=commitment), failure_threshold, cooldown)
+            for url in dict.fromkeys(endpoints)
+        ]
+        self.hedge_delay = hedge_delay
+        self.max_slot_lag = max_slot_lag
+        self.slot_interval = slot_interval
+        self.clock = clock
+        self.is_running = False
+        self.slot_task = None
+        self.stats = {'reads': 0, 'hedged': 0, 'hedge_wins': 0, 'failovers': 0}
+
+    def select(self, exclude=()):
+        """Pick an endpoint, weighted towards the fastest healthy ones"""
+        now = self.clock()
+        usable = [e for e in self.endpoints if e not in exclude and e.available(now)]
+        candidates = [e for e in usable if not e.lagging] or usable
+        if not candidates:
+            return None
+        # Untried endpoints get the best known latency so they are sampled too
+        known = [e.ewma for e in candidates if e.ewma is not None]
+        default = min(known) if known else 1.0
+        weights = [1 / max(e.ewma if e.ewma is not None else default, 0.001) for e in candidates]
+        choice = random.choices(candidates, weights)[0]
+        choice.claim(now)
+        return choice
+
+    async def _call(self, endpoint, method, args, kwargs):
+        started = self.clock()
+        try:
+            result = await getattr(endpoint.client, method)(*args, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            endpoint.record_failure(self.clock())
+            raise
+        endpoint.record_success(self.clock() - started)
+        return result
+
+    async def read(self, method, *args, **kwargs):
+        """Call an AsyncClient method on a healthy endpoint, hedging slow reads"""
+        primary = self.select()
+        if primary is None:
+            raise NetworkError("No RPC endpoint available (all circuits open)")
+
+        self.stats['reads'] += 1
+        tasks = {asyncio.create_task(self._call(primary, method, args, kwargs)): primary}
+        backup_sent = method in WRITE_METHODS
+        error = None
+        try:
+            while tasks:
+                hedge = not backup_sent and method not in SCAN_METHODS
+                timeout = (primary.p95() or self.hedge_delay) if hedge else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    endpoint = tasks.pop(task)
+                    if task.exception() is None:
+                        if endpoint is not primary and error is None:
+                            self.stats['hedge_wins'] += 1
+                        return task.result()
+                    error = task.exception()
+
+                if backup_sent:
+                    continue
+                backup_sent = True
+                backup = self.select(exclude={primary})
+                if backup is not None:
+                    # Either the primary failed fast or it is slower than its usual p95
+                    self.stats['failovers' if done else 'hedged'] += 1
+                    tasks[asyncio.create_task(self._call(backup, method, args, kwargs))] = backup
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def check_slots(self):
+        """Refresh every endpoint's slot and flag the ones falling behind"""
+        results = await asyncio.gather(
+            *(self._call(endpoint, 'get_slot', (), {}) for endpoint in self.endpoints),
+            return_exceptions=True
+        )
+        for endpoint, result in zip(self.endpoints, results):
+            if not isinstance(result, Exception):
+                endpoint.slot = result.value
+
+        highest = max(endpoint.slot for endpoint in self.endpoints)
+        for endpoint in self.endpoints:
+            lagging = highest - endpoint.slot > self.max_slot_lag
+            if lagging and not endpoint.lagging:
+                self.logger.warning(f"⚠️ {endpoint.url} is {highest - endpoint.slot} slots behind")
+            endpoint.lagging = lagging
+
+    async def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        await self.check_slots()
+        self.slot_task = asyncio.create_task(self._run_slot_checks())
+
+    async def _run_slot_checks(self):
+        while self.is_running:
+            await asyncio.sleep(self.slot_interval)
+            try:
+                await self.check_slots()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Slot check error: {str(e)}")
+
+    async def close(self):
+        self.is_running = False
+        if self.slot_task:
+            self.slot_task.cancel()
+            await asyncio.gather(self.slot_task, return_exceptions=True)
+            self.slot_task = None
+        for endpoint in self.endpoints:
+            await endpoint.client.close()
+
+    def get_stats(self):
+        now = self.clock()
+        return {
+            **self.stats,
+            'endpoints': {
+                endpoint.url: {
+                    **endpoint.stats,
+                    'available': endpoint.available(now),
+                    'lagging': endpoint.lagging,
+                    'slot': endpoint.slot,
+                    'ewma_ms': endpoint.ewma * 1000 if endpoint.ewma is not None else None,
+                    'p95_ms': endpoint.p95() * 1000 if endpoint.p95() is not None else None
+                }
+                for endpoint in self.endpoints
+            }
+        }
+
+class PooledClient:
+    """AsyncClient look-alike whose methods run through an RpcClientPool"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    @property
+    def endpoint(self):
+        endpoint = self.pool.select()
+        return endpoint.url if endpoint else None
+
+    def __getattr__(self, name):
+        async def call(*args, **kwargs):
+            return await self.pool.read(name, *args, **kwargs)
+        return call
@@ -0,0 +1,29 @@
+import itertools
+from utils.exceptions import NetworkError
+
+_request_ids = itertools.count(1)
+
+def websocket_url(rpc_url):
+    """Derive the PubSub websocket URL for an HTTP RPC endpoint"""
+    if rpc_url.startswith('https://'):
+        return 'wss://' + rpc_url[len('https://'):]
+    if rpc_url.startswith('http://'):
+        return 'ws://' + rpc_url[len('http://'):]
+    return rpc_url
+
+async def rpc_call(session, rpc_url, method, params=None):
+    """Make a raw JSON-RPC call and return its result"""
+    payload = {
+        'jsonrpc': '2.0',
+        'id': next(_request_ids),
+        'method': method,
+        'params': params or []
+    }
+    async with session.post(rpc_url, json=payload) as response:
+        if response.status != 200:
+            raise NetworkError(f"{method} failed with HTTP {response.status}")
+        data = await response.json(content_type=None)
+
+    if 'error' in data:
+        raise NetworkError(f"{method} error: {data['error'].get('message', data['error'])}")
+    return data.get('result')
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+class TaskGraph:
+    """Runs async steps as soon as the steps they depend on have finished
+
+    Each step is called with its dependencies' results as keyword arguments,
+    so independent steps overlap and the total time is the longest chain of
+    dependencies rather than the sum of every step.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.steps = {}
+        self.timings = {}
+        self.started = None
+
+    def add(self, name, func, *deps):
+        """Add a step; its dependencies must already be in the graph"""
+        if name in self.steps:
+            raise ValueError(f"Duplicate step: {name}")
+        missing = [dep for dep in deps if dep not in self.steps]
+        if missing:
+            raise ValueError(f"Step {name} depends on unknown steps: {missing}")
+        self.steps[name] = (func, deps)
+        return self
+
+    async def run(self):
+        """Run every step and return their results by name"""
+        started = self.started = self.clock()
+        tasks = {}
+
+        async def run_step(name, func, deps):
+            kwargs = {dep: await tasks[dep] for dep in deps}
+            begin = self.clock()
+            try:
+                return await func(**kwargs)
+            finally:
+                self.timings[name] = (begin - started, self.clock() - started)
+
+        for name, (func, deps) in self.steps.items():
+            tasks[name] = asyncio.ensure_future(run_step(name, func, deps))
+
+        try:
+            results = await asyncio.gather(*tasks.values())
+        except BaseException:
+            # One failed step sinks the pipeline - don't leave the rest running
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return dict(zip(tasks, results))
+
+    def durations(self):
+        """Time spent inside each finished step, in ms"""
+        return {name: (end - start) * 1000 for name, (start, end) in self.timings.items()}
+
+    def critical_path(self, end=None):
+        """The chain of steps that decided when `end` finished, as (name, ms) pairs
+
+        `end` defaults to the step that finished last.
+        """
+        if not self.timings:
+            return []
+        name = end or max(self.timings, key=lambda step: self.timings[step][1])
+        path = []
+        while name:
+            start, finish = self.timings[name]
+            path.append((name, (finish - start) * 1000))
+            deps = [dep for dep in self.steps[name][1] if dep in self.timings]
+            name = max(deps, key=lambda dep: self.timings[dep][1]) if deps else None
+        return path[::-1]
+
+    def finished_at(self, name):
+        """When a step finished, in ms since the run started"""
+        return self.timings[name][1] * 1000
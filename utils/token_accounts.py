@@ -0,0 +1,122 @@
+from solders.instruction import AccountMeta, Instruction
+from solders.pubkey import Pubkey
+from solders.system_program import ID as SYSTEM_PROGRAM_ID, transfer, TransferParams
+from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID, WRAPPED_SOL_MINT
+from utils.solana_rpc import rpc_call
+
+# Associated token program instruction that succeeds if the account already exists
+CREATE_IDEMPOTENT = bytes([1])
+
+# Token program instruction syncing a wrapped SOL account's amount with its lamports
+SYNC_NATIVE = bytes([17])
+
+# Rent-exempt minimum paid when a 165-byte token account is created
+TOKEN_ACCOUNT_RENT = 2_039_280
+
+def _pubkey(value):
+    return value if isinstance(value, Pubkey) else Pubkey.from_string(str(value))
+
+def derive_ata(owner, mint, token_program=TOKEN_PROGRAM_ID):
+    """Associated token account address for (owner, mint) - pure computation, no RPC"""
+    address, _ = Pubkey.find_program_address(
+        [bytes(_pubkey(owner)), bytes(token_program), bytes(_pubkey(mint))],
+        ASSOCIATED_TOKEN_PROGRAM_ID
+    )
+    return address
+
+def create_ata_idempotent_instruction(payer, owner, mint, token_program=TOKEN_PROGRAM_ID):
+    """Instruction creating the owner's ATA for mint, a no-op if it already exists"""
+    return Instruction(
+        ASSOCIATED_TOKEN_PROGRAM_ID,
+        CREATE_IDEMPOTENT,
+        [
+            AccountMeta(_pubkey(payer), is_signer=True, is_writable=True),
+            AccountMeta(derive_ata(owner, mint, token_program), is_signer=False, is_writable=True),
+            AccountMeta(_pubkey(owner), is_signer=False, is_writable=False),
+            AccountMeta(_pubkey(mint), is_signer=False, is_writable=False),
+            AccountMeta(SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False),
+            AccountMeta(token_program, is_signer=False, is_writable=False)
+        ]
+    )
+
+def sync_native_instruction(account, token_program=TOKEN_PROGRAM_ID):
+    """Instruction crediting lamports sent to a wrapped SOL account as tokens"""
+    return Instruction(
+        token_program,
+        SYNC_NATIVE,
+        [AccountMeta(_pubkey(account), is_signer=False, is_writable=True)]
+    )
+
+class TokenAccountCache:
+    """In-memory mint → token account map for one owner
+
+    Filled once from a single getTokenAccountsByOwner scan; anything not
+    found there is derived as the owner's ATA, and the idempotent create
+    instruction goes into the swap transaction itself instead of a separate
+    create-and-confirm round trip.
+    """
+
+    def __init__(self, owner, token_program=TOKEN_PROGRAM_ID):
+        self.owner = _pubkey(owner)
+        self.token_program = token_program
+        self.accounts = {}
+        self.existing = set()
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def get(self, mint):
+        """Token account for a mint: the scanned one if we hold one, else the derived ATA"""
+        mint = str(mint)
+        account = self.accounts.get(mint)
+        if account is None:
+            account = self.accounts[mint] = derive_ata(self.owner, mint, self.token_program)
+        return account
+
+    def exists(self, mint):
+        return str(mint) in self.existing
+
+    def mark_created(self, mint):
+        """Record that a transaction created (or found) the account for a mint"""
+        self.get(mint)
+        self.existing.add(str(mint))
+
+    def create_instructions(self, mint, payer=None):
+        """Instructions to put ahead of a swap so the account exists - empty if it already does"""
+        if self.exists(mint):
+            return []
+        return [create_ata_idempotent_instruction(payer or self.owner, self.owner, mint, self.token_program)]
+
+    def wrapped_sol_account(self):
+        """Wrapped SOL account used by swaps - always the ATA
+
+        Swaps create, fund and close it in one transaction, so a non-ATA
+        wrapped SOL account found by the scan is never used for them.
+        """
+        return derive_ata(self.owner, WRAPPED_SOL_MINT, self.token_program)
+
+    def wrap_sol_instructions(self, lamports, payer=None):
+        """Create the wrapped SOL ATA and fund it with lamports, all on the same account"""
+        payer = _pubkey(payer or self.owner)
+        account = self.wrapped_sol_account()
+        return [
+            create_ata_idempotent_instruction(payer, self.owner, WRAPPED_SOL_MINT, self.token_program),
+            transfer(TransferParams(from_pubkey=payer, to_pubkey=account, lamports=lamports)),
+            sync_native_instruction(account, self.token_program)
+        ]
+
+    async def load(self, session, rpc_url, commitment='confirmed'):
+        """Populate the cache from one getTokenAccountsByOwner scan"""
+        result = await rpc_call(session, rpc_url, 'getTokenAccountsByOwner', [
+            str(self.owner),
+            {'programId': str(self.token_program)},
+            {'encoding': 'jsonParsed', 'commitment': commitment}
+        ])
+        for entry in result['value']:
+            mint = entry['account']['data']['parsed']['info']['mint']
+            account = Pubkey.from_string(entry['pubkey'])
+            # Prefer the ATA when several accounts hold the same mint
+            if mint not in self.existing or account == derive_ata(self.owner, mint, self.token_program):
+                self.accounts[mint] = account
+            self.existing.add(mint)
+        return len(self.existing)
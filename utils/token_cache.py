@@ -0,0 +1,120 @@
+class TokenInfo:
+    """Token record produced by the scout
+
+    Supports item access and ``get`` so it can be used anywhere the old
+    token dicts were.
+    """
+
+    __slots__ = (
+        'address', 'symbol', 'name', 'price', 'liquidity', 'volume', 'created_at', 'source',
+        'slot', 'pool_address'
+    )
+
+    def __init__(self, address, symbol='Unknown', name='Unknown', price=0, liquidity=0,
+                 volume=0, created_at=0, source=None, slot=None, pool_address=None):
+        self.address = address
+        self.symbol = symbol
+        self.name = name
+        self.price = price
+        self.liquidity = liquidity
+        self.volume = volume
+        self.created_at = created_at
+        self.source = source
+        self.slot = slot
+        self.pool_address = pool_address
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __repr__(self):
+        return f"TokenInfo({self.symbol!r}, {self.address!r})"
+
+class TokenCacheView:
+    """Read-only view of a TokenRingBuffer as it was when the view was taken
+
+    Nothing is copied; entries that have since been overwritten by newer
+    appends simply drop out of the view.
+    """
+
+    __slots__ = ('_buffer', '_end', '_size')
+
+    def __init__(self, buffer, end, size):
+        self._buffer = buffer
+        self._end = end
+        self._size = size
+
+    def _first(self):
+        # Oldest absolute position that is still held by the buffer
+        buffer = self._buffer
+        return max(self._end - self._size, buffer.total_appended - buffer.capacity, buffer._floor)
+
+    def __len__(self):
+        return max(self._end - self._first(), 0)
+
+    def __iter__(self):
+        items = self._buffer._items
+        capacity = self._buffer.capacity
+        for position in range(self._first(), self._end):
+            yield items[position % capacity]
+
+    def __getitem__(self, index):
+        length = len(self)
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(length))]
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("token cache index out of range")
+        return self._buffer._items[(self._first() + index) % self._buffer.capacity]
+
+class TokenRingBuffer:
+    """Fixed-capacity ring buffer of the most recent tokens with O(1) append"""
+
+    def __init__(self, capacity=100):
+        if capacity <= 0:
+            raise ValueError("Token cache capacity must be positive")
+        self.capacity = capacity
+        self.total_appended = 0
+        self._floor = 0
+        self._items = [None] * capacity
+
+    def append(self, item):
+        self._items[self.total_appended % self.capacity] = item
+        self.total_appended += 1
+
+    def __len__(self):
+        return min(self.total_appended - self._floor, self.capacity)
+
+    def view(self):
+        """Non-copying snapshot of the current contents, oldest first"""
+        return TokenCacheView(self, self.total_appended, len(self))
+
+    def latest(self, count):
+        """Iterate over the newest ``count`` tokens, oldest first"""
+        return iter(TokenCacheView(self, self.total_appended, min(count, len(self))))
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def clear(self):
+        # Positions keep counting up so outstanding views see the cache as empty
+        self._floor = self.total_appended
+        self._items = [None] * self.capacity
@@ -0,0 +1,225 @@
+import hashlib
+import mmap
+import os
+import struct
+from solders.pubkey import Pubkey
+
+KEY_SIZE = 32
+MAX_LOAD_FACTOR = 0.7
+BLOOM_HASHES = 6
+
+_MAGIC = b'KTIX'
+_VERSION = 1
+# magic, version, bloom hashes, capacity, entry count, bloom size in bytes
+_HEADER = struct.Struct('<4sHHQQQ')
+# Bloom bit positions come straight from key bytes 8..32 (keys are uniformly distributed)
+_BLOOM_WORDS = struct.Struct(f'<{BLOOM_HASHES}I')
+
+KNOWN_TOKENS_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'known_tokens.idx')
+
+def mint_key(address):
+    """Return the 32-byte key for a base58 mint address"""
+    try:
+        return bytes(Pubkey.from_string(address))
+    except ValueError:
+        # Not a real pubkey - fall back to a fixed-width digest so it can still be indexed
+        return hashlib.blake2b(address.encode(), digest_size=KEY_SIZE).digest()
+
+class KnownTokenIndex:
+    """Set of mint addresses stored as raw 32-byte keys
+
+    Keys live in one flat open-addressing table (linear probing) with an
+    occupancy map and an optional Bloom pre-filter. The table can be written
+    to disk and mapped straight back in on the next start.
+    """
+
+    def __init__(self, capacity=1 << 16, use_bloom=True, path=None):
+        self.path = path
+        self.use_bloom = use_bloom
+        self.bloom_checks = 0
+        self.bloom_rejects = 0
+        self._initial_capacity = self._round_capacity(capacity)
+        self._mmap = None
+
+        if path and os.path.exists(path):
+            try:
+                self._load(path)
+                return
+            except (OSError, ValueError):
+                self._close_mapping()
+        self._allocate(self._initial_capacity)
+
+    @staticmethod
+    def _round_capacity(capacity):
+        size = 8
+        while size < capacity:
+            size <<= 1
+        return size
+
+    def _allocate(self, capacity):
+        self._capacity = capacity
+        self._mask = capacity - 1
+        self._count = 0
+        self._used = memoryview(bytearray(capacity))
+        self._slots = memoryview(bytearray(capacity * KEY_SIZE))
+        self._bloom = memoryview(bytearray(capacity if self.use_bloom else 0))
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, address):
+        return self._find(mint_key(address))[1]
+
+    def _bloom_positions(self, key):
+        bits = len(self._bloom) * 8
+        return [word % bits for word in _BLOOM_WORDS.unpack_from(key, 8)]
+
+    def _find(self, key):
+        """Return (slot, found) for a key"""
+        bloom = self._bloom
+        if len(bloom):
+            self.bloom_checks += 1
+            for position in self._bloom_positions(key):
+                if not bloom[position >> 3] & (1 << (position & 7)):
+                    self.bloom_rejects += 1
+                    return None, False
+
+        slot = int.from_bytes(key[:8], 'little') & self._mask
+        used = self._used
+        slots = self._slots
+        while used[slot]:
+            start = slot * KEY_SIZE
+            if slots[start:start + KEY_SIZE] == key:
+                return slot, True
+            slot = (slot + 1) & self._mask
+        return slot, False
+
+    def _probe_free(self, key):
+        slot = int.from_bytes(key[:8], 'little') & self._mask
+        while self._used[slot]:
+            start = slot * KEY_SIZE
+            if self._slots[start:start + KEY_SIZE] == key:
+                return None
+            slot = (slot + 1) & self._mask
+        return slot
+
+    def _insert_key(self, key):
+        slot = self._probe_free(key)
+        if slot is None:
+            return False
+        start = slot * KEY_SIZE
+        self._slots[start:start + KEY_SIZE] = key
+        self._used[slot] = 1
+        self._count += 1
+        if len(self._bloom):
+            for position in self._bloom_positions(key):
+                self._bloom[position >> 3] |= 1 << (position & 7)
+        return True
+
+    def add(self, address):
+        """Add a mint, returning True if it was not already known"""
+        if self._count + 1 > self._capacity * MAX_LOAD_FACTOR:
+            self._grow()
+        return self._insert_key(mint_key(address))
+
+    def update(self, addresses):
+        for address in addresses:
+            self.add(address)
+
+    def _keys(self):
+        for slot in range(self._capacity):
+            if self._used[slot]:
+                start = slot * KEY_SIZE
+                yield bytes(self._slots[start:start + KEY_SIZE])
+
+    def _grow(self):
+        keys = list(self._keys())
+        self._close_mapping()
+        self._allocate(self._capacity * 2)
+        for key in keys:
+            self._insert_key(key)
+
+    def clear(self):
+        self._close_mapping()
+        self._allocate(self._initial_capacity)
+
+    def save(self, path=None):
+        """Write a snapshot that can be memory-mapped on the next start"""
+        path = path or self.path
+        if not path:
+            return False
+
+        # Copy out of an existing mapping first so the file can be replaced
+        if self._mmap is not None:
+            used, slots, bloom = bytearray(self._used), bytearray(self._slots), bytearray(self._bloom)
+            self._close_mapping()
+            self._used, self._slots, self._bloom = memoryview(used), memoryview(slots), memoryview(bloom)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(
+                _MAGIC, _VERSION, BLOOM_HASHES, self._capacity, self._count, len(self._bloom)
+            ))
+            f.write(self._used)
+            f.write(self._slots)
+            f.write(self._bloom)
+        os.replace(tmp_path, path)
+        return True
+
+    def _load(self, path):
+        with open(path, 'rb') as f:
+            # Copy-on-write mapping: pages are only read in as they are probed
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError("Corrupt token index snapshot")
+        magic, version, bloom_hashes, capacity, count, bloom_size = _HEADER.unpack_from(self._mmap, 0)
+        expected_size = _HEADER.size + capacity + capacity * KEY_SIZE + bloom_size
+        if magic != _MAGIC or version != _VERSION or bloom_hashes != BLOOM_HASHES:
+            raise ValueError("Unsupported token index snapshot")
+        if len(self._mmap) != expected_size or capacity & (capacity - 1):
+            raise ValueError("Corrupt token index snapshot")
+
+        view = memoryview(self._mmap)
+        offset = _HEADER.size
+        self._capacity = capacity
+        self._mask = capacity - 1
+        self._count = count
+        self._used = view[offset:offset + capacity]
+        offset += capacity
+        self._slots = view[offset:offset + capacity * KEY_SIZE]
+        offset += capacity * KEY_SIZE
+        self._bloom = view[offset:offset + bloom_size]
+        view.release()
+        self.use_bloom = bloom_size > 0
+
+    def _close_mapping(self):
+        if self._mmap is None:
+            return
+        for name in ('_used', '_slots', '_bloom'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+        self._mmap = None
+
+    def close(self):
+        self._close_mapping()
+        self._allocate(self._initial_capacity)
+
+    def memory_stats(self):
+        """Memory usage of the index"""
+        table_bytes = len(self._used) + len(self._slots)
+        bloom_bytes = len(self._bloom)
+        return {
+            'entries': self._count,
+            'capacity': self._capacity,
+            'load_factor': self._count / self._capacity,
+            'table_bytes': table_bytes,
+            'bloom_bytes': bloom_bytes,
+            'bytes_per_entry': (table_bytes + bloom_bytes) / self._count if self._count else 0,
+            'memory_mapped': self._mmap is not None,
+            'bloom_checks': self.bloom_checks,
+            'bloom_rejects': self.bloom_rejects
+        }
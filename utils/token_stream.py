@@ -0,0 +1,144 @@
+import asyncio
+import threading
+from collections import deque
+
+SLOW_CONSUMER_POLICIES = ('drop_oldest', 'drop_newest', 'disconnect')
+
+class Subscription:
+    """Bounded token buffer for one subscriber
+
+    Producers push from any thread; the buffer lives on the subscriber's own
+    event loop and is drained in micro-batches of up to ``max_batch`` items,
+    waiting at most ``max_wait_ms`` for a batch to fill. When the buffer is
+    full the slow-consumer policy decides what is lost.
+    """
+
+    def __init__(self, loop, max_batch=32, max_wait_ms=50, max_buffer=256, policy='drop_oldest'):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow-consumer policy: {policy}")
+        self.loop = loop
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.max_buffer = max_buffer
+        self.policy = policy
+        self.buffer = deque()
+        self.closed = False
+        self._ready = asyncio.Event()
+        self.stats = {
+            'delivered': 0,
+            'batches': 0,
+            'dropped': 0
+        }
+
+    def push(self, items):
+        """Queue items for this subscriber - safe to call from any thread"""
+        if self.closed:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._offer, items)
+        except RuntimeError:
+            # The subscriber's loop has gone away
+            self.closed = True
+
+    def _offer(self, items):
+        if self.closed:
+            return
+        for index, item in enumerate(items):
+            if len(self.buffer) >= self.max_buffer:
+                if self.policy == 'disconnect':
+                    self.stats['dropped'] += len(items) - index
+                    self.close()
+                    return
+                if self.policy == 'drop_newest':
+                    self.stats['dropped'] += 1
+                    continue
+                self.buffer.popleft()
+                self.stats['dropped'] += 1
+            self.buffer.append(item)
+        self._ready.set()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    async def _wait_ready(self, timeout=None):
+        self._ready.clear()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def next_batch(self):
+        """Wait for the next micro-batch, or return None once closed and drained"""
+        while not self.buffer:
+            if self.closed:
+                return None
+            await self._wait_ready()
+
+        if self.max_wait_ms > 0:
+            deadline = self.loop.time() + self.max_wait_ms / 1000
+            while len(self.buffer) < self.max_batch and not self.closed:
+                remaining = deadline - self.loop.time()
+                if remaining <= 0 or not await self._wait_ready(remaining):
+                    break
+
+        batch = [self.buffer.popleft() for _ in range(min(self.max_batch, len(self.buffer)))]
+        self.stats['delivered'] += len(batch)
+        self.stats['batches'] += 1
+        return batch
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        batch = await self.next_batch()
+        if batch is None:
+            raise StopAsyncIteration
+        return batch
+
+class TokenFanout:
+    """Fans batches of tokens out to every open subscription"""
+
+    def __init__(self):
+        self._subscriptions = []
+        self._lock = threading.Lock()
+        self.has_subscribers = threading.Event()
+
+    def add(self, subscription):
+        with self._lock:
+            self._subscriptions.append(subscription)
+            self.has_subscribers.set()
+
+    def remove(self, subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            if not self._subscriptions:
+                self.has_subscribers.clear()
+
+    def publish(self, batch):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.closed:
+                self.remove(subscription)
+            else:
+                subscription.push(batch)
+
+    def close_all(self):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.close)
+            except RuntimeError:
+                subscription.closed = True
+            self.remove(subscription)
+
+    def get_stats(self):
+        with self._lock:
+            return [
+                {**subscription.stats, 'buffered': len(subscription.buffer), 'policy': subscription.policy}
+                for subscription in self._subscriptions
+            ]
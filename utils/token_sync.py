@@ -0,0 +1,180 @@
+import asyncio
+import codecs
+import hashlib
+import json
+
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+# Fields kept from each Jupiter list entry - everything else is dropped on parse
+TOKEN_FIELDS = ('address', 'symbol', 'name')
+
+# Bytes handed to the streaming parser at a time
+PARSE_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+class TokenListParser:
+    """Incremental parser for a JSON array of token objects
+
+    Fed raw byte chunks, it decodes one array element at a time and keeps
+    only `fields` of each, as a tuple, so the full list of dicts is never
+    materialized.
+    """
+
+    def __init__(self, fields=TOKEN_FIELDS):
+        self.fields = fields
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._started = False
+        self._done = False
+
+    def feed(self, chunk):
+        """Parse a chunk of the body, returning the rows completed by it"""
+        self._buffer += self._text.decode(chunk)
+        buffer = self._buffer
+        pos = 0
+        rows = []
+
+        while not self._done:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(buffer):
+                break
+
+            char = buffer[pos]
+            if not self._started:
+                if char != '[':
+                    raise ValueError("Token list is not a JSON array")
+                self._started = True
+                pos += 1
+            elif char == ',':
+                pos += 1
+            elif char == ']':
+                self._done = True
+                pos += 1
+            else:
+                try:
+                    token, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Element continues in the next chunk
+                    break
+                rows.append(tuple(token.get(field) for field in self.fields))
+                pos = end
+
+        self._buffer = buffer[pos:]
+        return rows
+
+    def close(self):
+        """Check that the whole array was seen"""
+        self._buffer += self._text.decode(b'', final=True)
+        if not self._done or self._buffer.strip():
+            raise ValueError("Truncated or malformed token list")
+
+def iter_tokens(body, fields=TOKEN_FIELDS, chunk_size=PARSE_CHUNK_SIZE):
+    """Yield a tuple of `fields` for every token in a Jupiter list body"""
+    parser = TokenListParser(fields)
+    view = memoryview(body)
+    for start in range(0, len(view), chunk_size):
+        yield from parser.feed(view[start:start + chunk_size])
+    parser.close()
+
+def extract_tokens(body, fields=TOKEN_FIELDS):
+    """List form of iter_tokens() - picklable, so it can run in a process pool"""
+    return list(iter_tokens(body, fields))
+
+class JupiterTokenSync:
+    """Incremental sync of the Jupiter token list
+
+    Sends conditional request headers, skips a poll entirely on a 304 or an
+    unchanged body, and otherwise returns only the tokens whose mint was not
+    present in the previous list.
+    """
+
+    def __init__(self):
+        self.etag = None
+        self.last_modified = None
+        self.body_hash = None
+        self.addresses = set()
+        self.stats = {
+            'polls': 0,
+            'not_modified': 0,
+            'unchanged': 0,
+            'changed': 0,
+            'added': 0,
+            'removed': 0,
+            'bytes_received': 0
+        }
+
+    @property
+    def token_count(self):
+        return len(self.addresses)
+
+    def request_headers(self):
+        """Headers for the next conditional request"""
+        headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def apply(self, status, headers, body):
+        """Apply a response and return the added tokens, or None if nothing changed"""
+        body_hash = self._check(status, headers, body)
+        if body_hash is None:
+            return None
+        return self._merge(iter_tokens(body), body_hash)
+
+    async def apply_async(self, status, headers, body, executor=None):
+        """apply(), with the list parsed in `executor` so the event loop never blocks"""
+        body_hash = self._check(status, headers, body)
+        if body_hash is None:
+            return None
+        rows = await asyncio.get_running_loop().run_in_executor(executor, extract_tokens, body)
+        return self._merge(rows, body_hash)
+
+    def _check(self, status, headers, body):
+        """Record a response, returning the body hash if the list needs parsing"""
+        self.stats['polls'] += 1
+
+        if status == 304:
+            self.stats['not_modified'] += 1
+            return None
+        if status != 200:
+            return None
+
+        self.stats['bytes_received'] += len(body)
+        self.etag = headers.get('ETag', self.etag)
+        self.last_modified = headers.get('Last-Modified', self.last_modified)
+
+        body_hash = hashlib.blake2b(body, digest_size=16).digest()
+        if body_hash == self.body_hash:
+            self.stats['unchanged'] += 1
+            return None
+        return body_hash
+
+    def _merge(self, rows, body_hash):
+        """Diff parsed rows against the previous list"""
+        current = set()
+        added = []
+        for row in rows:
+            address = row[0]
+            current.add(address)
+            if address not in self.addresses:
+                added.append(dict(zip(TOKEN_FIELDS, row)))
+
+        self.stats['changed'] += 1
+        self.stats['added'] += len(added)
+        self.stats['removed'] += len(self.addresses - current)
+        self.addresses = current
+        self.body_hash = body_hash
+        return added
@@ -0,0 +1,94 @@
+import base58
+from solders.keypair import Keypair
+from utils.logger import setup_logger
+from utils.config import config
+from utils.exceptions import WalletError
+from utils.rpc_pool import RpcClientPool, PooledClient
+
+LAMPORTS_PER_SOL = 1_000_000_000
+
+# Kept back from the spendable balance for transaction and rent fees
+FEE_RESERVE_SOL = 0.01
+
+def load_keypair(private_key):
+    """Keypair from a base58 secret: the 64-byte keypair or a 32-byte seed"""
+    try:
+        secret = base58.b58decode(private_key.strip())
+    except ValueError:
+        raise WalletError("WALLET_PRIVATE_KEY is not valid base58")
+    if len(secret) == 64:
+        return Keypair.from_bytes(secret)
+    if len(secret) == 32:
+        return Keypair.from_seed(secret)
+    raise WalletError(f"WALLET_PRIVATE_KEY has unexpected length {len(secret)}")
+
+class WalletManager:
+    """Trading wallet with RPC reads spread over every configured endpoint
+
+    ``client`` behaves like an AsyncClient, but each call goes through an
+    RpcClientPool, so one slow or stale public RPC doesn't stall balance
+    checks and confirmations.
+    """
+
+    def __init__(self, endpoints=None, private_key=None, pool=None):
+        self.logger = setup_logger("wallet_manager")
+        self.endpoints = endpoints or config.RPC_ENDPOINTS
+        self.private_key = private_key or config.WALLET_PRIVATE_KEY
+        self.pool = pool
+        self._owns_pool = pool is None
+        self.client = None
+        self.keypair = None
+        self.phantom_public_key = None
+        self.is_initialized = False
+
+    async def initialize(self):
+        """Load the keypair and start the RPC pool"""
+        try:
+            self.keypair = load_keypair(self.private_key)
+            self.phantom_public_key = self.keypair.pubkey()
+
+            configured = config.WALLET.get('address')
+            if configured and configured != str(self.phantom_public_key):
+                self.logger.warning(
+                    f"Configured wallet address {configured} does not match the private key, "
+                    f"using {self.phantom_public_key}"
+                )
+
+            if self.pool is None:
+                self.pool = RpcClientPool(self.endpoints)
+            await self.pool.start()
+            self.client = PooledClient(self.pool)
+
+            balance = await self.check_balance()
+            self.logger.info(
+                f"✅ Wallet initialized: {self.phantom_public_key}\n"
+                f"  Balance: {balance:.4f} SOL\n"
+                f"  RPC endpoints: {len(self.pool.endpoints)}"
+            )
+            self.is_initialized = True
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Wallet initialization failed: {str(e)}")
+            return False
+
+    async def check_balance(self):
+        """Wallet balance in SOL"""
+        response = await self.client.get_balance(self.phantom_public_key)
+        return response.value / LAMPORTS_PER_SOL
+
+    async def get_available_balance(self):
+        """Balance that can go into trades, after the fee reserve"""
+        return max(0.0, await self.check_balance() - FEE_RESERVE_SOL)
+
+    def get_rpc_stats(self):
+        return self.pool.get_stats() if self.pool else {}
+
+    async def cleanup(self):
+        try:
+            if self.pool and self._owns_pool:
+                await self.pool.close()
+            self.is_initialized = False
+            self.logger.info("Wallet manager cleaned up")
+        except Exception as e:
+            self.logger.error(f"Error during wallet cleanup: {str(e)}")